@@ -0,0 +1,323 @@
+"""
+Benchmarks for the logic.py and DBManager hot paths on synthetic schools.
+
+    python -m benchmarks.run --sizes small,medium,large --output bench.json
+    python -m benchmarks.run --sizes small --compare bench.json
+    python -m benchmarks.run --sizes small --latency-ms 150 --fail-rate 0.05
+    python -m benchmarks.run --sizes small --startup
+
+The Sheets backend is modules.fake_sheets.FakeClient, so latency, 429s and quotas
+can be simulated.
+Results are written as JSON so two versions can be compared (--compare).
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from benchmarks.synthetic import SIZES, generate_school, to_excel_bytes
+from modules.fake_sheets import FakeClient
+
+
+def measure(fn, ops=1, repeat=5):
+    """Runs fn() 'repeat' times. Returns timings in seconds for the whole run and per operation."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    return {
+        'ops': ops,
+        'repeat': repeat,
+        'min_s': min(times),
+        'median_s': median,
+        'per_op_ms': median / ops * 1000 if ops else 0.0,
+    }
+
+
+def make_db(frames, client=None):
+    """DBManager wired to an in-memory Sheets backend, seeded with 'frames'."""
+    from modules.db_manager import DBManager
+    db = DBManager()
+    db.client = (client or FakeClient()).seed(frames)
+    return db
+
+
+def bench_school(params, repeat=5, samples=20, seed=1, backend=None, workers=None):
+    from modules import audit, batch, excel_export, logic, repair, search, slot_finder
+    from modules.data_loader import parse_excel
+
+    frames, raw_df = generate_school(**params)
+    xlsx = to_excel_bytes(raw_df)
+    client = FakeClient(**(backend or {}))
+    db = make_db(frames, client)
+    # Warm the DBManager cache the way a running session would
+    for sheet in frames:
+        db.load_dataframe(sheet)
+
+    rng = random.Random(seed)
+    timetable = frames['Timetable'].to_dict('records')
+    slots = rng.sample(timetable, min(samples, len(timetable)))
+    # What the app sees after a Sheets round trip (numeric-looking cells come back as numbers)
+    students = db.load_dataframe('Students')
+    student_ids = rng.sample(students['학번'].astype(str).tolist(), min(samples, len(students)))
+    p_times = logic.load_period_times(db)
+
+    # Largest class, as printed from the batch tab
+    class_sizes = students.groupby(['학년', '반']).size()
+    grade, class_num = class_sizes.idxmax()
+
+    schedules = []
+    for sid in student_ids:
+        sch, _, name = logic.generate_student_timetable(db, sid)
+        if sch is not None and not sch.empty:
+            schedules.append((sid, name, sch))
+
+    def parse():
+        xlsx.seek(0)
+        parse_excel(xlsx)
+
+    def conflicts():
+        for s in slots:
+            logic.check_conflicts(db, s['Week'], s['Day'], s['Period'], s['Subject'])
+
+    def student_timetables():
+        for sid in student_ids:
+            logic.generate_student_timetable(db, sid)
+
+    def batch_print():
+        targets = logic.get_students_in_class(db, grade, class_num)
+        times = logic.load_period_times(db)
+        html = ""
+        for t in targets:
+            sch, _, _ = logic.generate_student_timetable(db, t['학번'])
+            if sch is not None and not sch.empty:
+                html += logic.format_student_timetable_grid(sch, student_info={'id': t['학번'], 'name': t['이름'], 'period_times': times})
+        return html
+
+    def batch_print_pool():
+        targets = logic.get_students_in_class(db, grade, class_num)
+        return [html for _, _, pages in batch.iter_student_pages(db, targets, workers=workers) for _, html in pages]
+
+    slot_teachers = [
+        (t, s) for s in slots for t in frames['Teachers'].loc[frames['Teachers']['Subject'] == s['Subject'], 'TeacherName']
+    ]
+
+    def rosters():
+        for t, s in slot_teachers:
+            logic.get_students_for_class_slot(db, t, s['Subject'], day=s['Day'], period=s['Period'], week=s['Week'])
+
+    def all_schedules():
+        getattr(db, "_derived_cache", {}).pop("all_student_schedules", None)
+        return logic.get_all_student_schedules(db)
+
+    def school_workbook():
+        excel_export.write_school_workbook(db, io.BytesIO())
+
+    def grids():
+        for sid, name, sch in schedules:
+            logic.format_student_timetable_grid(sch, student_info={'id': sid, 'name': name, 'period_times': p_times})
+
+    # Typeahead queries as typed: 학번 prefixes, full names, partial syllables and 초성
+    names = students.set_index('학번').loc[student_ids, '이름'].astype(str).tolist()
+    queries = [sid[:3] for sid in student_ids] + names + [n[:1] + search.choseong(n[1:2]) for n in names] + [search.choseong(n) for n in names]
+    search_index = search.get_student_search_index(db)
+
+    def student_search():
+        for q in queries:
+            search.search_students(search_index, q)
+
+    subjects = logic.get_unique_subjects(db)
+
+    def slot_scores():
+        for subject in subjects:
+            slot_finder.score_slots(db, subject)
+
+    def term_audit():
+        getattr(db, "_derived_cache", {}).pop("audit", None)
+        return audit.get_audit(db)
+
+    def repair_search():
+        return repair.repair_timetable(db, budget_s=60)
+
+    def load_all():
+        for sheet in frames:
+            db.load_dataframe(sheet, force_update=True)
+
+    def load_all_parallel():
+        db.load_dataframes(list(frames), force_update=True)
+
+    def save_all():
+        for sheet, df in frames.items():
+            db.save_dataframe(sheet, df)
+
+    n_batch = len(logic.get_students_in_class(db, grade, class_num))
+    batch_print_pool()  # start the fork server outside the timings
+    results = {
+        'parse_excel': measure(parse, ops=len(raw_df), repeat=repeat),
+        'check_conflicts': measure(conflicts, ops=len(slots), repeat=repeat),
+        'generate_student_timetable': measure(student_timetables, ops=len(student_ids), repeat=repeat),
+        'batch_print': measure(batch_print, ops=max(1, n_batch), repeat=repeat),
+        'batch_print_pool': measure(batch_print_pool, ops=max(1, n_batch), repeat=repeat),
+        'class_slot_rosters': measure(rosters, ops=max(1, len(slot_teachers)), repeat=repeat),
+        'all_student_schedules': measure(all_schedules, ops=len(students), repeat=repeat),
+        'school_workbook': measure(school_workbook, ops=len(students), repeat=1),
+        'format_student_timetable_grid': measure(grids, ops=max(1, len(schedules)), repeat=repeat),
+        'student_search': measure(student_search, ops=len(queries), repeat=repeat),
+        'slot_scores': measure(slot_scores, ops=max(1, len(subjects)), repeat=repeat),
+        'term_audit': measure(term_audit, ops=max(1, len(slots)), repeat=repeat),
+        'repair_search': measure(repair_search, ops=max(1, len(slots)), repeat=1),
+        'db_load_dataframe': measure(load_all, ops=len(frames), repeat=repeat),
+        'db_load_dataframes': measure(load_all_parallel, ops=len(frames), repeat=repeat),
+        'db_save_dataframe': measure(save_all, ops=len(frames), repeat=repeat),
+    }
+    counts = {
+        'students': len(students),
+        'subjects': students['parsed_subjects'].str.split(',').explode().nunique(),
+        'teacher_rows': len(frames['Teachers']),
+        'timetable_rows': len(frames['Timetable']),
+        'batch_students': n_batch,
+    }
+    return {'params': params, 'backend': backend or {}, 'counts': counts, 'results': results, 'api_calls': client.stats()}
+
+
+STARTUP_PAGES = ["Data Upload", "Timetable Setup", "Student View"]
+
+_IMPORT_PROBE = """
+import time, streamlit, pandas
+start = time.perf_counter()
+import modules.db_manager, modules.logic
+print(time.perf_counter() - start)
+"""
+
+
+def bench_startup(params, repeat=5):
+    """Cold import cost of the app modules (fresh interpreter) and full app.py reruns per page."""
+    from streamlit.testing.v1 import AppTest
+    import views
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    imports = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _IMPORT_PROBE], cwd=root, capture_output=True, text=True, check=True)
+        imports.append(float(out.stdout.strip().splitlines()[-1]))
+    results = {'import_app_modules': {
+        'ops': 1, 'repeat': repeat, 'min_s': min(imports),
+        'median_s': statistics.median(imports), 'per_op_ms': statistics.median(imports) * 1000,
+    }}
+
+    frames, _ = generate_school(**params)
+    at = AppTest.from_file(os.path.join(root, 'app.py'), default_timeout=120)
+    at.session_state['db'] = make_db(frames)
+    at.run()
+    for page in STARTUP_PAGES:
+        at.switch_page(views.PAGES[page])
+        at.run()  # first visit warms the page's caches
+        results[f"rerun[{page}]"] = measure(at.run, repeat=repeat)
+    return {'params': params, 'results': results}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(base, current):
+    """Prints per-benchmark median ratio current/base (> 1.0 is slower)."""
+    print(f"\n{'size':<8} {'benchmark':<32} {'base ms/op':>12} {'now ms/op':>12} {'ratio':>8}")
+    for size, entry in current['sizes'].items():
+        base_entry = base.get('sizes', {}).get(size)
+        if not base_entry:
+            continue
+        for name, r in entry['results'].items():
+            b = base_entry['results'].get(name)
+            if not b or not b['per_op_ms']:
+                continue
+            ratio = r['per_op_ms'] / b['per_op_ms']
+            print(f"{size:<8} {name:<32} {b['per_op_ms']:>12.3f} {r['per_op_ms']:>12.3f} {ratio:>7.2f}x")
+    base_startup = base.get('startup', {}).get('results', {})
+    for name, r in current.get('startup', {}).get('results', {}).items():
+        b = base_startup.get(name)
+        if not b or not b['per_op_ms']:
+            continue
+        ratio = r['per_op_ms'] / b['per_op_ms']
+        print(f"{'startup':<8} {name:<32} {b['per_op_ms']:>12.3f} {r['per_op_ms']:>12.3f} {ratio:>7.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Timetable hot path benchmarks")
+    parser.add_argument('--sizes', default='small,medium', help=f"comma-separated subset of {', '.join(SIZES)}")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--samples', type=int, default=20, help="students/slots sampled per benchmark")
+    parser.add_argument('--output', help="write results JSON to this path")
+    parser.add_argument('--compare', help="baseline results JSON to compare against")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="simulated Sheets API latency per call")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="probability of an injected 429 per call")
+    parser.add_argument('--read-quota', type=int, help="read requests per minute before 429")
+    parser.add_argument('--write-quota', type=int, help="write requests per minute before 429")
+    parser.add_argument('--workers', type=int, help="batch render pool size (default: CPU count)")
+    parser.add_argument('--startup', action='store_true', help="also time cold imports and app.py reruns (first size)")
+    args = parser.parse_args(argv)
+
+    # DBManager reports through st.*; outside a Streamlit session that is just log noise
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git': _git_revision(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+        },
+        'sizes': {},
+    }
+    for size in [s.strip() for s in args.sizes.split(',') if s.strip()]:
+        if size not in SIZES:
+            parser.error(f"unknown size '{size}'")
+        print(f"[{size}] {SIZES[size]}", flush=True)
+        backend = {
+            'latency': args.latency_ms / 1000,
+            'fail_rate': args.fail_rate,
+            'read_quota_per_minute': args.read_quota,
+            'write_quota_per_minute': args.write_quota,
+        }
+        entry = bench_school(SIZES[size], repeat=args.repeat, samples=args.samples, backend=backend, workers=args.workers)
+        report['sizes'][size] = entry
+        for name, r in entry['results'].items():
+            print(f"  {name:<32} {r['per_op_ms']:>10.3f} ms/op  ({r['ops']} ops, median {r['median_s']:.3f}s)", flush=True)
+
+    if args.startup:
+        size = next(iter(report['sizes']), 'small')
+        print(f"[startup] {size}", flush=True)
+        report['startup'] = bench_startup(SIZES[size], repeat=args.repeat)
+        for name, r in report['startup']['results'].items():
+            print(f"  {name:<32} {r['per_op_ms']:>10.3f} ms/op  (median {r['median_s']:.3f}s)", flush=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nSaved: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import io
+import random
+import pandas as pd
+
+DAYS = ["월", "화", "수", "목", "금"]
+PERIODS = range(1, 8)
+
+SIZES = {
+    'small': dict(n_students=300, n_subjects=20, n_teachers=20, n_weeks=2),
+    'medium': dict(n_students=1500, n_subjects=50, n_teachers=60, n_weeks=5),
+    'large': dict(n_students=5000, n_subjects=80, n_teachers=100, n_weeks=10),
+}
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN = "민서지현우준도윤하은수영예진시호주원채유"
+
+
+def _name(rng):
+    return rng.choice(SURNAMES) + rng.choice(GIVEN) + rng.choice(GIVEN)
+
+
+def generate_school(n_students=300, n_subjects=20, n_teachers=20, n_weeks=2,
+                    slots_per_subject=2, classes_per_grade=12, exception_rate=0.03, seed=0):
+    """
+    Generates a realistic synthetic school as the sheets DBManager stores.
+    Students take 1-4 failed subjects (skewed towards few), subjects are split between
+    1-3 teachers by class, and every subject meets 'slots_per_subject' times a week.
+    Returns (frames {sheet_name: DataFrame}, raw Excel DataFrame for parse_excel)
+    """
+    rng = random.Random(seed)
+    subjects = [f"과목{i:02d}_{rng.choice([2, 3, 4])}" for i in range(1, n_subjects + 1)]
+    # A few popular subjects and a long tail
+    weights = [1.0 / (i + 1) ** 0.7 for i in range(n_subjects)]
+
+    students, raw = [], []
+    # 학번 is GCCNN, so keep classes at 35 students or fewer
+    classes_per_grade = max(classes_per_grade, -(-n_students // (3 * 35)))
+    per_class = max(1, -(-n_students // (3 * classes_per_grade)))
+    for i in range(n_students):
+        grade = i // (per_class * classes_per_grade) % 3 + 1
+        cls = i // per_class % classes_per_grade + 1
+        num = i % per_class + 1
+        sid = f"{grade}{cls:02d}{num:02d}"
+        k = rng.choices([1, 2, 3, 4], weights=[5, 3, 2, 1])[0]
+        taken = sorted(set(rng.choices(subjects, weights=weights, k=k)))
+        is_exc = rng.random() < exception_rate
+        name = _name(rng)
+        students.append({
+            '학번': sid, '이름': name, '학년': str(grade), '반': f"{cls:02d}", '번호': f"{num:02d}",
+            'is_exception': is_exc, 'parsed_subjects': ','.join(taken),
+        })
+        raw.append({
+            '학번': sid, '이름': name, '특기사항': '',
+            '미도달과목': ', '.join(f"{s.rsplit('_', 1)[0]}({s.rsplit('_', 1)[1]}학점)" for s in taken),
+            '예외처리': '전출' if is_exc else None,
+        })
+    students_df = pd.DataFrame(students)
+    raw_df = pd.DataFrame(raw)
+
+    # Teachers: each subject split by class between 1-3 teachers
+    teacher_names = [f"교사{i:03d}" for i in range(1, n_teachers + 1)]
+    classes = sorted({f"{s['학년']}-{s['반']}" for s in students})
+    teachers = []
+    for sub in subjects:
+        chosen = rng.sample(teacher_names, k=min(len(teacher_names), rng.choice([1, 2, 3])))
+        buckets = {t: [] for t in chosen}
+        for j, c in enumerate(classes):
+            buckets[chosen[j % len(chosen)]].append(c)
+        for t, cs in buckets.items():
+            teachers.append({'Subject': sub, 'TeacherName': t, 'AssignedClasses': ','.join(cs), 'Room': f"{rng.randint(1, 4)}{rng.randint(1, 20):02d}호"})
+    teachers_df = pd.DataFrame(teachers)
+
+    # Timetable: same weekly pattern every week, dates from a fixed Monday
+    pattern = [(rng.choice(DAYS), rng.choice(list(PERIODS)), sub) for sub in subjects for _ in range(slots_per_subject)]
+    pattern = sorted(set(pattern))
+    base = pd.Timestamp("2025-03-03")
+    rows = []
+    for w in range(1, n_weeks + 1):
+        for day, period, sub in pattern:
+            date = base + pd.Timedelta(days=(w - 1) * 7 + DAYS.index(day))
+            rows.append({'Week': w, 'Date': date.strftime('%m/%d'), 'Day': day, 'Period': period, 'Subject': sub})
+    timetable_df = pd.DataFrame(rows)
+
+    period_df = pd.DataFrame([{'Period': p, 'TimeRange': f"{8 + p:02d}:00~{8 + p:02d}:50"} for p in PERIODS])
+
+    frames = {
+        'Students': students_df,
+        'Teachers': teachers_df,
+        'Timetable': timetable_df,
+        'Settings_PeriodTimes': period_df,
+    }
+    return frames, raw_df
+
+
+def to_excel_bytes(raw_df):
+    """Raw roster as an in-memory .xlsx file, the way it is uploaded in Data Upload."""
+    buf = io.BytesIO()
+    raw_df.to_excel(buf, index=False)
+    buf.seek(0)
+    return buf
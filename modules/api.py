@@ -0,0 +1,236 @@
+"""
+Read-only JSON API over the timetable data, for display screens and bots that poll schedules.
+
+    python -m modules.api --port 8600 --refresh 60
+
+    GET /student/{학번}?week=                  personal timetable
+    GET /teacher/{name}?week=                  teacher timetable
+    GET /roster/{teacher}/{subject}?week=&day=&period=
+    GET /timetable?week=&day=&subject=&page=&page_size=
+
+Answers come from the same logic functions and cached indexes as the Streamlit pages.
+Every response carries an ETag derived from the content of the sheets behind its route,
+so polling clients and proxies can revalidate with If-None-Match and get 304s until the
+data actually changes. Sheets are re-read at most every --refresh seconds.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+
+from modules import logic, perf
+from modules.cli import add_backend_args, open_db, quiet_streamlit
+from modules.indexes import get_cached, get_enrollment_codes
+
+ROOM_SHEETS = ["Teachers", "Timetable", "RoomSchedule"]
+# Sheets each route reads; their content is the route's data version
+ROUTE_SHEETS = {
+    'student': ["Students"] + ROOM_SHEETS,
+    'teacher': ROOM_SHEETS,
+    'roster': ["Students"] + ROOM_SHEETS,
+    'timetable': ["Timetable"],
+}
+API_SHEETS = list(dict.fromkeys(s for sheets in ROUTE_SHEETS.values() for s in sheets))
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _frame_digest(df):
+    h = hashlib.sha1(json.dumps([str(c) for c in df.columns], ensure_ascii=False).encode())
+    if len(df):
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def data_version(db_manager, sheets):
+    """Content hash of the given sheets (each hashed once per data version), stable across reloads and restarts."""
+    h = hashlib.sha1()
+    for name in sheets:
+        df = db_manager.load_dataframe(name)
+        h.update(name.encode())
+        h.update(get_cached(db_manager, f"version:{name}", (df,), lambda: _frame_digest(df)).encode())
+    return h.hexdigest()
+
+
+def _records(df):
+    """JSON-ready rows (categoricals as text, NaN as null)."""
+    if df is None or df.empty:
+        return []
+    df = df.astype(object)
+    return df.where(df.notna(), None).to_dict('records')
+
+
+def _int_param(params, name, default=None):
+    value = params.get(name, default)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be an integer")
+
+
+def _student(db, params, sid):
+    week = _int_param(params, 'week')
+    if sid not in get_enrollment_codes(db)['student_code']:
+        raise ApiError(404, "해당 학번의 학생을 찾을 수 없습니다.")
+    schedule_df, msg, name = logic.generate_student_timetable(db, sid, week=week)
+    body = {'학번': sid, '이름': name, 'week': week, 'schedule': _records(schedule_df)}
+    if schedule_df is None or schedule_df.empty:
+        body['message'] = msg
+    return body
+
+
+def _teacher(db, params, name):
+    week = _int_param(params, 'week')
+    teachers_df = db.load_dataframe("Teachers")
+    if teachers_df.empty or name not in set(teachers_df['TeacherName']):
+        raise ApiError(404, "해당 교사를 찾을 수 없습니다.")
+    schedule_df = logic.get_teacher_schedule(db, name)
+    if week is not None and not schedule_df.empty:
+        schedule_df = schedule_df[schedule_df['Week'] == week]
+    return {'teacher': name, 'week': week, 'schedule': _records(schedule_df)}
+
+
+def _roster(db, params, teacher, subject):
+    week, period = _int_param(params, 'week'), _int_param(params, 'period')
+    day = params.get('day') or None
+    students_df = logic.get_students_for_class_slot(db, teacher, subject, day=day, period=period, week=week)
+    return {'teacher': teacher, 'subject': subject, 'week': week, 'day': day, 'period': period,
+            'students': _records(students_df)}
+
+
+def _timetable(db, params):
+    week = _int_param(params, 'week')
+    page, page_size = _int_param(params, 'page', 1), _int_param(params, 'page_size', 50)
+    if page < 1 or not 1 <= page_size <= 1000:
+        raise ApiError(400, "'page' must be >= 1 and 'page_size' between 1 and 1000")
+    rows, total = logic.query_timetable(
+        db, week=week, day=params.get('day') or None, subject=params.get('subject') or None, page=page, page_size=page_size)
+    return {'total': total, 'page': page, 'page_size': page_size, 'rows': _records(rows)}
+
+
+# route -> (handler, number of path segments after the route name)
+ROUTES = {
+    'student': (_student, 1),
+    'teacher': (_teacher, 1),
+    'roster': (_roster, 2),
+    'timetable': (_timetable, 0),
+}
+
+
+class TimetableAPI:
+    """
+    Request handling independent of the HTTP server (handle() is what the tests call).
+    refresh_s: re-read the sheets when the last read is older than this (None: never).
+    """
+
+    def __init__(self, db_manager, refresh_s=None, clock=time.monotonic):
+        self.db = db_manager
+        self.refresh_s = refresh_s
+        self.clock = clock
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """Re-reads every API sheet if forced or stale; unchanged content keeps its ETags."""
+        with self._lock:
+            now = self.clock()
+            stale = self._loaded_at is None or (self.refresh_s is not None and now - self._loaded_at >= self.refresh_s)
+            if not (force or stale):
+                return
+            reload = force or self._loaded_at is not None
+            if hasattr(self.db, 'load_dataframes'):
+                self.db.load_dataframes(API_SHEETS, force_update=reload)
+            else:
+                for name in API_SHEETS:
+                    self.db.load_dataframe(name, force_update=reload)
+            self._loaded_at = now
+
+    def handle(self, target, if_none_match=None):
+        """Returns (status, headers, body bytes) for a GET of 'target' (path and query string)."""
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.split('/') if p]
+        params = {k: v[-1].strip() for k, v in parse_qs(url.query).items()}
+        route = parts[0] if parts else ""
+        if route not in ROUTES or len(parts) - 1 != ROUTES[route][1]:
+            return self._json(404, {'error': "unknown route", 'routes': sorted(ROUTES)})
+
+        with perf.timer("api.request", route=route):
+            self.refresh()
+            handler = ROUTES[route][0]
+            version = data_version(self.db, ROUTE_SHEETS[route])
+            etag = '"' + hashlib.sha1(f"{version}|{target}".encode()).hexdigest()[:24] + '"'
+            if if_none_match and etag in [t.strip() for t in if_none_match.split(',')]:
+                perf.incr("api.not_modified")
+                return 304, {'ETag': etag, 'Cache-Control': "no-cache"}, b""
+            try:
+                body = handler(self.db, params, *parts[1:])
+            except ApiError as e:
+                return self._json(e.status, {'error': str(e)})
+            return self._json(200, body, etag)
+
+    @staticmethod
+    def _json(status, body, etag=None):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode('utf-8')
+        headers = {'Content-Type': "application/json; charset=utf-8", 'Cache-Control': "no-cache"}
+        if etag:
+            headers['ETag'] = etag
+        return status, headers, data
+
+
+def make_server(api, host="127.0.0.1", port=8600):
+    """ThreadingHTTPServer serving 'api' (call serve_forever() on it)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            try:
+                status, headers, body = api.handle(self.path, self.headers.get('If-None-Match'))
+            except Exception as e:
+                status, headers, body = TimetableAPI._json(500, {'error': str(e)})
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # request timings go to perf ("api.request")
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read-only timetable JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--refresh", type=float, default=60, help="seconds between sheet re-reads (0: never)")
+    add_backend_args(parser)
+    args = parser.parse_args(argv)
+
+    quiet_streamlit()
+    db = open_db(args)
+    api = TimetableAPI(db, refresh_s=args.refresh or None)
+    api.refresh()
+    server = make_server(api, args.host, args.port)
+    print(f"Serving timetable API on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Whole-term conflict audit of the Timetable sheet.
+
+build_audit() walks the occupancy grid once: every cell holding two or more subjects is
+checked with the enrollment bitsets, so the cost grows with the number of scheduled slots,
+not with the number of students. The result (cached per data version) has the clash count
+of every (week, day, period), the clashing students of each cell and the subject pairs
+behind the clashes, for the heatmap, the CLI check and the exported report.
+"""
+import numpy as np
+import pandas as pd
+
+from modules import occupancy, perf
+from modules.indexes import bit_positions, encode_subjects, get_cached, get_enrollment_codes, popcount
+
+CONFLICT_COLUMNS = ['주차', '요일', '교시', '학번', '이름', '과목']
+PAIR_COLUMNS = ['과목 A', '과목 B', '겹치는 학생', '충돌 시간', '누적 충돌']
+
+
+def build_audit(occ, codes):
+    """
+    Conflict audit over an occupancy grid (exception students are left out, as in batch saves).
+    Returns dict:
+        'weeks' / 'days' / 'periods': axes of the occupancy grid
+        'conflicts': int [W, D, P] students with two or more classes in the cell
+        'cell_students': {(week, day, period): student codes, sorted by 학번}
+        'rows': DataFrame[CONFLICT_COLUMNS], one row per student and cell, '과목' joined with ", "
+        'pairs': DataFrame[PAIR_COLUMNS], subject pairs scheduled together that share students,
+                 most accumulated clashes first
+    """
+    # Occupancy subject code -> enrollment subject code (-1: nobody takes it)
+    enroll_code = encode_subjects(pd.Series(occ['subjects'], dtype=object), codes['subject_code'])
+    bits, active = codes['bits'], codes['active']
+    conflicts = np.zeros(occ['count'].shape, dtype=np.int64)
+    # pairs: (subject A, subject B) -> [students taking both, cells scheduled together]
+    cell_students, rows, pairs = {}, [], {}
+
+    for w, d, p in zip(*np.nonzero(occ['count'] >= 2)):
+        t_week, t_day, t_period = occ['weeks'][w], occ['days'][d], occ['periods'][p]
+        subjects = [
+            (occ['subjects'][c], enroll_code[c])
+            for c in dict.fromkeys(occ['row_subject'][occupancy.cell_rows(occ, t_week, t_day, t_period)].tolist())
+            if enroll_code[c] >= 0
+        ]
+        if len(subjects) < 2:
+            continue
+
+        seen = np.zeros_like(active)
+        clash = np.zeros_like(active)
+        for i, (a, ca) in enumerate(subjects):
+            clash |= seen & bits[ca]
+            seen |= bits[ca]
+            for b, cb in subjects[:i]:
+                key = (a, b) if a < b else (b, a)
+                if key not in pairs:
+                    pairs[key] = [int(popcount(bits[ca] & bits[cb] & active)), 0]
+                pairs[key][1] += 1
+        students = sorted(bit_positions(clash & active, codes['n']).tolist(), key=lambda i: codes['sids'][i])
+        if not students:
+            continue
+
+        conflicts[w, d, p] = len(students)
+        cell_students[(t_week, t_day, t_period)] = np.array(students, dtype=np.int64)
+        for i in students:
+            taken = [s for s, c in subjects if (int(bits[c][i >> 6]) >> (i & 63)) & 1]
+            rows.append((t_week, t_day, t_period, codes['sids'][i], codes['names'][i], ", ".join(taken)))
+
+    pair_df = pd.DataFrame(
+        [(a, b, shared, cells, shared * cells) for (a, b), (shared, cells) in pairs.items() if shared],
+        columns=PAIR_COLUMNS)
+    pair_df = pair_df.sort_values(['누적 충돌', '과목 A', '과목 B'], ascending=[False, True, True], kind='stable')
+    return {
+        'weeks': list(occ['weeks']), 'days': list(occ['days']), 'periods': list(occ['periods']),
+        'conflicts': conflicts,
+        'cell_students': cell_students,
+        'rows': pd.DataFrame(rows, columns=CONFLICT_COLUMNS),
+        'pairs': pair_df.reset_index(drop=True),
+    }
+
+
+@perf.timed()
+def get_audit(db_manager):
+    """Conflict audit of the loaded Timetable/Students sheets (cached per data version)."""
+    occ = occupancy.get_occupancy(db_manager)
+    codes = get_enrollment_codes(db_manager)
+    return get_cached(db_manager, "audit", (occ, codes), lambda: build_audit(occ, codes))
+
+
+def summary(audit):
+    """Headline numbers: {'students', 'incidents', 'cells', 'pairs'}."""
+    rows = audit['rows']
+    return {
+        'students': rows['학번'].nunique(),
+        'incidents': len(rows),
+        'cells': len(audit['cell_students']),
+        'pairs': len(audit['pairs']),
+    }
+
+
+def term_heatmap(audit, shape):
+    """
+    Clash counts of the whole term as (counts, css) DataFrames: one row per week and one
+    column per configured (day, period), e.g. '월1'. Darker red means more students clash.
+    """
+    columns = [f"{d}{p}" for d in shape['days'] for p in range(1, shape['periods_per_day'][d] + 1)]
+    counts = pd.DataFrame(0, index=pd.Index(audit['weeks'], name='주차'), columns=columns)
+    day_index = {d: i for i, d in enumerate(audit['days'])}
+    for d in shape['days']:
+        for p in range(1, shape['periods_per_day'][d] + 1):
+            counts[f"{d}{p}"] = audit['conflicts'][:, day_index[d], p - 1]
+    worst = max(1, int(counts.to_numpy().max(initial=0)))
+    css = counts.map(lambda n: "" if not n else f"background-color: rgba(229, 57, 53, {0.15 + 0.85 * n / worst:.2f})")
+    return counts, css
@@ -0,0 +1,161 @@
+"""
+Batch rendering of student timetables for printing.
+
+Targets are split into chunks and rendered on a worker pool against a read-only
+snapshot of the sheets, so workers never touch Google Sheets or session state.
+Each process worker receives the snapshot once, when it starts, and keeps it for
+the whole job. Chunks finish in any order; iter_student_pages() yields progress
+as each one completes and hands pages back in target order.
+"""
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from modules import logic, occupancy, perf
+
+SNAPSHOT_SHEETS = ["Students", "Teachers", "Timetable", "RoomSchedule", "Settings_PeriodTimes", "Settings_Grid"]
+# Below this many students a pool costs more than it saves
+MIN_PARALLEL = 24
+
+# Worker side: the job's snapshot, set by the pool initializer; its derived caches live as long as the worker
+_worker_snapshot = None
+
+
+class SnapshotDB:
+    """Read-only, picklable stand-in for DBManager holding copies of the loaded sheets."""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def load_dataframe(self, sheet_name, force_update=False):
+        return self.frames.get(sheet_name, pd.DataFrame())
+
+    def save_dataframe(self, sheet_name, df):
+        raise RuntimeError("SnapshotDB is read-only")
+
+    def __getstate__(self):
+        # Derived caches are rebuilt on the worker side
+        return {'frames': self.frames}
+
+
+def snapshot(db_manager, sheets=SNAPSHOT_SHEETS):
+    """Copies the sheets a batch render needs out of db_manager."""
+    return SnapshotDB({name: db_manager.load_dataframe(name).copy() for name in sheets})
+
+
+def default_workers():
+    env = os.environ.get("TIMETABLE_BATCH_WORKERS")
+    if env:
+        return max(1, int(env))
+    return os.cpu_count() or 1
+
+
+def render_student_page(db, student, week=None, period_times=None, shape=None):
+    """Timetable HTML for one {'학번', '이름'} target (a placeholder if nothing is scheduled)."""
+    sid, name = student['학번'], student['이름']
+    sch_df, _, _ = logic.generate_student_timetable(db, sid, week=week)
+    if sch_df is not None and not sch_df.empty:
+        return logic.format_student_timetable_grid(
+            sch_df, student_info={'id': sid, 'name': name, 'period_times': period_times, 'shape': shape})
+    return f"<div style='text-align:center; padding: 20px;'><h3>{name} ({sid})</h3><p>배정된 시간표 없음</p></div>"
+
+
+def student_schedule(db, student, week=None):
+    """Schedule DataFrame for one target, or None if nothing is scheduled."""
+    sch_df, _, _ = logic.generate_student_timetable(db, student['학번'], week=week)
+    return sch_df if sch_df is not None and not sch_df.empty else None
+
+
+def _render_one(snap, student, week, output, period_times, shape):
+    if output == "schedule":
+        return student_schedule(snap, student, week)
+    return render_student_page(snap, student, week, period_times, shape)
+
+
+def _render_chunk(snap, index, students, week, output="html"):
+    period_times = logic.load_period_times(snap)
+    shape = occupancy.load_grid_shape(snap)
+    return index, [(s, _render_one(snap, s, week, output, period_times, shape)) for s in students]
+
+
+def _init_worker(snap):
+    global _worker_snapshot
+    _worker_snapshot = snap
+
+
+def _render_worker_chunk(index, students, week, output):
+    return _render_chunk(_worker_snapshot, index, students, week, output)
+
+
+def _mp_context():
+    """
+    forkserver context whose server has the render code imported and never lets workers
+    re-run __main__ (under Streamlit that is app.py; see modules.batch_worker).
+    None where forkserver is unavailable (Windows).
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return None
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload(["modules.batch_worker", "modules.batch"])
+    return ctx
+
+
+def iter_student_pages(db_manager, targets, week=None, workers=None, chunk_size=None, executor="process", output="html"):
+    """
+    Renders every target's timetable page.
+    Yields (done, total, pages) each time a chunk completes: 'done' counts finished
+    students, 'pages' are the newly available [(student, result)] in target order.
+    output: "html" (format_student_timetable_grid) or "schedule" (DataFrame or None, e.g. for PDFs).
+    executor: "process", "thread" or "serial"; small batches always run serially, and
+    "process" falls back to threads without forkserver.
+    """
+    targets = list(targets)
+    total = len(targets)
+    if not total:
+        return
+    workers = workers or default_workers()
+    snap = db_manager if isinstance(db_manager, SnapshotDB) else snapshot(db_manager)
+
+    if executor == "serial" or workers == 1 or total < MIN_PARALLEL:
+        with perf.timer("batch.render", executor="serial"):
+            period_times = logic.load_period_times(snap)
+            shape = occupancy.load_grid_shape(snap)
+            for i, student in enumerate(targets):
+                yield i + 1, total, [(student, _render_one(snap, student, week, output, period_times, shape))]
+        return
+
+    # A few chunks per worker keeps everyone busy while keeping progress granular
+    chunk_size = chunk_size or max(1, min(50, -(-total // (workers * 4))))
+    chunks = [targets[i:i + chunk_size] for i in range(0, total, chunk_size)]
+
+    ctx = _mp_context() if executor == "process" else None
+    if ctx is None:
+        executor = "thread"
+    with perf.timer("batch.render", executor=executor):
+        if executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=workers)
+            pending = {pool.submit(_render_chunk, snap, i, chunk, week, output) for i, chunk in enumerate(chunks)}
+        else:
+            # The snapshot is pickled once per worker, not once per chunk
+            pool = ProcessPoolExecutor(
+                max_workers=min(workers, len(chunks)), mp_context=ctx,
+                initializer=_init_worker, initargs=(snap,))
+            pending = {pool.submit(_render_worker_chunk, i, chunk, week, output) for i, chunk in enumerate(chunks)}
+        try:
+            finished, next_index, done = {}, 0, 0
+            while pending:
+                completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    index, pages = future.result()
+                    finished[index] = pages
+                    done += len(pages)
+                ready = []
+                while next_index in finished:
+                    ready.extend(finished.pop(next_index))
+                    next_index += 1
+                yield done, total, ready
+        finally:
+            # Abandoned jobs (e.g. the user left the page) should not keep the pool busy
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,11 @@
+"""
+Fork-server bootstrap for the batch worker pool, preloaded by batch._mp_context().
+
+multiprocessing workers re-run the parent's __main__ file on start-up, and under
+Streamlit that is app.py (the page itself). Batch workers only need modules.batch,
+so this switches the re-run off. It is imported in the fork server only, which the
+workers fork from; the Streamlit process and its sys.modules are left alone.
+"""
+from multiprocessing import spawn
+
+spawn._fixup_main_from_path = lambda main_path: None
@@ -0,0 +1,265 @@
+"""
+Headless entry point for the jobs the Streamlit pages run one click at a time, e.g. from cron:
+
+    python -m modules.cli ingest 명단.xlsx
+    python -m modules.cli check --week 3 --output conflicts.csv
+    python -m modules.cli check --output 충돌점검.xlsx
+    python -m modules.cli solve
+    python -m modules.cli repair --budget 30 --dry-run
+    python -m modules.cli precompute --output schedules.csv
+    python -m modules.cli export pdf --grade 1 --output 1학년.pdf
+    python -m modules.cli export xlsx --output 학교전체.xlsx
+
+Storage is Google Sheets (credentials.json or .streamlit/secrets.toml) by default, or the
+CSV files in --data-dir with --local. Progress and timings go to stderr, results to stdout.
+Exit codes: 0 done, 1 the job failed or found problems, 2 bad arguments or input.
+"""
+import argparse
+import sys
+import time
+from contextlib import contextmanager
+
+EXIT_OK, EXIT_PROBLEMS, EXIT_USAGE = 0, 1, 2
+EXPORT_FORMATS = ["html", "pdf", "xlsx", "rosters"]
+
+
+def log(msg):
+    print(msg, file=sys.stderr, flush=True)
+
+
+@contextmanager
+def step(label):
+    """Logs how long the enclosed step took."""
+    start = time.perf_counter()
+    yield
+    log(f"{label}: {time.perf_counter() - start:.2f}s")
+
+
+def quiet_streamlit():
+    """DBManager reports through st.*; outside a Streamlit session that is just log noise."""
+    from streamlit import config as st_config, logger as st_logger
+    st_config.get_config_options()  # parsing the config resets the log level, so parse it first
+    st_logger.set_log_level("error")
+
+
+def add_backend_args(parser):
+    parser.add_argument("--local", action="store_true", help="use the CSV files in --data-dir instead of Google Sheets")
+    parser.add_argument("--data-dir", default="data", help="folder of the local CSV files (default: data)")
+    parser.add_argument("--credentials", default="credentials.json", help="service account key file for Google Sheets")
+
+
+def open_db(args):
+    """DBManager for the backend chosen on the command line."""
+    from modules.db_manager import DBManager
+    db = DBManager(credentials_path=args.credentials)
+    db.data_dir = args.data_dir
+    db.is_local = args.local
+    return db
+
+
+def _targets(db, grade=None, class_num=None):
+    """Students who get a timetable, for one class, one grade or the whole school."""
+    from modules import logic
+    from modules.indexes import get_enrollment_index
+    if grade is not None:
+        return logic.get_students_in_class(db, grade, class_num)
+    grades = sorted({info['학년'] for info in get_enrollment_index(db)['students'].values()})
+    return [t for g in grades for t in logic.get_students_in_class(db, g)]
+
+
+def cmd_ingest(db, args):
+    from modules.data_loader import parse_excel
+    with step("parse"):
+        df, error = parse_excel(args.file)
+    if error:
+        log(error)
+        return EXIT_USAGE
+    log(f"{len(df)} students, {int(df['is_exception'].sum())} exceptions")
+    if args.dry_run:
+        return EXIT_OK
+    # Same storage format as the Data Upload page
+    save_df = df.copy()
+    save_df['parsed_subjects'] = save_df['parsed_subjects'].apply(lambda x: ','.join(x))
+    with step("save Students"):
+        success = db.save_dataframe("Students", save_df)
+    return EXIT_OK if success else EXIT_PROBLEMS
+
+
+def cmd_check(db, args):
+    from modules import audit, excel_export, logic
+    with step("conflict audit"):
+        conflicts = logic.find_timetable_conflicts(db, week=args.week)
+    for r in conflicts.itertuples(index=False):
+        print(f"{r.주차}주차 {r.요일} {r.교시}교시  {r.이름}({r.학번})  {r.과목}")
+    if args.output and args.output.lower().endswith(".xlsx"):
+        with step("audit workbook"):
+            excel_export.write_audit_workbook(db, args.output)
+    elif args.output:
+        conflicts.to_csv(args.output, index=False, encoding='utf-8-sig')
+    cells = len(conflicts.drop_duplicates(['주차', '요일', '교시']))
+    log(f"{len(conflicts)} student conflicts in {cells} slots" if len(conflicts) else "no conflicts")
+    for r in audit.get_audit(db)['pairs'].head(5).itertuples(index=False):
+        log(f"  {r[0]} + {r[1]}: {r[2]} students x {r[3]} slots")
+    return EXIT_PROBLEMS if len(conflicts) else EXIT_OK
+
+
+def cmd_solve(db, args):
+    from modules import rooms
+    with step("room allocation"):
+        alloc_df, summary = rooms.allocate_rooms(db)
+    log(f"{summary['slots']} slots, {summary['groups']} class groups, "
+        f"{summary['over_seats']} seats over capacity, {summary['unassigned']} without a room")
+    if alloc_df.empty:
+        log("nothing to allocate (Rooms or Timetable is empty)")
+        return EXIT_PROBLEMS
+    if not args.dry_run:
+        with step("save RoomSchedule"):
+            if not rooms.save_room_schedule(db, alloc_df):
+                return EXIT_PROBLEMS
+    return EXIT_PROBLEMS if summary['unassigned'] else EXIT_OK
+
+
+def cmd_repair(db, args):
+    from modules import repair
+    with step("repair search"):
+        plan, summary = repair.repair_timetable(db, week=args.week, budget_s=args.budget)
+    for r in plan.to_dict('records'):
+        print(f"{r['주차']}주차 {r['과목']}: {r['기존 요일']} {r['기존 교시']}교시 -> {r['새 요일']} {r['새 교시']}교시")
+    if args.output:
+        plan.to_csv(args.output, index=False, encoding='utf-8-sig')
+    log(f"{summary['before']} -> {summary['after']} student conflicts with {summary['moves']} moves "
+        f"({summary['locked']} locked slots){'' if summary['complete'] else ', time budget ran out'}")
+    if not plan.empty and not args.dry_run:
+        with step("save Timetable"):
+            success, msg, _ = repair.apply_repair(db, plan)
+        if not success:
+            log(msg)
+            return EXIT_PROBLEMS
+    return EXIT_PROBLEMS if summary['after'] else EXIT_OK
+
+
+def cmd_precompute(db, args):
+    from modules import logic
+    with step("student schedules"):
+        schedules = logic.get_all_student_schedules(db, week=args.week)
+    with step("class slot rosters"):
+        rosters = logic.get_rosters(db)
+    log(f"{schedules['학번'].nunique()} students, {len(schedules)} schedule rows, {len(rosters['by_slot'])} class slots")
+    if args.output:
+        schedules.to_csv(args.output, index=False, encoding='utf-8-sig')
+    return EXIT_OK
+
+
+def _progress(pages_iter, label):
+    started, last = time.perf_counter(), 0.0
+    for done, total, ready in pages_iter:
+        now = time.perf_counter()
+        if done == total or now - last >= 1:
+            last = now
+            log(f"{label} {done}/{total} ({done / max(now - started, 1e-6):.1f}/s)")
+        yield from ready
+
+
+def cmd_export(db, args):
+    from modules import batch, excel_export, logic, occupancy, pdf_export
+    if args.format == "xlsx":
+        with step("school workbook"):
+            stats = excel_export.write_school_workbook(db, args.output, week=args.week)
+        log(f"{stats['students']} students, {stats['classes']} classes, {stats['grids']} grids")
+        return EXIT_OK
+    if args.format == "rosters":
+        with step("roster workbook"):
+            stats = excel_export.write_roster_workbook(db, args.output, teacher_name=args.teacher)
+        log(f"{stats['teachers']} teachers, {stats['slots']} class slots")
+        return EXIT_OK
+
+    targets = _targets(db, args.grade, args.class_num)
+    if not targets:
+        log("no students to export")
+        return EXIT_PROBLEMS
+    pages = batch.iter_student_pages(
+        db, targets, week=args.week, workers=args.workers, output="schedule" if args.format == "pdf" else "html")
+    with step(f"{args.format} export"):
+        if args.format == "pdf":
+            entries = list(_progress(pages, "timetables"))
+            data = pdf_export.student_timetables_pdf(entries, logic.load_period_times(db), occupancy.load_grid_shape(db))
+            with open(args.output, 'wb') as f:
+                f.write(data)
+        else:
+            body = "".join(
+                f'<div class="print-page" style="page-break-after: always;">{html}</div>'
+                for _, html in _progress(pages, "timetables"))
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>시간표</title></head><body>{body}</body></html>')
+    log(f"{len(targets)} students -> {args.output}")
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m modules.cli", description="Headless timetable jobs")
+    add_backend_args(parser)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="import a student roster Excel file into the Students sheet")
+    p.add_argument("file")
+    p.add_argument("--dry-run", action="store_true", help="parse and report only")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("check", help="report students scheduled in two classes at once")
+    p.add_argument("--week", type=int)
+    p.add_argument("--output", help="also write the conflicts to this CSV file, or the whole-term audit report if it ends in .xlsx")
+    p.set_defaults(func=cmd_check)
+
+    p = sub.add_parser("solve", help="allocate rooms for every scheduled class and save RoomSchedule")
+    p.add_argument("--dry-run", action="store_true", help="allocate and report without saving")
+    p.set_defaults(func=cmd_solve)
+
+    p = sub.add_parser("repair", help="move as few unlocked slots as possible to resolve student conflicts")
+    p.add_argument("--week", type=int)
+    p.add_argument("--budget", type=float, default=10.0, help="search time limit in seconds (default: 10)")
+    p.add_argument("--dry-run", action="store_true", help="print the moves without saving")
+    p.add_argument("--output", help="also write the moves to this CSV file")
+    p.set_defaults(func=cmd_repair)
+
+    p = sub.add_parser("precompute", help="build every student schedule and class roster")
+    p.add_argument("--week", type=int)
+    p.add_argument("--output", help="write the student schedules to this CSV file")
+    p.set_defaults(func=cmd_precompute)
+
+    p = sub.add_parser("export", help="write timetables as HTML/PDF or the school/roster workbooks")
+    p.add_argument("format", choices=EXPORT_FORMATS)
+    p.add_argument("--output", required=True)
+    p.add_argument("--week", type=int)
+    p.add_argument("--grade", help="html/pdf: one grade (default: the whole school)")
+    p.add_argument("--class", dest="class_num", help="html/pdf: one class of --grade")
+    p.add_argument("--teacher", help="rosters: one teacher only")
+    p.add_argument("--workers", type=int, help="render pool size (default: CPU count)")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None, db=None):
+    """Runs one job and returns its exit code. 'db' overrides the backend options (tests)."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'class_num', None) and not args.grade:
+        parser.error("--class needs --grade")
+    quiet_streamlit()
+
+    if db is None:
+        db = open_db(args)
+        # DBManager quietly falls back to local CSVs when Sheets is unreachable; a cron job should not
+        if not args.local and db.get_spreadsheet() is None:
+            log("error: could not open the Google Sheets spreadsheet (check --credentials, or use --local)")
+            return EXIT_PROBLEMS
+
+    with step(f"{args.command} total"):
+        try:
+            return args.func(db, args)
+        except (OSError, ValueError) as e:
+            log(f"error: {e}")
+            return EXIT_PROBLEMS
+
+
+if __name__ == "__main__":
+    sys.exit(main())
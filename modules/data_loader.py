@@ -1,6 +1,8 @@
 import pandas as pd
 import re
+from modules import perf
 
+@perf.timed()
 def parse_excel(file):
     """
     Parses the uploaded Excel file.
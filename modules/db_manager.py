@@ -1,16 +1,71 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import pandas as pd
 import streamlit as st
 import os
 import json
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from modules import perf, schema
 
 SCOPE = [
     "https://spreadsheets.google.com/feeds",
     "https://www.googleapis.com/auth/drive",
 ]
 
+# Read API calls per sheet load: worksheet() metadata + get_all_records()
+CALLS_PER_LOAD = 2
+
+
+class RateLimiter:
+    """
+    Client-side sliding-window limiter (calls per 60 s), shared by every thread that
+    reads through one DBManager. acquire() blocks until the calls fit in the window.
+    clock: object with time() and sleep() (fake_sheets.VirtualClock in tests).
+    """
+
+    def __init__(self, per_minute, clock=None):
+        self.per_minute = per_minute
+        self.clock = clock or time
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, calls=1):
+        while True:
+            with self._lock:
+                now = self.clock.time()
+                while self._calls and self._calls[0] <= now - 60:
+                    self._calls.popleft()
+                if len(self._calls) + calls <= self.per_minute or not self._calls:
+                    self._calls.extend([now] * calls)
+                    return
+                wait = self._calls[0] + 60 - now
+            perf.incr("db.throttle_s", wait)
+            self.clock.sleep(wait)
+
+
+def _secrets_service_account():
+    """The [gcp_service_account] secrets table, or None (also when there is no secrets.toml, e.g. outside Streamlit)."""
+    try:
+        if "gcp_service_account" in st.secrets:
+            return st.secrets["gcp_service_account"]
+    except Exception:
+        pass
+    return None
+
+
+def _frame_bytes(df):
+    """
+    Approximate size of a sheet for the db.bytes_* counters: the frame's shallow memory
+    footprint, which costs O(columns) instead of serializing every cell on each load/save.
+    """
+    return int(df.memory_usage(index=False).sum())
+
+
+def _default_read_limiter():
+    per_minute = os.environ.get("TIMETABLE_READS_PER_MINUTE")
+    return RateLimiter(int(per_minute)) if per_minute else None
+
 class DBManager:
     def __init__(self, credentials_path="credentials.json"):
         self.credentials_path = credentials_path
@@ -21,12 +76,17 @@ class DBManager:
         self.spreadsheet_name = "Timetable_System_DB" # Kept for reference
         self.is_local = False # Flag for local fallback
         self.cache = {} # In-memory cache for dataframes
+        self.data_dir = "data" # Local fallback (CSV) folder
+        # Optional quota guard for Sheets reads (TIMETABLE_READS_PER_MINUTE) and the load_dataframes() fan-out
+        self.read_limiter = _default_read_limiter()
+        self.max_workers = int(os.environ.get("TIMETABLE_DB_WORKERS", "6"))
 
     def _get_service_account_email(self):
         """Extracts client_email from credentials.json or secrets."""
         try:
-            if "gcp_service_account" in st.secrets:
-                return st.secrets["gcp_service_account"].get("client_email", "Unknown")
+            account = _secrets_service_account()
+            if account is not None:
+                return account.get("client_email", "Unknown")
             
             if os.path.exists(self.credentials_path):
                 with open(self.credentials_path, 'r', encoding='utf-8') as f:
@@ -38,11 +98,15 @@ class DBManager:
 
     def connect(self):
         """Connects to Google Sheets API."""
+        # Imported here so local/offline sessions never pay for the Google client libraries
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+
         # 1. Try Streamlit Secrets First (for Cloud Deployment)
-        if "gcp_service_account" in st.secrets:
+        creds_dict = _secrets_service_account()
+        if creds_dict is not None:
             try:
                 # Create credentials from secrets dict
-                creds_dict = st.secrets["gcp_service_account"]
                 creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPE)
                 self.client = gspread.authorize(creds)
                 return True
@@ -116,8 +180,12 @@ class DBManager:
 
     def save_dataframe(self, sheet_name, df):
         """Saves a pandas DataFrame to a specific worksheet or local CSV."""
-        # Update Cache immediately so we don't need to re-fetch
-        self.cache[sheet_name] = df.copy()
+        with perf.timer("db.save_dataframe", sheet=sheet_name):
+            return self._save_dataframe(sheet_name, df)
+
+    def _save_dataframe(self, sheet_name, df):
+        # Update Cache immediately so we don't need to re-fetch (in canonical types, like a fresh load)
+        self.cache[sheet_name] = schema.normalize(sheet_name, df)
 
         # Check Local Mode first
         if self.is_local:
@@ -130,10 +198,11 @@ class DBManager:
         if not sh:
             return False
 
+        from gspread import WorksheetNotFound
         try:
             worksheet = sh.worksheet(sheet_name)
             worksheet.clear()
-        except gspread.WorksheetNotFound:
+        except WorksheetNotFound:
             try:
                 worksheet = sh.add_worksheet(title=sheet_name, rows=100, cols=20)
             except Exception as e:
@@ -153,13 +222,17 @@ class DBManager:
         for attempt in range(max_retries):
             try:
                 # Sanitize DataFrame: Replace NaN and Infinity with empty strings for JSON compatibility
-                df_cleaned = df.fillna("").replace([float('inf'), float('-inf')], "")
-                worksheet.update([df_cleaned.columns.values.tolist()] + df_cleaned.values.tolist())
+                df_cleaned = schema.to_storage(df).fillna("").replace([float('inf'), float('-inf')], "")
+                values = [df_cleaned.columns.values.tolist()] + df_cleaned.values.tolist()
+                worksheet.update(values)
+                perf.incr("db.bytes_written", _frame_bytes(df_cleaned))
                 return True
             except Exception as e:
                 if "quota" in str(e).lower() or "429" in str(e):
                     if attempt < max_retries - 1:
                         sleep_time = (2 ** attempt) + 1 # 2, 3, 5 seconds
+                        perf.incr("db.retries")
+                        perf.incr("db.sleep_s", sleep_time)
                         time.sleep(sleep_time)
                         continue
                     else:
@@ -176,10 +249,21 @@ class DBManager:
         return False
 
     def load_dataframe(self, sheet_name, force_update=False):
-        """Loads a worksheet into a pandas DataFrame."""
+        """
+        Loads a worksheet into a pandas DataFrame (served from the cache until saved or force_update).
+        A missing worksheet loads as an empty DataFrame and is cached too, so optional sheets
+        (RoomSchedule, Settings_*) cost one Sheets call per session, not one per lookup; a sheet
+        created elsewhere in the meantime shows up after force_update=True.
+        """
+        with perf.timer("db.load_dataframe", sheet=sheet_name):
+            return self._load_dataframe(sheet_name, force_update)
+
+    def _load_dataframe(self, sheet_name, force_update=False):
         # 1. Check Cache
         if not force_update and sheet_name in self.cache:
+            perf.incr("db.cache_hit")
             return self.cache[sheet_name]
+        perf.incr("db.cache_miss")
 
         if self.is_local:
             df = self._load_local(sheet_name)
@@ -195,22 +279,30 @@ class DBManager:
         if not sh:
             return pd.DataFrame() 
 
+        from gspread import WorksheetNotFound
         # Retry logic for Reading
         max_retries = 3
         for attempt in range(max_retries):
             try:
+                if self.read_limiter is not None:
+                    self.read_limiter.acquire(CALLS_PER_LOAD)
                 worksheet = sh.worksheet(sheet_name)
                 data = worksheet.get_all_records()
-                df = pd.DataFrame(data)
+                df = schema.normalize(sheet_name, pd.DataFrame(data))
+                perf.incr("db.bytes_read", _frame_bytes(df))
                 self.cache[sheet_name] = df # Update Cache
                 return df
-            except gspread.WorksheetNotFound:
-                # This is not an error, just empty
-                return pd.DataFrame() 
+            except WorksheetNotFound:
+                # This is not an error, just empty (cached so optional sheets are not re-fetched every call)
+                df = pd.DataFrame()
+                self.cache[sheet_name] = df
+                return df
             except Exception as e:
                 if "quota" in str(e).lower() or "429" in str(e):
                     if attempt < max_retries - 1:
                         sleep_time = (2 ** attempt) + 1
+                        perf.incr("db.retries")
+                        perf.incr("db.sleep_s", sleep_time)
                         time.sleep(sleep_time)
                         continue
                     else:
@@ -229,12 +321,32 @@ class DBManager:
         
         return pd.DataFrame()
 
+    def load_dataframes(self, sheet_names, force_update=False):
+        """
+        Loads several worksheets at once and returns {sheet_name: DataFrame}.
+        Sheets that are not cached are fetched in parallel (at most max_workers at a time,
+        every request still going through read_limiter), so a cold page waits about as
+        long as its slowest sheet. Each sheet goes through load_dataframe(), so caching,
+        retries and the local fallback behave exactly as for single loads.
+        """
+        sheet_names = list(dict.fromkeys(sheet_names))
+        missing = [n for n in sheet_names if force_update or n not in self.cache]
+        if len(missing) > 1 and self.max_workers > 1:
+            # Connect once up front instead of racing connect() from every worker
+            self.get_spreadsheet()
+        loaded = {}
+        if len(missing) > 1 and self.max_workers > 1 and not self.is_local and self.client is not None:
+            with perf.timer("db.load_dataframes", sheets=len(missing)):
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing)),
+                                        initializer=_attach_script_context, initargs=(_script_context(),)) as pool:
+                    loaded = dict(zip(missing, pool.map(lambda n: self.load_dataframe(n, force_update=force_update), missing)))
+        return {n: loaded[n] if n in loaded else self.load_dataframe(n, force_update=force_update) for n in sheet_names}
+
     # --- Local Fallback Methods ---
     def _get_local_path(self, sheet_name):
-        data_dir = "data"
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-        return os.path.join(data_dir, f"{sheet_name}.csv")
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+        return os.path.join(self.data_dir, f"{sheet_name}.csv")
 
     def _save_local(self, sheet_name, df):
         try:
@@ -250,8 +362,23 @@ class DBManager:
         try:
             path = self._get_local_path(sheet_name)
             if os.path.exists(path):
-                return pd.read_csv(path)
+                return schema.normalize(sheet_name, pd.read_csv(path))
             return pd.DataFrame()
         except Exception as e:
             # st.error(f"Local load failed: {e}") # Suppress unless needed
             return pd.DataFrame()
+
+
+def _script_context():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx(suppress_warning=True)
+    except ImportError:
+        return None
+
+
+def _attach_script_context(ctx):
+    """Lets worker threads show st.warning()/st.error() like the page's own thread."""
+    if ctx is not None:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+        add_script_run_ctx(threading.current_thread(), ctx)
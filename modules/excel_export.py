@@ -0,0 +1,247 @@
+"""
+One .xlsx holding every student's weekly timetable grid, every teacher's schedule
+and every class roster, for the whole school.
+
+The data comes from logic.get_all_student_schedules (a single join) and the workbook
+is written with openpyxl's write-only mode: rows are streamed to disk sheet by sheet,
+so memory stays flat however many classes, students or rows there are.
+"""
+import io
+from itertools import groupby
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from modules import audit, logic, occupancy, perf
+from modules.indexes import DAY_ORDER
+
+TEACHER_SHEET = "교사별 시간표"
+ROSTER_SHEET = "수강 명단"
+# Audit heatmap shades, fewest to most clashing students
+HEAT_FILLS = ['FFEBEE', 'FFCDD2', 'EF9A9A', 'E57373', 'E53935']
+
+
+def _add_styles(wb):
+    """
+    Registers the named styles once per workbook. Assigning a named style to a cell
+    is a lookup, whereas setting font/fill/border per cell hashes every style object.
+    """
+    thin = Side(style='thin', color='999999')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    center = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    fill = PatternFill('solid', fgColor='F2F2F2')
+    for style in (
+        NamedStyle('tt_title', font=Font(bold=True, size=13)),
+        NamedStyle('tt_column', font=Font(bold=True), fill=fill),
+        NamedStyle('tt_head', font=Font(bold=True), fill=fill, border=border, alignment=center),
+        NamedStyle('tt_cell', border=border, alignment=center),
+        NamedStyle('tt_off', border=border, fill=PatternFill('solid', fgColor='EEEEEE')),
+    ):
+        wb.add_named_style(style)
+
+
+def _cell(ws, value, style):
+    c = WriteOnlyCell(ws, value="" if value is None or (not isinstance(value, str) and pd.isna(value)) else value)
+    c.style = style
+    return c
+
+
+def _header(ws, labels):
+    ws.append([_cell(ws, v, 'tt_head') for v in labels])
+
+
+def _table_sheet(wb, title, df, widths):
+    """A flat, filterable sheet: header row plus one row per DataFrame row."""
+    ws = wb.create_sheet(title)
+    for col, width in zip("ABCDEFGHIJKLMNOP", widths):
+        ws.column_dimensions[col].width = width
+    ws.freeze_panes = "A2"
+    ws.append([_cell(ws, c, 'tt_column') for c in df.columns])
+    for row in df.itertuples(index=False):
+        ws.append(["" if v is None or (not isinstance(v, str) and pd.isna(v)) else v for v in row])
+    return ws
+
+
+def _cell_text(rows):
+    parts = []
+    for r in rows:
+        lines = [str(r['과목'])]
+        if pd.notna(r['날짜']) and str(r['날짜']).strip():
+            lines.append(f"({r['날짜']})")
+        if r['담당교사'] and r['담당교사'] != "미배정":
+            lines.append(str(r['담당교사']))
+        if pd.notna(r['장소']) and str(r['장소']).strip():
+            lines.append(str(r['장소']))
+        parts.append("\n".join(lines))
+    return "\n―\n".join(parts)
+
+
+def _class_sheet(wb, title, records, period_times, shape):
+    """Timetable grids for every student of one class, one block per student and week."""
+    days, per_day = shape['days'], shape['periods_per_day']
+    ws = wb.create_sheet(title)
+    ws.column_dimensions['A'].width = 14
+    for i in range(len(days)):
+        ws.column_dimensions[get_column_letter(i + 2)].width = 20
+    blocks = 0
+    for (sid, name), student_rows in groupby(records, key=lambda r: (r['학번'], r['이름'])):
+        for week, week_rows in groupby(student_rows, key=lambda r: r['주차']):
+            cells = {}
+            for r in week_rows:
+                cells.setdefault((str(r['교시']), r['요일']), []).append(r)
+            ws.append([_cell(ws, f"{sid} {name} ({week}주차)", 'tt_title')])
+            _header(ws, ["교시"] + days)
+            for p in shape['periods']:
+                label = f"{p}교시\n({period_times[p]})" if period_times.get(p) else f"{p}교시"
+                row = [_cell(ws, label, 'tt_head')]
+                # Periods past a day's last one are shaded
+                row += [_cell(ws, _cell_text(cells.get((str(p), d), [])), 'tt_cell' if p <= per_day[d] else 'tt_off') for d in days]
+                ws.append(row)
+            ws.append([])
+            blocks += 1
+    return blocks
+
+
+def _teacher_schedules(schedules):
+    assigned = schedules[schedules['담당교사'] != "미배정"]
+    keys = ['담당교사', '주차', '날짜', '요일', '교시', '과목', '장소']
+    df = (assigned.assign(장소=assigned['장소'].fillna(""), 날짜=assigned['날짜'].fillna(""))
+          .groupby(keys, sort=False, observed=True).size().rename('학생수').reset_index())
+    order = pd.DataFrame({
+        't': df['담당교사'],
+        'w': pd.to_numeric(df['주차'], errors='coerce'),
+        'd': df['요일'].map(DAY_ORDER),
+        'p': pd.to_numeric(df['교시'], errors='coerce'),
+    }).sort_values(['t', 'w', 'd', 'p'], kind='stable').index
+    return df.loc[order]
+
+
+def _rosters(schedules):
+    cols = ['담당교사', '과목', '학번', '이름', '학년', '반', '번호']
+    return schedules[cols].drop_duplicates().sort_values(['담당교사', '과목'], kind='stable')
+
+
+def write_school_workbook(db_manager, target, week=None):
+    """
+    Writes the school-wide workbook to 'target' (a path or a binary file object).
+    Sheets: one sheet of weekly timetable grids per class, then every teacher's
+    schedule and every (teacher, subject) roster as flat, filterable tables.
+    Returns {'students', 'classes', 'grids', 'rows'}.
+    """
+    with perf.timer("export.school_workbook"):
+        schedules = logic.get_all_student_schedules(db_manager, week=week)
+        period_times = logic.load_period_times(db_manager)
+        shape = occupancy.load_grid_shape(db_manager)
+
+        wb = Workbook(write_only=True)
+        _add_styles(wb)
+
+        grids = classes = 0
+        records = schedules.to_dict('records')
+        for (grade, class_num), class_rows in groupby(records, key=lambda r: (r['학년'], r['반'])):
+            grids += _class_sheet(wb, f"{grade}-{class_num}반", class_rows, period_times, shape)
+            classes += 1
+
+        _table_sheet(wb, TEACHER_SHEET, _teacher_schedules(schedules), [12, 6, 10, 6, 6, 18, 12, 8])
+        _table_sheet(wb, ROSTER_SHEET, _rosters(schedules), [12, 18, 10, 10, 6, 6, 6])
+        wb.save(target)
+    return {'students': schedules['학번'].nunique(), 'classes': classes, 'grids': grids, 'rows': len(schedules)}
+
+
+def school_workbook_bytes(db_manager, week=None):
+    """write_school_workbook() into memory, for st.download_button."""
+    buf = io.BytesIO()
+    stats = write_school_workbook(db_manager, buf, week=week)
+    return buf.getvalue(), stats
+
+
+def _sheet_title(name):
+    """Excel sheet names: at most 31 characters, none of []:*?/\\."""
+    return "".join("_" if ch in '[]:*?/\\' else ch for ch in str(name))[:31] or "Sheet"
+
+
+def write_roster_workbook(db_manager, target, teacher_name=None):
+    """
+    Writes every class slot roster of the term to 'target' (a path or a binary file object):
+    one sheet per teacher, one block per (week, day, period, subject) with a check column.
+    teacher_name limits it to one teacher. Returns {'teachers', 'slots'}.
+    """
+    with perf.timer("export.roster_workbook"):
+        by_teacher = {}
+        for key, students in logic.iter_slot_rosters(db_manager, teacher_name):
+            by_teacher.setdefault(key[0], []).append((key, students))
+
+        wb = Workbook(write_only=True)
+        _add_styles(wb)
+        slots = 0
+        for teacher in sorted(by_teacher):
+            ws = wb.create_sheet(_sheet_title(teacher))
+            for col, width in zip("ABCDEF", [12, 12, 6, 6, 6, 14]):
+                ws.column_dimensions[col].width = width
+            entries = sorted(by_teacher[teacher], key=lambda e: (
+                int(e[0][2]) if e[0][2].isdigit() else 0, DAY_ORDER.get(e[0][3], 9),
+                int(e[0][4]) if e[0][4].isdigit() else 0, e[0][1]))
+            for (_, subject, week, day, period), students in entries:
+                ws.append([_cell(ws, f"{week}주차 {day} {period}교시 · {subject} ({len(students)}명)", 'tt_title')])
+                _header(ws, logic.ROSTER_COLUMNS + ["확인"])
+                for row in students.itertuples(index=False):
+                    ws.append([_cell(ws, v, 'tt_cell') for v in row] + [_cell(ws, "", 'tt_cell')])
+                ws.append([])
+                slots += 1
+        if not by_teacher:
+            wb.create_sheet(ROSTER_SHEET).append(["출력할 명단이 없습니다."])
+        wb.save(target)
+    return {'teachers': len(by_teacher), 'slots': slots}
+
+
+def roster_workbook_bytes(db_manager, teacher_name=None):
+    """write_roster_workbook() into memory, for st.download_button."""
+    buf = io.BytesIO()
+    stats = write_roster_workbook(db_manager, buf, teacher_name=teacher_name)
+    return buf.getvalue(), stats
+
+
+def _heat_style(n, worst):
+    return f"tt_heat{min(len(HEAT_FILLS) - 1, (n - 1) * len(HEAT_FILLS) // worst)}" if n else 'tt_cell'
+
+
+def write_audit_workbook(db_manager, target):
+    """
+    Writes the whole-term conflict audit to 'target' (a path or a binary file object).
+    Sheets: the week x (day, period) clash heatmap, every clashing student per cell and
+    the subject pairs behind the clashes. Returns audit.summary().
+    """
+    with perf.timer("export.audit_workbook"):
+        result = audit.get_audit(db_manager)
+        counts, _ = audit.term_heatmap(result, occupancy.load_grid_shape(db_manager))
+
+        wb = Workbook(write_only=True)
+        _add_styles(wb)
+        for i, color in enumerate(HEAT_FILLS):
+            wb.add_named_style(NamedStyle(
+                f'tt_heat{i}', border=Border(*[Side(style='thin', color='999999')] * 4),
+                alignment=Alignment(horizontal='center'), fill=PatternFill('solid', fgColor=color),
+                font=Font(bold=i >= 3, color='FFFFFF' if i == len(HEAT_FILLS) - 1 else '000000')))
+
+        ws = wb.create_sheet("충돌 현황")
+        ws.column_dimensions['A'].width = 8
+        ws.append([_cell(ws, "주차별 충돌 학생 수 (요일·교시)", 'tt_title')])
+        _header(ws, ["주차"] + list(counts.columns))
+        worst = max(1, int(counts.to_numpy().max(initial=0)))
+        for week, row in counts.iterrows():
+            ws.append([_cell(ws, f"{week}주차", 'tt_head')] + [_cell(ws, int(n) or "", _heat_style(int(n), worst)) for n in row])
+
+        _table_sheet(wb, "충돌 학생", result['rows'], [6, 6, 6, 10, 10, 30])
+        _table_sheet(wb, "충돌 과목 쌍", result['pairs'], [18, 18, 12, 10, 10])
+        wb.save(target)
+    return audit.summary(result)
+
+
+def audit_workbook_bytes(db_manager):
+    """write_audit_workbook() into memory, for st.download_button."""
+    buf = io.BytesIO()
+    stats = write_audit_workbook(db_manager, buf)
+    return buf.getvalue(), stats
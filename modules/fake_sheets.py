@@ -0,0 +1,190 @@
+"""
+Offline stand-in for the gspread client used by DBManager.
+Implements the surface DBManager touches (open_by_url, worksheet, add_worksheet,
+get_all_records, update, clear) with configurable latency, 429 injection and
+per-minute quotas, and records every call, so caching/retry/batching behavior can
+be benchmarked and tested without credentials:
+
+    db = DBManager()
+    db.client = FakeClient(latency=0.2, read_quota_per_minute=60)
+"""
+import random
+import threading
+import time
+
+import gspread
+from gspread.utils import numericise_all
+
+READ_OPS = {'open_by_url', 'worksheet', 'get_all_records', 'get_all_values'}
+WRITE_OPS = {'add_worksheet', 'update', 'clear'}
+
+
+class FakeAPIError(gspread.exceptions.GSpreadException):
+    """Raised like gspread's APIError; DBManager detects it by the '429'/'quota' text."""
+
+    def __init__(self, code, message):
+        super().__init__(f"APIError: [{code}]: {message}")
+        self.code = code
+
+
+class VirtualClock:
+    """Deterministic clock: sleep() advances time instantly. Share it with code under test."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+        self._lock = threading.Lock()
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.now += max(0.0, seconds)
+
+
+def _to_cell(value):
+    """Sheets stores what it displays: booleans as TRUE/FALSE, everything else as text."""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if value is None:
+        return ""
+    return str(value)
+
+
+class FakeWorksheet:
+    def __init__(self, client, title, rows=100, cols=20):
+        self._client = client
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self._values = []
+
+    def get_all_values(self):
+        self._client._call('get_all_values', self.title)
+        return [list(r) for r in self._values]
+
+    def get_all_records(self, head=1, default_blank=""):
+        """Same shape as gspread: header row -> list of dicts with numeric-looking strings numericised."""
+        self._client._call('get_all_records', self.title)
+        if len(self._values) < head:
+            return []
+        header = self._values[head - 1]
+        records = []
+        for row in self._values[head:]:
+            row = list(row) + [""] * (len(header) - len(row))
+            records.append(dict(zip(header, numericise_all(row[:len(header)], default_blank=default_blank))))
+        return records
+
+    def update(self, values, range_name=None, **kwargs):
+        values = [[_to_cell(v) for v in row] for row in values]
+        self._client._call('update', self.title, cells=sum(len(r) for r in values))
+        self._values = values
+        return {'updatedRows': len(self._values)}
+
+    def clear(self):
+        self._client._call('clear', self.title)
+        self._values = []
+        return {}
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, url=""):
+        self._client = client
+        self.url = url
+        self._worksheets = {}
+
+    def worksheet(self, title):
+        self._client._call('worksheet', title)
+        if title not in self._worksheets:
+            raise gspread.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def worksheets(self):
+        return list(self._worksheets.values())
+
+    def add_worksheet(self, title, rows=100, cols=20, **kwargs):
+        self._client._call('add_worksheet', title)
+        ws = FakeWorksheet(self._client, title, rows, cols)
+        self._worksheets[title] = ws
+        return ws
+
+
+class FakeClient:
+    """
+    gspread.Client replacement. All URLs open the same in-memory spreadsheet.
+
+    latency / jitter: seconds added to every API call
+    fail_rate: probability that a call fails with 429
+    fail_calls: explicit 1-based call numbers that fail with 429
+    read_quota_per_minute / write_quota_per_minute: sliding 60s windows, like the Sheets API quotas
+    clock: object with time() and sleep(); use VirtualClock for deterministic tests
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, fail_rate=0.0, fail_calls=(),
+                 read_quota_per_minute=None, write_quota_per_minute=None, clock=None, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.fail_calls = set(fail_calls)
+        self.read_quota_per_minute = read_quota_per_minute
+        self.write_quota_per_minute = write_quota_per_minute
+        self.clock = clock or time
+        self.calls = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = {'read': [], 'write': []}
+        self.spreadsheet = FakeSpreadsheet(self)
+
+    # --- Call accounting ---
+    def _call(self, op, sheet=None, **info):
+        kind = 'read' if op in READ_OPS else 'write'
+        with self._lock:
+            n = len(self.calls) + 1
+            now = self.clock.time()
+            record = {'n': n, 'op': op, 'sheet': sheet, 'kind': kind, 'time': now, 'status': 200, **info}
+            self.calls.append(record)
+
+            quota = self.read_quota_per_minute if kind == 'read' else self.write_quota_per_minute
+            window = self._window[kind]
+            while window and window[0] <= now - 60:
+                window.pop(0)
+            if quota is not None and len(window) >= quota:
+                record['status'] = 429
+            elif n in self.fail_calls or (self.fail_rate and self._rng.random() < self.fail_rate):
+                record['status'] = 429
+            else:
+                window.append(now)
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+        if delay:
+            self.clock.sleep(delay)
+        if record['status'] == 429:
+            raise FakeAPIError(429, f"Quota exceeded for quota metric '{kind.title()} requests' (fake)")
+
+    def stats(self):
+        """Call counts per op and status, e.g. {'get_all_records': {'200': 3, '429': 1}}."""
+        out = {}
+        for c in self.calls:
+            out.setdefault(c['op'], {}).setdefault(str(c['status']), 0)
+            out[c['op']][str(c['status'])] += 1
+        return out
+
+    def reset_calls(self):
+        with self._lock:
+            self.calls = []
+            self._window = {'read': [], 'write': []}
+
+    # --- gspread.Client surface ---
+    def open_by_url(self, url):
+        self._call('open_by_url')
+        self.spreadsheet.url = url
+        return self.spreadsheet
+
+    def seed(self, frames):
+        """Pre-populates worksheets from {sheet_name: DataFrame} without counting as API calls."""
+        for name, df in frames.items():
+            ws = self.spreadsheet._worksheets.get(name) or FakeWorksheet(self, name)
+            self.spreadsheet._worksheets[name] = ws
+            df = df.fillna("")
+            ws._values = [[_to_cell(v) for v in row] for row in [df.columns.values.tolist()] + df.values.tolist()]
+        return self
@@ -0,0 +1,295 @@
+import numpy as np
+import pandas as pd
+from modules import perf
+
+
+def split_list(value):
+    """
+    Splits a comma-separated cell (e.g. parsed_subjects, AssignedClasses) into stripped, non-empty items.
+    """
+    if value is None or (not isinstance(value, (list, tuple)) and pd.isna(value)):
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [s.strip() for s in str(value).split(',') if s.strip()]
+
+
+def class_key(grade, class_num):
+    """Grade-Class key used in AssignedClasses, e.g. "1-3"."""
+    return f"{grade}-{class_num}"
+
+
+def get_cached(db_manager, key, sources, builder):
+    """
+    Returns a value derived from one or more loaded DataFrames, rebuilding it only
+    when one of the source frames changed.
+    DBManager hands out the same cached DataFrame object until it is saved or reloaded,
+    so frame identity is used as the data version.
+    """
+    cache = getattr(db_manager, '_derived_cache', None)
+    if cache is None:
+        cache = {}
+        try:
+            db_manager._derived_cache = cache
+        except AttributeError:
+            return builder()
+
+    entry = cache.get(key)
+    if entry is not None:
+        cached_sources, value = entry
+        if len(cached_sources) == len(sources) and all(a is b for a, b in zip(cached_sources, sources)):
+            perf.incr("index.cache_hit")
+            return value
+
+    perf.incr("index.cache_miss")
+    with perf.timer("index.build", key=key):
+        value = builder()
+    cache[key] = (tuple(sources), value)
+    return value
+
+
+def build_enrollment_index(students_df):
+    """
+    Builds the enrollment index from the 'Students' sheet in a single pass.
+    Exception students and students without failed subjects are left out.
+    Returns dict:
+        'students': {학번: {'이름', '학년', '반', '번호', 'class', 'subjects'}}
+        'by_subject': {subject: [학번, ...]}
+        'by_subject_class': {(subject, class): [학번, ...]}
+    """
+    index = {'students': {}, 'by_subject': {}, 'by_subject_class': {}}
+    if students_df is None or students_df.empty or 'parsed_subjects' not in students_df.columns:
+        return index
+
+    # Loaded frames are in canonical types (modules/schema.py): text IDs, real booleans
+    for row in students_df.to_dict('records'):
+        if row['is_exception']:
+            continue
+        subjects = split_list(row['parsed_subjects'])
+        if not subjects:
+            continue
+
+        sid = row['학번']
+        s_grade = row['학년']
+        s_class = row['반']
+        full_class = class_key(s_grade, s_class)
+        index['students'][sid] = {
+            '이름': row.get('이름', ''),
+            '학년': s_grade,
+            '반': s_class,
+            '번호': row.get('번호', ''),
+            'class': full_class,
+            'subjects': subjects,
+        }
+        for sub in subjects:
+            index['by_subject'].setdefault(sub, []).append(sid)
+            index['by_subject_class'].setdefault((sub, full_class), []).append(sid)
+
+    return index
+
+
+def get_enrollment_index(db_manager):
+    """Enrollment index for the currently loaded 'Students' sheet (cached per data version)."""
+    students_df = db_manager.load_dataframe("Students")
+    return get_cached(db_manager, "enrollment", (students_df,), lambda: build_enrollment_index(students_df))
+
+
+def _to_bits(positions, n):
+    """uint64 bitset of length n with the given positions set."""
+    bits = np.zeros((n + 63) // 64, dtype='<u8')
+    positions = np.asarray(positions, dtype=np.int64)
+    np.bitwise_or.at(bits, positions >> 6, np.left_shift(np.uint64(1), (positions & 63).astype('<u8')))
+    return bits
+
+
+def bit_positions(bits, n):
+    """Sorted positions of the set bits of a bitset over n items."""
+    return np.flatnonzero(np.unpackbits(np.asarray(bits, dtype='<u8').view(np.uint8), bitorder='little')[:n])
+
+
+def popcount(bits):
+    """Number of set bits of each bitset (summed over the last axis, int64)."""
+    bits = np.asarray(bits, dtype='<u8')
+    if hasattr(np, 'bitwise_count'):  # numpy >= 2.0
+        return np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+    return np.unpackbits(np.ascontiguousarray(bits).view(np.uint8), axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+def build_enrollment_codes(students_df):
+    """
+    Integer-coded enrollment over the 'Students' sheet. Every student row, subject and
+    Grade-Class gets a dense code, and memberships are numpy arrays instead of strings.
+    Returns dict:
+        'n': number of students; student code = row position in the sheet
+        'sids' / 'names': 학번 / 이름 per student code
+        'student_code': {학번: code} (the first row wins, as in generate_student_timetable)
+        'subjects' / 'subject_code', 'classes' / 'class_code': code <-> value vocabularies
+        'student_class': class code per student
+        'exception': is_exception per student
+        'offsets', 'subject_codes': CSR, student i takes subject_codes[offsets[i]:offsets[i + 1]]
+        'bits': uint64 [subject, word] bitsets, bit i set when student i takes the subject
+        'active': bitset of the students who get a timetable (not exception, has subjects)
+    """
+    if students_df is None or students_df.empty or 'parsed_subjects' not in students_df.columns:
+        students_df = pd.DataFrame(columns=['학번', '이름', '학년', '반', 'parsed_subjects', 'is_exception'])
+
+    n = len(students_df)
+    sids = students_df['학번'].to_numpy(dtype=object)
+    student_code = {}
+    for i, sid in enumerate(sids):
+        student_code.setdefault(sid, i)
+
+    subject_code = {}
+    lengths = np.zeros(n, dtype=np.int64)
+    flat = []
+    for i, value in enumerate(students_df['parsed_subjects']):
+        subjects = dict.fromkeys(split_list(value))
+        lengths[i] = len(subjects)
+        flat.extend(subject_code.setdefault(s, len(subject_code)) for s in subjects)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    subject_codes = np.array(flat, dtype=np.int32)
+
+    student_class, classes = pd.factorize(
+        pd.Series([class_key(g, c) for g, c in zip(students_df['학년'], students_df['반'])], dtype=object))
+    exception = students_df['is_exception'].to_numpy(dtype=bool)
+
+    words = (n + 63) // 64
+    bits = np.zeros((len(subject_code), words), dtype='<u8')
+    owner = np.repeat(np.arange(n, dtype=np.int64), lengths)
+    np.bitwise_or.at(bits, (subject_codes, owner >> 6), np.left_shift(np.uint64(1), (owner & 63).astype('<u8')))
+
+    return {
+        'n': n,
+        'sids': sids,
+        'names': students_df['이름'].to_numpy(dtype=object) if '이름' in students_df.columns else np.full(n, "", dtype=object),
+        'student_code': student_code,
+        'subjects': list(subject_code),
+        'subject_code': subject_code,
+        'classes': list(classes),
+        'class_code': {c: i for i, c in enumerate(classes)},
+        'student_class': student_class.astype(np.int32),
+        'exception': exception,
+        'offsets': offsets,
+        'subject_codes': subject_codes,
+        'bits': bits,
+        'active': _to_bits(np.flatnonzero(~exception & (lengths > 0)), n),
+    }
+
+
+def get_enrollment_codes(db_manager):
+    """Integer-coded enrollment for the currently loaded 'Students' sheet (cached per data version)."""
+    students_df = db_manager.load_dataframe("Students")
+    return get_cached(db_manager, "enrollment_codes", (students_df,), lambda: build_enrollment_codes(students_df))
+
+
+def subject_bits(codes, subject):
+    """Bitset of the students taking 'subject' (all zero for a subject nobody takes)."""
+    code = codes['subject_code'].get(subject)
+    if code is None:
+        return np.zeros(codes['bits'].shape[1], dtype='<u8')
+    return codes['bits'][code]
+
+
+def encode_subjects(values, subject_code):
+    """Subject codes for a column of subject names; -1 where nobody takes the subject."""
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # One lookup per category; code -1 (missing) picks the trailing -1
+        lookup = np.array([subject_code.get(c, -1) for c in values.cat.categories] + [-1], dtype=np.int32)
+        return lookup[values.cat.codes.to_numpy()]
+    return np.array([subject_code.get(v, -1) for v in values], dtype=np.int32)
+
+
+def build_assignment_codes(codes, assignments):
+    """
+    Teacher assignments as [subject code, class code] matrices over the enrollment vocabularies.
+    'assignments' is build_class_assignment_index(). Returns dict:
+        'teachers' / 'rooms': vocabularies
+        'teacher' / 'room': int32 [subject, class] codes, -1 where the class has no teacher
+    """
+    teacher_code, room_code = {}, {}
+    shape = (len(codes['subjects']), len(codes['classes']))
+    teacher = np.full(shape, -1, dtype=np.int32)
+    room = np.full(shape, -1, dtype=np.int32)
+    for (subject, c), (name, rm) in assignments.items():
+        s, k = codes['subject_code'].get(subject), codes['class_code'].get(c)
+        if s is None or k is None:
+            continue
+        teacher[s, k] = teacher_code.setdefault(name, len(teacher_code))
+        room[s, k] = room_code.setdefault(rm, len(room_code))
+    return {'teachers': list(teacher_code), 'rooms': list(room_code), 'teacher': teacher, 'room': room}
+
+
+def get_assignment_codes(db_manager):
+    """Integer-coded teacher assignments for the loaded Students/Teachers sheets (cached per data version)."""
+    students_df = db_manager.load_dataframe("Students")
+    teachers_df = db_manager.load_dataframe("Teachers")
+    return get_cached(
+        db_manager, "assignment_codes", (students_df, teachers_df),
+        lambda: build_assignment_codes(get_enrollment_codes(db_manager), get_class_assignment_index(db_manager)),
+    )
+
+
+def count_students(index, subject, classes):
+    """Number of students taking 'subject' across the given Grade-Class keys."""
+    by_subject_class = index['by_subject_class']
+    return sum(len(by_subject_class.get((subject, c), ())) for c in classes)
+
+
+DAY_ORDER = {'월': 1, '화': 2, '수': 3, '목': 4, '금': 5, '토': 6, '일': 7}
+
+
+def build_timetable_index(timetable_df):
+    """
+    Positional index over the 'Timetable' sheet for filtered, paginated browsing.
+    Returns dict:
+        'rank': sort rank of every row by (Week, Day, Period)
+        'by_week': {week (int): sorted row positions}
+        'by_day' / 'by_subject': {value (str): sorted row positions}
+    """
+    n = len(timetable_df)
+    index = {'rank': np.arange(n), 'by_week': {}, 'by_day': {}, 'by_subject': {}}
+    if n == 0:
+        return index
+
+    weeks = timetable_df['Week']
+    days = timetable_df['Day'].astype(object)
+    subjects = timetable_df['Subject'].astype(object)
+
+    day_key = days.map(DAY_ORDER).fillna(9).to_numpy()
+    order = np.lexsort((timetable_df['Period'].to_numpy(), day_key, weeks.to_numpy()))
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+    index['rank'] = rank
+
+    for name, values in (('by_week', weeks), ('by_day', days), ('by_subject', subjects)):
+        # groupby().indices gives the positional rows of every distinct value
+        index[name] = values.groupby(values.to_numpy()).indices
+    return index
+
+
+def get_timetable_index(db_manager):
+    """Timetable index for the currently loaded 'Timetable' sheet (cached per data version)."""
+    timetable_df = db_manager.load_dataframe("Timetable")
+    return get_cached(db_manager, "timetable", (timetable_df,), lambda: build_timetable_index(timetable_df))
+
+
+def build_class_assignment_index(teachers_df):
+    """
+    Maps (subject, Grade-Class) -> (TeacherName, Room) from the 'Teachers' sheet.
+    When several rows list the same class, the first one wins (as in generate_student_timetable).
+    """
+    index = {}
+    if teachers_df is None or teachers_df.empty or 'Subject' not in teachers_df.columns:
+        return index
+    for row in teachers_df.to_dict('records'):
+        for c in split_list(row.get('AssignedClasses')):
+            index.setdefault((row['Subject'], c), (row['TeacherName'], row.get('Room', '')))
+    return index
+
+
+def get_class_assignment_index(db_manager):
+    """Class assignment index for the currently loaded 'Teachers' sheet (cached per data version)."""
+    teachers_df = db_manager.load_dataframe("Teachers")
+    return get_cached(db_manager, "class_assignment", (teachers_df,), lambda: build_class_assignment_index(teachers_df))
@@ -1,6 +1,14 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
-
+from modules.rooms import get_room_lookup
+from modules.indexes import (
+    DAY_ORDER, bit_positions, encode_subjects, get_assignment_codes, get_cached, get_enrollment_codes,
+    get_enrollment_index, get_timetable_index, subject_bits,
+)
+from modules import audit, occupancy, perf
+
+@perf.timed()
 def get_unique_subjects(db_manager):
     """
     Fetches all unique subjects from the 'Students' sheet.
@@ -20,6 +28,7 @@ def get_unique_subjects(db_manager):
     
     return sorted(list(unique_subjects))
 
+@perf.timed()
 def get_unique_classes(db_manager):
     """
     Fetches all unique classes (Grade-Class combo?) or just Class?
@@ -41,21 +50,11 @@ def get_unique_classes(db_manager):
     # This implies Class Number. Let's assume Class Number for now, or Grade-Class if data varies.
     # Let's return "Grade-Class" to be safe.
     
-    # Ensure encoded as string
-    df['학년'] = df['학년'].astype(str)
-    df['반'] = df['반'].astype(str)
-    
-    unique_classes = set()
-    for _, row in df.iterrows():
-        # clean leading zeros if needed?
-        g = row['학년']
-        c = row['반']
-        class_str = f"{g}-{c}"
-        unique_classes.add(class_str)
-        
-    return sorted(list(unique_classes))
+    # 학년/반 are already text (modules/schema.py)
+    return sorted({f"{g}-{c}" for g, c in zip(df['학년'], df['반'])})
 
 
+@perf.timed()
 def save_teacher_assignment(db_manager, subject, teacher_name, classes, room):
     """
     Saves or updates a teacher assignment.
@@ -94,12 +93,43 @@ def save_teacher_assignment(db_manager, subject, teacher_name, classes, room):
     
     return db_manager.save_dataframe("Teachers", df)
 
+@perf.timed()
 def get_teacher_assignments(db_manager):
     return db_manager.load_dataframe("Teachers")
 
+@perf.timed()
 def load_timetable(db_manager):
     return db_manager.load_dataframe("Timetable")
 
+@perf.timed()
+def query_timetable(db_manager, week=None, day=None, subject=None, page=1, page_size=50):
+    """
+    Filtered, paginated view of the timetable sorted by Week -> Day -> Period.
+    Filters are resolved on the cached timetable index, so only the requested page is materialized.
+    Returns (page DataFrame, total matching rows)
+    """
+    timetable_df = load_timetable(db_manager)
+    if timetable_df.empty:
+        return timetable_df, 0
+
+    index = get_timetable_index(db_manager)
+    positions = None
+    for key, value in (('by_week', None if week is None else int(week)), ('by_day', day), ('by_subject', subject)):
+        if value is None:
+            continue
+        matched = index[key].get(value, np.empty(0, dtype=np.int64))
+        positions = matched if positions is None else np.intersect1d(positions, matched, assume_unique=True)
+
+    if positions is None:
+        positions = np.arange(len(timetable_df))
+    positions = positions[np.argsort(index['rank'][positions], kind='stable')]
+
+    total = len(positions)
+    start = max(0, (int(page) - 1) * int(page_size))
+    page_df = timetable_df.iloc[positions[start:start + int(page_size)]].copy()
+    return page_df, total
+
+@perf.timed()
 def add_timetable_slot(db_manager, week, date, day, period, subject):
     """
     Adds a subject to a specific Week, Day, Period.
@@ -108,15 +138,11 @@ def add_timetable_slot(db_manager, week, date, day, period, subject):
     df = db_manager.load_dataframe("Timetable")
     if df.empty:
         df = pd.DataFrame(columns=['Week', 'Date', 'Day', 'Period', 'Subject'])
-        
-    # Ensure columns exist (migration)
-    if 'Week' not in df.columns: df['Week'] = 1
-    if 'Date' not in df.columns: df['Date'] = ""
 
     # Check if exactly same entry exists to prevent dupes
     # (Week, Day, Period, Subject) should be unique
     exclude = df[
-        (df['Week'].astype(str) == str(week)) &
+        (df['Week'] == int(week)) &
         (df['Day'] == day) & 
         (df['Period'] == period) & 
         (df['Subject'] == subject)
@@ -130,76 +156,220 @@ def add_timetable_slot(db_manager, week, date, day, period, subject):
     success = db_manager.save_dataframe("Timetable", df)
     return success, "저장 완료"
 
+@perf.timed()
 def delete_timetable_slot(db_manager, week, day, period, subject):
     df = db_manager.load_dataframe("Timetable")
     if df.empty:
         return
-    
-    # Ensure columns
-    if 'Week' not in df.columns: 
-        # If deleting from legacy data (no week), assume week 1?? 
-        # Or just match Day/Period/Subject?
-        # Let's matching stricter if week is provided.
-        # But for safety, match Week if column exists.
-        pass
-
-    condition = (df['Day'] == day) & (df['Period'] == period) & (df['Subject'] == subject)
-    if 'Week' in df.columns:
-        condition = condition & (df['Week'].astype(str) == str(week))
-        
+
+    # Legacy sheets without a Week column load as week 1 (modules/schema.py)
+    condition = (df['Week'] == int(week)) & (df['Day'] == day) & (df['Period'] == int(period)) & (df['Subject'] == subject)
+
     df = df[~condition]
     db_manager.save_dataframe("Timetable", df)
 
+SLOT_KEY_COLS = ['Week', 'Day', 'Period', 'Subject']
+
+def _slot_keys(df):
+    """(Week, Day, Period, Subject) tuples as strings, so Sheets/CSV round-tripped rows still match."""
+    return list(zip(*(df[c].astype(str) for c in SLOT_KEY_COLS)))
+
+@perf.timed()
+def apply_timetable_changes(db_manager, adds=(), deletes=(), check=True):
+    """
+    Adds and deletes many slots with one load and one save.
+    adds: [{'week', 'date', 'day', 'period', 'subject'}, ...]
+    deletes: [{'week', 'day', 'period', 'subject'}, ...]
+    Duplicate additions (inside the batch or against the timetable) are skipped.
+    If check is True and any addition clashes for a student, nothing is saved and the clashes are reported.
+    Returns (success, msg, report) with report = {'added', 'deleted', 'duplicates', 'conflicts'}
+    """
+    report = {'added': 0, 'deleted': 0, 'duplicates': [], 'conflicts': []}
+    df = db_manager.load_dataframe("Timetable")
+    if df.empty:
+        df = pd.DataFrame(columns=['Week', 'Date', 'Day', 'Period', 'Subject'])
+    df = df.copy()
+    if 'Week' not in df.columns: df['Week'] = 1
+    if 'Date' not in df.columns: df['Date'] = ""
+
+    # 1. Deletions as one set-membership mask
+    if deletes:
+        delete_keys = {tuple(str(d[k]) for k in ('week', 'day', 'period', 'subject')) for d in deletes}
+        mask = pd.Series([k in delete_keys for k in _slot_keys(df)], index=df.index, dtype=bool)
+        report['deleted'] = int(mask.sum())
+        df = df[~mask]
+
+    # 2. Additions: drop duplicates against remaining rows and inside the batch
+    existing = set(_slot_keys(df))
+    new_rows = []
+    for a in adds:
+        key = tuple(str(a[k]) for k in ('week', 'day', 'period', 'subject'))
+        if key in existing:
+            report['duplicates'].append(key)
+            continue
+        existing.add(key)
+        new_rows.append({'Week': a['week'], 'Date': a.get('date', ""), 'Day': a['day'], 'Period': a['period'], 'Subject': a['subject']})
+
+    if new_rows:
+        df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
+
+    # 3. Conflicts of the additions against the final state of their cells
+    if check and new_rows:
+        codes = get_enrollment_codes(db_manager)
+        cell_subjects = {}
+        for w, d, p, s in _slot_keys(df):
+            cell_subjects.setdefault((w, d, p), set()).add(s)
+
+        for r in new_rows:
+            cell = (str(r['Week']), str(r['Day']), str(r['Period']))
+            others = np.zeros_like(codes['active'])
+            for o in cell_subjects[cell] - {str(r['Subject'])}:
+                others |= subject_bits(codes, o)
+            clashing = bit_positions(subject_bits(codes, str(r['Subject'])) & others & codes['active'], codes['n'])
+            if len(clashing):
+                students = {codes['sids'][i]: codes['names'][i] for i in clashing}
+                names = [f"{students[sid]}({sid})" for sid in sorted(students)]
+                report['conflicts'].append(f"{r['Week']}주차 {r['Day']} {r['Period']}교시 {r['Subject']}: {', '.join(names)}")
+
+        if report['conflicts']:
+            return False, f"{len(report['conflicts'])}개 배정에서 학생 시간 충돌이 있습니다.", report
+
+    report['added'] = len(new_rows)
+    if not new_rows and not report['deleted']:
+        return True, "변경 사항이 없습니다.", report
+
+    success = db_manager.save_dataframe("Timetable", df)
+    if not success:
+        return False, "저장 실패", report
+    return True, f"추가 {report['added']}건, 삭제 {report['deleted']}건 저장 완료", report
+
+@perf.timed()
+def add_timetable_slots(db_manager, slots, check=True):
+    """Batch variant of add_timetable_slot. slots: [{'week', 'date', 'day', 'period', 'subject'}, ...]"""
+    return apply_timetable_changes(db_manager, adds=slots, check=check)
+
+@perf.timed()
+def delete_timetable_slots(db_manager, slots):
+    """Batch variant of delete_timetable_slot. slots: [{'week', 'day', 'period', 'subject'}, ...]"""
+    return apply_timetable_changes(db_manager, deletes=slots, check=False)
+
+@perf.timed()
+def lock_timetable_slots(db_manager, locks):
+    """
+    Pins or unpins slots (Timetable 'Locked' column, see modules/repair.py) with one save.
+    locks: [{'week', 'day', 'period', 'subject', 'locked'}, ...]
+    Returns (success, msg)
+    """
+    df = db_manager.load_dataframe("Timetable")
+    wanted = {tuple(str(l[k]) for k in ('week', 'day', 'period', 'subject')): bool(l['locked']) for l in locks}
+    if df.empty or not wanted:
+        return True, "변경 사항이 없습니다."
+    locked = [wanted.get(key, old) for key, old in zip(_slot_keys(df), df['Locked'])]
+    changed = int((pd.Series(locked, index=df.index) != df['Locked']).sum())
+    if not changed:
+        return True, "변경 사항이 없습니다."
+    if not db_manager.save_dataframe("Timetable", df.assign(Locked=locked)):
+        return False, "저장 실패"
+    return True, f"{changed}개 배정의 고정 상태를 저장했습니다."
+
+DAY_OFFSETS = {'월': 0, '화': 1, '수': 2, '목': 3, '금': 4, '토': 5, '일': 6}
+
+@perf.timed()
+def replicate_week_pattern(db_manager, source_week, start_week, end_week, term_start=None, holidays=()):
+    """
+    Copies the slot pattern (Day, Period, Subject) of 'source_week' to weeks start_week..end_week.
+    term_start: any date in week 1. Dates are computed from the Monday of that week (MM/DD).
+    holidays: dates to skip. Slots that already exist (Week, Day, Period, Subject) are not duplicated.
+    Built as one cross join + anti join and written with a single save.
+    Returns (success, msg, added_count)
+    """
+    df = db_manager.load_dataframe("Timetable")
+    if df.empty:
+        return False, "복제할 원본 주차의 시간표가 없습니다.", 0
+
+    # Plain values: the new rows mix with user input below, categoricals would reject new values
+    pattern = df[df['Week'] == int(source_week)][['Day', 'Period', 'Subject']].drop_duplicates().astype(object)
+    if pattern.empty:
+        return False, f"{source_week}주차에 배정된 시간표가 없습니다.", 0
+    if end_week < start_week:
+        return False, "종료 주차가 시작 주차보다 앞설 수 없습니다.", 0
+
+    weeks = pd.DataFrame({'Week': range(int(start_week), int(end_week) + 1)})
+    new_rows = weeks.merge(pattern, how='cross')
+
+    if term_start is not None:
+        base = pd.Timestamp(term_start).normalize()
+        base = base - pd.Timedelta(days=base.weekday())
+        offsets = (new_rows['Week'] - 1) * 7 + new_rows['Day'].map(DAY_OFFSETS)
+        dates = base + pd.to_timedelta(offsets, unit='D')
+        if len(holidays):
+            holiday_idx = pd.to_datetime(pd.Series(list(holidays)), errors='coerce').dt.normalize()
+            keep = ~dates.isin(holiday_idx)
+            new_rows, dates = new_rows[keep], dates[keep]
+        new_rows['Date'] = dates.dt.strftime('%m/%d').fillna("")
+    else:
+        new_rows['Date'] = ""
+
+    # Anti join against existing slots on string keys (Sheets/CSV return mixed types)
+    key_cols = ['Week', 'Day', 'Period', 'Subject']
+    existing = df[key_cols].astype(str).drop_duplicates()
+    candidate = new_rows[key_cols].astype(str)
+    merged = candidate.merge(existing, on=key_cols, how='left', indicator=True)
+    new_rows = new_rows[(merged['_merge'] == 'left_only').to_numpy()]
+
+    if new_rows.empty:
+        return True, "추가할 새 시간표가 없습니다. (모두 이미 존재하거나 휴일입니다)", 0
+
+    df = pd.concat([df, new_rows[['Week', 'Date', 'Day', 'Period', 'Subject']]], ignore_index=True)
+    success = db_manager.save_dataframe("Timetable", df)
+    if not success:
+        return False, "저장 실패", 0
+    return True, f"{len(new_rows)}개의 시간표가 추가되었습니다.", len(new_rows)
+
+@perf.timed()
 def check_conflicts(db_manager, week, day, period, new_subject):
     """
     Checks if 'new_subject' at (Week, Day, Period) conflicts with other subjects 
     already scheduled at that time for any student.
     Returns: List of student names/IDs who have overlapping subjects.
     """
-    # 1. Get other subjects at this Week/Day/Period
+    # 1. Get other subjects at this Week/Day/Period (one cell of the occupancy grid)
     timetable_df = load_timetable(db_manager)
     if timetable_df.empty:
         return []
-    
-    # Ensure Week column
-    if 'Week' not in timetable_df.columns:
-        timetable_df['Week'] = 1 # Default legacy to Week 1
-
-    others = timetable_df[
-        (timetable_df['Week'].astype(str) == str(week)) &
-        (timetable_df['Day'] == day) & 
-        (timetable_df['Period'] == period) & 
-        (timetable_df['Subject'] != new_subject)
-    ]['Subject'].unique()
-    
-    if len(others) == 0:
-        return []
-        
-    # 2. Find students who take 'new_subject' AND any of 'others'
-    students_df = db_manager.load_dataframe("Students")
-    if students_df.empty:
-        return []
 
-    conflicting_students = []
-    
-    # Iterate students
-    for _, row in students_df.iterrows():
-        # parsed_subjects is user string "Sub1, Sub2" or list?
-        sub_str = str(row.get('parsed_subjects', ''))
-        student_subs = [s.strip() for s in sub_str.split(',') if s.strip()]
+    others = [s for s in occupancy.cell_subjects(occupancy.get_occupancy(db_manager), week, day, period) if s != new_subject]
+    if not others:
+        return []
         
-        # Check if student takes new_subject
-        if new_subject in student_subs:
-            # Check if student takes any of 'others'
-            for other in others:
-                if other in student_subs:
-                    conflicting_students.append(f"{row['이름']}({row['학번']}) - {other}와 겹침")
-                    break
-                    
-
-    return conflicting_students
+    # 2. Find students who take 'new_subject' AND any of 'others', as bitset operations
+    codes = get_enrollment_codes(db_manager)
+    remaining = subject_bits(codes, new_subject).copy()
+    clashes = []
+    for other in others:
+        # Each student is reported once, with the first clashing subject
+        hit = remaining & subject_bits(codes, other)
+        clashes += [(i, other) for i in bit_positions(hit, codes['n'])]
+        remaining &= ~hit
+
+    clashes.sort()
+    return [f"{codes['names'][i]}({codes['sids'][i]}) - {other}와 겹침" for i, other in clashes]
+
+
+@perf.timed()
+def find_timetable_conflicts(db_manager, week=None):
+    """
+    Students who take two or more of the subjects scheduled in the same (Week, Day, Period)
+    cell (exception students are left out, as in batch saves), from the cached term audit.
+    Returns DataFrame[audit.CONFLICT_COLUMNS], one row per student and cell, '과목' joined with ", ".
+    """
+    rows = audit.get_audit(db_manager)['rows'].copy()
+    if week is not None:
+        rows = rows[rows['주차'] == int(week)].reset_index(drop=True)
+    return rows
 
 
+@perf.timed()
 def generate_student_timetable(db_manager, student_id, week=None):
     """
     Generates personal timetable for a student.
@@ -209,102 +379,242 @@ def generate_student_timetable(db_manager, student_id, week=None):
     students_df = db_manager.load_dataframe("Students")
     if students_df.empty:
         return None, "학생 데이터가 없습니다.", None
-        
-    student = students_df[students_df['학번'].astype(str) == str(student_id)]
-    if student.empty:
+
+    codes = get_enrollment_codes(db_manager)
+    i = codes['student_code'].get(str(student_id))
+    if i is None:
         return None, "해당 학번의 학생을 찾을 수 없습니다.", None
-        
-    row = student.iloc[0]
-    if row.get('is_exception'): 
-        is_exc = row.get('is_exception')
-        if is_exc == True or str(is_exc).upper() == 'TRUE':
-             return None, "예외처리된 학생이므로 시간표가 없습니다.", None
-    
-    # Parse subjects
-    sub_str = str(row.get('parsed_subjects', ''))
-    failed_subjects = [s.strip() for s in sub_str.split(',') if s.strip()]
-    
-    if not failed_subjects:
+    if codes['exception'][i]:
+        return None, "예외처리된 학생이므로 시간표가 없습니다.", None
+
+    # Failed subjects as subject codes (CSR slice)
+    failed_subjects = codes['subject_codes'][codes['offsets'][i]:codes['offsets'][i + 1]]
+    if not len(failed_subjects):
         return None, "미도달 과목이 없습니다.", None
-        
-    # Student Class Info
-    s_grade = str(row['학년'])
-    s_class = str(row['반'])
-    full_class = f"{s_grade}-{s_class}"
-    
+
     # 2. Get Master Timetable
     timetable_df = load_timetable(db_manager)
     if timetable_df.empty:
          return pd.DataFrame(), "전체 시간표가 아직 편성되지 않았습니다.", None
-         
-    # Ensure Week/Date
-    if 'Week' not in timetable_df.columns: timetable_df['Week'] = 1
-    if 'Date' not in timetable_df.columns: timetable_df['Date'] = ""
 
-    # Filter by Week if requested
+    # Only the slots of subjects the student failed (and of the requested week)
+    slot_subjects = get_timetable_subject_codes(db_manager)
+    mask = np.isin(slot_subjects, failed_subjects)
     if week:
-        timetable_df = timetable_df[timetable_df['Week'].astype(str) == str(week)]
+        mask &= timetable_df['Week'].to_numpy() == int(week)
+    slots = timetable_df[mask]
+    slot_subjects = slot_subjects[mask]
+
+    # 3. Teacher/room of the student's class per subject; the allocator (Room Assignment) overrides the room
+    assign = get_assignment_codes(db_manager)
+    student_class = codes['student_class'][i]
+    teacher_codes = assign['teacher'][slot_subjects, student_class]
+    room_codes = assign['room'][slot_subjects, student_class]
+    room_lookup = get_room_lookup(db_manager)
 
-    # 3. Get Teacher Assignments
-    teachers_df = db_manager.load_dataframe("Teachers")
-    
     personal_schedule = []
-    
-    for _, slot in timetable_df.iterrows():
-        t_week = slot['Week']
-        t_date = slot['Date']
-        t_day = slot['Day']
-        t_period = slot['Period']
-        t_subject = slot['Subject']
-        
-        # Only relevant if student failed this subject
-        if t_subject in failed_subjects:
-            matched_teacher = "미배정"
-            matched_room = ""
-            
-            if not teachers_df.empty:
-                candidates = teachers_df[teachers_df['Subject'] == t_subject]
-                for _, t_row in candidates.iterrows():
-                    assigned_str = str(t_row['AssignedClasses'])
-                    assigned_list = [c.strip() for c in assigned_str.split(',')]
-                    
-                    if full_class in assigned_list:
-                        matched_teacher = t_row['TeacherName']
-                        matched_room = t_row.get('Room', '')
-                        break
-            
-            personal_schedule.append({
-                '주차': t_week,
-                '날짜': t_date,
-                '요일': t_day,
-                '교시': t_period,
-                '과목': t_subject,
-                '담당교사': matched_teacher,
-                '장소': matched_room
-            })
-            
+    for t_week, t_date, t_day, t_period, t_subject, t, r in zip(
+        slots['Week'], slots['Date'], slots['Day'], slots['Period'], slots['Subject'], teacher_codes, room_codes
+    ):
+        matched_teacher = assign['teachers'][t] if t >= 0 else "미배정"
+        matched_room = assign['rooms'][r] if r >= 0 else ""
+        matched_room = room_lookup.get(
+            (str(t_week), t_day, str(t_period), t_subject, matched_teacher), matched_room
+        )
+        personal_schedule.append({
+            '주차': t_week,
+            '날짜': t_date,
+            '요일': t_day,
+            '교시': t_period,
+            '과목': t_subject,
+            '담당교사': matched_teacher,
+            '장소': matched_room
+        })
+
     if not personal_schedule:
         return pd.DataFrame(), "배정된 시간표가 없습니다.", None
         
-    # Sort
-    day_order = {'월': 1, '화': 2, '수': 3, '목': 4, '금': 5}
-    
+    # Sort by Week -> Day -> Period (Week/Period are ints, Day ranks through DAY_ORDER)
     schedule_df = pd.DataFrame(personal_schedule)
-    schedule_df['DayKey'] = schedule_df['요일'].map(day_order)
-    schedule_df['PeriodKey'] = schedule_df['교시'].astype(int)
-    # Sort by Week -> Day -> Period
-    # Assuming Week is int? or convert to int
-    try:
-        schedule_df['WeekKey'] = schedule_df['주차'].astype(int)
-    except:
-        schedule_df['WeekKey'] = 1 # Fallback
-
-    schedule_df = schedule_df.sort_values(['WeekKey', 'DayKey', 'PeriodKey'])
+    schedule_df['DayKey'] = schedule_df['요일'].map(DAY_ORDER)
+    schedule_df = schedule_df.sort_values(['주차', 'DayKey', '교시'])
     schedule_df = schedule_df[['주차', '날짜', '요일', '교시', '과목', '담당교사', '장소']]
     
-    return schedule_df, "생성 완료", row.get('이름', '')
+    return schedule_df, "생성 완료", codes['names'][i]
 
 
+SCHEDULE_COLUMNS = ['학번', '이름', '학년', '반', '번호', '주차', '날짜', '요일', '교시', '과목', '담당교사', '장소']
+ROSTER_COLUMNS = ['학번', '이름', '학년', '반', '번호']
+
+
+def get_timetable_subject_codes(db_manager):
+    """Enrollment subject code of every Timetable row (-1 for subjects nobody takes), cached per data version."""
+    students_df = db_manager.load_dataframe("Students")
+    timetable_df = load_timetable(db_manager)
+    if 'Subject' not in timetable_df.columns:
+        return np.zeros(len(timetable_df), dtype=np.int32)
+    return get_cached(
+        db_manager, "timetable_subject_codes", (students_df, timetable_df),
+        lambda: encode_subjects(timetable_df['Subject'], get_enrollment_codes(db_manager)['subject_code']),
+    )
+
+
+def _build_enrolled(students_df, codes, assign):
+    """
+    One row per (student, subject) with the (subject, class) teacher and default room attached,
+    ordered by grade, class, student. Built from the CSR arrays: exception students, students
+    without subjects and repeated 학번 rows are left out. '_sub' is the subject code.
+    """
+    n = codes['n']
+    if not n:
+        return pd.DataFrame(columns=['학번', '이름', '학년', '반', '번호', 'class', '과목', '담당교사', '기본장소', '_sub'])
+    keep = np.zeros(n, dtype=bool)
+    keep[bit_positions(codes['active'], n)] = True
+    first = np.zeros(n, dtype=bool)
+    first[list(codes['student_code'].values())] = True
+    keep &= first
+
+    owner = np.repeat(np.arange(n), np.diff(codes['offsets']))
+    rows = keep[owner]
+    owner, sub = owner[rows], codes['subject_codes'][rows]
+    cls = codes['student_class'][owner]
+    teacher, room = assign['teacher'][sub, cls], assign['room'][sub, cls]
+
+    def decode(vocab, values, missing):
+        # Code -1 picks the trailing 'missing' value
+        return np.array(list(vocab) + [missing], dtype=object)[values]
+
+    enrolled = pd.DataFrame({
+        '학번': codes['sids'][owner],
+        '이름': codes['names'][owner],
+        '학년': students_df['학년'].to_numpy(dtype=object)[owner],
+        '반': students_df['반'].to_numpy(dtype=object)[owner],
+        '번호': students_df['번호'].to_numpy(dtype=object)[owner],
+        'class': decode(codes['classes'], cls, ""),
+        '과목': decode(codes['subjects'], sub, ""),
+        '담당교사': decode(assign['teachers'], teacher, "미배정"),
+        '기본장소': decode(assign['rooms'], room, ""),
+        '_sub': sub,
+    })
+    order = pd.DataFrame({
+        'g': pd.to_numeric(enrolled['학년'], errors='coerce'), 'gs': enrolled['학년'],
+        'c': pd.to_numeric(enrolled['반'], errors='coerce'), 'cs': enrolled['반'],
+        'sid': enrolled['학번'],
+    }).sort_values(['g', 'gs', 'c', 'cs', 'sid'], kind='stable').index
+    return enrolled.loc[order].reset_index(drop=True)
+
+
+def get_enrolled(db_manager):
+    """(student, subject, teacher) rows for the loaded Students/Teachers sheets (cached per data version)."""
+    students_df = db_manager.load_dataframe("Students")
+    teachers_df = db_manager.load_dataframe("Teachers")
+    return get_cached(
+        db_manager, "enrolled", (students_df, teachers_df),
+        lambda: _build_enrolled(students_df, get_enrollment_codes(db_manager), get_assignment_codes(db_manager)),
+    )
+
+
+def _build_all_student_schedules(enrolled, timetable_df, slot_subjects, room_lookup):
+    """
+    Joins the enrolled rows with the Timetable sheet on the integer subject code
+    ('slot_subjects', aligned with the timetable rows) and applies room overrides.
+    """
+    if enrolled.empty or timetable_df.empty:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS)
+
+    slots = timetable_df.reindex(columns=['Week', 'Date', 'Day', 'Period', 'Subject']).rename(
+        columns={'Week': '주차', 'Date': '날짜', 'Day': '요일', 'Period': '교시', 'Subject': '과목'})
+    if 'Week' not in timetable_df.columns:
+        slots['주차'] = 1
+    if 'Date' not in timetable_df.columns:
+        slots['날짜'] = ""
+    slots['_order'] = np.arange(len(slots))
+    slots['_sub'] = slot_subjects
+    # Plain text like the rest of the frame (exports group and compare on it)
+    slots['과목'] = slots['과목'].astype(object)
+    df = enrolled.drop(columns='과목').reset_index().rename(columns={'index': '_student'}).merge(slots, on='_sub', how='inner')
+    if df.empty:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS)
+
+    df['장소'] = [
+        room_lookup.get((str(w), d, str(p), sub, t), default)
+        for w, d, p, sub, t, default in zip(df['주차'], df['요일'], df['교시'], df['과목'], df['담당교사'], df['기본장소'])
+    ] if room_lookup else df['기본장소']
+
+    # 'enrolled' is already in grade/class/student order; its row number keeps that order
+    df['_student'] = df.groupby('학번', sort=False)['_student'].transform('min')
+    df['_day'] = df['요일'].astype(object).map(DAY_ORDER)
+    df = df.sort_values(['_student', '주차', '_day', '교시', '_order'], kind='stable')
+    return df[SCHEDULE_COLUMNS].reset_index(drop=True)
+
+
+@perf.timed()
+def get_all_student_schedules(db_manager, week=None):
+    """
+    Every student's timetable in one frame (one row per student and class slot), built
+    with a single join instead of one generate_student_timetable() call per student.
+    Rows are ordered by grade, class, student, then Week -> Day -> Period.
+    Cached per data version of Students/Teachers/Timetable/RoomSchedule.
+    """
+    students_df = db_manager.load_dataframe("Students")
+    teachers_df = db_manager.load_dataframe("Teachers")
+    timetable_df = load_timetable(db_manager)
+    room_df = db_manager.load_dataframe("RoomSchedule")
+    df = get_cached(
+        db_manager, "all_student_schedules", (students_df, teachers_df, timetable_df, room_df),
+        lambda: _build_all_student_schedules(
+            get_enrolled(db_manager), timetable_df, get_timetable_subject_codes(db_manager), get_room_lookup(db_manager)),
+    )
+    if week:
+        df = df[df['주차'] == int(week)]
+    return df
+
+
+def _build_rosters(enrolled, schedules):
+    """
+    Attendance lists for every (teacher, subject) and every (teacher, subject, week, day, period)
+    slot, as row positions into 'enrolled' / 'schedules'. Key parts are str() so Sheets/CSV
+    round trips still match.
+    """
+    def positions(df, keys):
+        if df.empty:
+            return {}
+        return df[keys].astype(str).groupby(keys, sort=False).indices
+
+    by_slot = positions(schedules, ['담당교사', '과목', '주차', '요일', '교시'])
+    slots_by_group = {}
+    for key in by_slot:
+        slots_by_group.setdefault(key[:2], []).append(key)
+    return {
+        'enrolled': enrolled,
+        'schedules': schedules,
+        'by_group': positions(enrolled, ['담당교사', '과목']),
+        'by_slot': by_slot,
+        'slots_by_group': slots_by_group,
+    }
+
+
+def get_rosters(db_manager):
+    """Roster index for every class slot of the term (cached per data version)."""
+    enrolled = get_enrolled(db_manager)
+    schedules = get_all_student_schedules(db_manager)
+    return get_cached(db_manager, "rosters", (enrolled, schedules), lambda: _build_rosters(enrolled, schedules))
+
+
+def iter_slot_rosters(db_manager, teacher_name=None):
+    """
+    Yields ((teacher, subject, week, day, period), students DataFrame) for every scheduled
+    class slot of the term, optionally for one teacher only; for exporting all rosters at once.
+    """
+    rosters = get_rosters(db_manager)
+    schedules = rosters['schedules']
+    for key, pos in rosters['by_slot'].items():
+        if key[0] == "미배정" or (teacher_name is not None and key[0] != str(teacher_name)):
+            continue
+        yield key, schedules.iloc[pos][ROSTER_COLUMNS].reset_index(drop=True)
+
+
+@perf.timed()
 def get_teacher_schedule(db_manager, teacher_name):
     """
     Returns DataFrame of teacher's schedule.
@@ -325,92 +635,59 @@ def get_teacher_schedule(db_manager, teacher_name):
     if timetable_df.empty:
          return pd.DataFrame()
 
-    # Ensure columns
-    if 'Week' not in timetable_df.columns: timetable_df['Week'] = 1
-    if 'Date' not in timetable_df.columns: timetable_df['Date'] = ""
-          
     teacher_schedule = timetable_df[timetable_df['Subject'].isin(my_subjects)].copy()
     
     # Add Room info?
     # Teacher room is in 'my_assignments'
     # Map subject -> Room
     sub_room_map = my_assignments.set_index('Subject')['Room'].to_dict()
-    teacher_schedule['장소'] = teacher_schedule['Subject'].map(sub_room_map)
-    
-    # Sort
-    day_order = {'월': 1, '화': 2, '수': 3, '목': 4, '금': 5}
-    teacher_schedule['DayKey'] = teacher_schedule['Day'].map(day_order)
-    teacher_schedule['PeriodKey'] = teacher_schedule['Period'].astype(int)
-    try:
-        teacher_schedule['WeekKey'] = teacher_schedule['Week'].astype(int)
-    except:
-        teacher_schedule['WeekKey'] = 1
-
-    teacher_schedule = teacher_schedule.sort_values(['WeekKey', 'DayKey', 'PeriodKey'])
+    teacher_schedule['장소'] = teacher_schedule['Subject'].astype(object).map(sub_room_map)
+    room_lookup = get_room_lookup(db_manager)
+    if room_lookup:
+        teacher_schedule['장소'] = [
+            room_lookup.get((str(w), d, str(p), sub, teacher_name), default)
+            for w, d, p, sub, default in zip(
+                teacher_schedule['Week'], teacher_schedule['Day'], teacher_schedule['Period'],
+                teacher_schedule['Subject'], teacher_schedule['장소']
+            )
+        ]
+    
+    # Sort (Day is an ordered categorical, so it sorts 월 -> 금)
+    teacher_schedule = teacher_schedule.sort_values(['Week', 'Day', 'Period'])
     
     return teacher_schedule[['Week', 'Date', 'Day', 'Period', 'Subject', '장소']]
 
-def get_students_for_class_slot(db_manager, teacher_name, subject, day=None, period=None):
+@perf.timed()
+def get_students_for_class_slot(db_manager, teacher_name, subject, day=None, period=None, week=None):
     """
-    Returns list of students who should attend this class slot.
-    Logic: 
-    1. Find Teacher's Assigned Classes for this Subject.
-    2. Find Students in those classes who failed this Subject.
+    Returns the students who should attend this teacher's class.
+    Without day/period/week: everyone the teacher teaches this subject to (by class assignment).
+    With any of them: only the students of the matching scheduled slots (empty if none match).
+    Served from the cached roster index, so no per-call scan of the Students sheet.
     """
-    # 1. Get Teacher's assigned classes
-    teachers_df = db_manager.load_dataframe("Teachers")
-    if teachers_df.empty:
-        return pd.DataFrame()
-    
-    # Filter by Teacher and Subject
-    assignment = teachers_df[
-        (teachers_df['TeacherName'] == teacher_name) & 
-        (teachers_df['Subject'] == subject)
+    rosters = get_rosters(db_manager)
+    group = (str(teacher_name), str(subject))
+
+    if day is None and period is None and week is None:
+        pos = rosters['by_group'].get(group)
+        if pos is None:
+            return pd.DataFrame()
+        return rosters['enrolled'].iloc[pos][ROSTER_COLUMNS].reset_index(drop=True)
+
+    keys = [
+        k for k in rosters['slots_by_group'].get(group, [])
+        if (week is None or k[2] == str(week)) and (day is None or k[3] == str(day)) and (period is None or k[4] == str(period))
     ]
-    
-    if assignment.empty:
+    if not keys:
         return pd.DataFrame()
-        
-    s_classes_str = str(assignment.iloc[0]['AssignedClasses'])
-    target_classes = [c.strip() for c in s_classes_str.split(',')]
-    
-    # 2. Filter Students
-    students_df = db_manager.load_dataframe("Students")
-    if students_df.empty:
-        return pd.DataFrame()
-        
-    matched_students = []
-    for _, row in students_df.iterrows():
-        # Check Exception
-        is_exc = row.get('is_exception')
-        if is_exc == True or str(is_exc).upper() == 'TRUE':
-             continue
-             
-        # Check Class
-        s_grade = str(row['학년'])
-        s_class = str(row['반'])
-        full_class = f"{s_grade}-{s_class}"
-        
-        if full_class in target_classes:
-            # Check Subject Failure
-            sub_str = str(row.get('parsed_subjects', ''))
-            failed_subjects = [s.strip() for s in sub_str.split(',') if s.strip()]
-            
-            if subject in failed_subjects:
-                matched_students.append({
-                    '학번': row['학번'],
-                    '이름': row['이름'],
-                    '학년': s_grade,
-                    '반': s_class,
-                    '번호': row['번호']
-                })
-                
-    return pd.DataFrame(matched_students)
+    pos = np.unique(np.concatenate([rosters['by_slot'][k] for k in keys]))
+    return rosters['schedules'].iloc[pos][ROSTER_COLUMNS].drop_duplicates('학번').reset_index(drop=True)
 
+@perf.timed()
 def format_student_timetable_grid(schedule_df, student_info=None):
     """
     Transforms the list-based schedule DataFrame into an HTML grid (Timetable) format.
-    student_info: dict {'id': '...', 'name': '...'}
+    student_info: dict {'id': '...', 'name': '...', 'period_times': {...}, 'shape': occupancy grid shape}
     """
     if schedule_df.empty:
         return "<p>시간표 데이터가 없습니다.</p>"
@@ -434,38 +711,24 @@ def format_student_timetable_grid(schedule_df, student_info=None):
         
         return txt + details
 
-    schedule_df = schedule_df.copy()
-    schedule_df['Cell'] = schedule_df.apply(format_cell, axis=1)
-    
-    # Ensure '교시' is int for correct reindexing
-    schedule_df['교시'] = schedule_df['교시'].astype(int)
-    
-    # Identify Weeks
+    # Cells are filled straight from the rows; days/periods follow the configured grid shape
+    shape = (student_info or {}).get('shape') or occupancy.DEFAULT_SHAPE
+    days, periods = shape['days'], shape['periods']
     week_col = '주차' if '주차' in schedule_df.columns else 'Week'
-    
-    if week_col in schedule_df.columns:
-        unique_weeks = sorted(schedule_df[week_col].unique())
-    else:
-        unique_weeks = [1] # Default if no week info
-        
-    full_html = ""
-    
-    days = ["월", "화", "수", "목", "금"]
-    periods = range(1, 8)
+    by_week = {}
+    for row in schedule_df.to_dict('records'):
+        by_week.setdefault(row.get(week_col, 1), []).append(row)
 
     sid = student_info.get('id', '') if student_info else ''
     name = student_info.get('name', '') if student_info else ''
+    day_width = f"{90 / max(1, len(days)):.0f}%"
+
+    full_html = ""
+    for week in sorted(by_week):
+        cells = {}
+        for row in by_week[week]:
+            cells.setdefault((int(row['교시']), row['요일']), []).append(format_cell(row))
 
-    for week in unique_weeks:
-        # Filter for current week
-        if week_col in schedule_df.columns:
-            week_df = schedule_df[schedule_df[week_col] == week]
-        else:
-            week_df = schedule_df
-            
-        if week_df.empty:
-            continue
-            
         week_label = f"({week}주차)"
         
         # Header HTML
@@ -480,26 +743,15 @@ def format_student_timetable_grid(schedule_df, student_info=None):
 </div>
 </div>
 """
-        # Grid Generation
-        # Pivot: Index=Periods, Columns=Days
-        pivot_table = week_df.pivot_table(
-            index='교시', columns='요일', values='Cell', 
-            aggfunc=lambda x: '<br><hr style="margin:2px 0;">'.join(x)
-        )
-        
-        # Generte HTML Table manually to ensure correct layout
         # IMPORTANT: Do not indent the HTML tags inside the string, or Streamlit will treat them as code blocks!
         table_html = """
 <table style="width:100%; border-collapse: collapse; text-align: center; border: 1px solid #ddd; color: black; margin-bottom: 30px;">
 <thead>
 <tr style="background-color: #f2f2f2; border: 1px solid #ddd;">
 <th style="padding: 10px; border: 1px solid #ddd; width: 10%;">교시</th>
-<th style="padding: 10px; border: 1px solid #ddd; width: 18%;">월</th>
-<th style="padding: 10px; border: 1px solid #ddd; width: 18%;">화</th>
-<th style="padding: 10px; border: 1px solid #ddd; width: 18%;">수</th>
-<th style="padding: 10px; border: 1px solid #ddd; width: 18%;">목</th>
-<th style="padding: 10px; border: 1px solid #ddd; width: 18%;">금</th>
-</tr>
+"""
+        table_html += "".join(f'<th style="padding: 10px; border: 1px solid #ddd; width: {day_width};">{d}</th>\n' for d in days)
+        table_html += """</tr>
 </thead>
 <tbody>
 """
@@ -519,16 +771,10 @@ def format_student_timetable_grid(schedule_df, student_info=None):
             
             table_html += f"<tr><td style='border: 1px solid #ddd; font-weight:bold; background-color:#fafafa;'>{p_label}</td>"
             for d in days:
-                cell_content = ""
-                try:
-                    if p in pivot_table.index and d in pivot_table.columns:
-                        val = pivot_table.loc[p, d]
-                        if pd.notna(val):
-                            cell_content = val
-                except KeyError:
-                    pass
-                
-                table_html += f"<td style='padding: 8px; border: 1px solid #ddd; vertical-align: middle; height: 80px;'>{cell_content}</td>"
+                # Periods past the day's last one are shaded
+                shade = " background-color:#f0f0f0;" if p > shape['periods_per_day'][d] else ""
+                cell_content = '<br><hr style="margin:2px 0;">'.join(cells.get((p, d), []))
+                table_html += f"<td style='padding: 8px; border: 1px solid #ddd; vertical-align: middle; height: 80px;{shade}'>{cell_content}</td>"
             table_html += "</tr>"
             
         table_html += "</tbody></table>"
@@ -543,50 +789,25 @@ def format_student_timetable_grid(schedule_df, student_info=None):
     return full_html
 
 
-def get_students_in_class(db_manager, grade, class_num):
+@perf.timed()
+def get_students_in_class(db_manager, grade, class_num=None):
     """
     Fetches list of students in a specific Grade-Class who need timetables (not exceptioned, has failed items).
+    class_num=None returns the whole grade.
     Returns list of dicts: [{'학번': '...', '이름': '...'}, ...]
     """
-    students_df = db_manager.load_dataframe("Students")
-    if students_df.empty:
-        return []
-        
-    targets = []
-    # Ensure Types
-    students_df['학년'] = students_df['학년'].astype(str)
-    students_df['반'] = students_df['반'].astype(str)
-    
+    # The enrollment index already leaves out exception students and students without failed subjects
     grade = str(grade)
-    class_num = str(class_num)
-    
-    for _, row in students_df.iterrows():
-        # Check Grade/Class
-        if row['학년'] != grade or row['반'] != class_num:
-            continue
-            
-        # Check Exception
-        is_exc = row.get('is_exception')
-        if is_exc == True or str(is_exc).upper() == 'TRUE':
-             continue
-             
-        # Check parsed_subjects (if empty, no need for timetable)
-        sub_str = str(row.get('parsed_subjects', ''))
-        failed_subjects = [s.strip() for s in sub_str.split(',') if s.strip()]
-        
-        if not failed_subjects:
-            continue
-            
-        targets.append({
-            '학번': row['학번'],
-            '이름': row['이름']
-        })
-        
-    # Sort by Student ID
+    class_num = None if class_num is None else str(class_num)
+    targets = [
+        {'학번': sid, '이름': info['이름']}
+        for sid, info in get_enrollment_index(db_manager)['students'].items()
+        if info['학년'] == grade and (class_num is None or info['반'] == class_num)
+    ]
     targets.sort(key=lambda x: x['학번'])
-    
     return targets
 
+@perf.timed()
 def load_period_times(db_manager):
     """
     Loads period times from 'Settings_PeriodTimes' sheet.
@@ -626,6 +847,7 @@ def load_period_times(db_manager):
     except Exception:
         return defaults
 
+@perf.timed()
 def save_period_times(db_manager, times_dict):
     """
     Saves period times dict to 'Settings_PeriodTimes' sheet.
@@ -0,0 +1,167 @@
+"""
+Dense weeks × days × periods view of the master timetable.
+
+The grid shape (school days and the number of periods on each day) comes from the
+'Settings_Grid' sheet and defaults to 월~금 with 7 periods. build_occupancy() lays the
+Timetable rows out once per data version: per cell, the number of classes, a bitset of
+the subjects and the timetable rows in sheet order. Grid views, conflict checks and
+renderers read cells from it directly instead of pivoting the long frame.
+"""
+import numpy as np
+import pandas as pd
+
+from modules import perf
+from modules.indexes import DAY_ORDER, get_cached
+
+DEFAULT_DAYS = ["월", "화", "수", "목", "금"]
+DEFAULT_PERIODS = 7
+
+
+def _shape(periods_per_day):
+    days = list(periods_per_day)
+    return {
+        'days': days,
+        'periods': list(range(1, max(periods_per_day.values(), default=0) + 1)),
+        'periods_per_day': dict(periods_per_day),
+    }
+
+
+DEFAULT_SHAPE = _shape({d: DEFAULT_PERIODS for d in DEFAULT_DAYS})
+
+
+def load_grid_shape(db_manager):
+    """
+    School days and periods from the 'Settings_Grid' sheet (Day, Periods; one row per day, in order).
+    Returns {'days': [...], 'periods': [1..max], 'periods_per_day': {day: n}}.
+    """
+    df = db_manager.load_dataframe("Settings_Grid")
+    if df.empty or 'Day' not in df.columns:
+        return DEFAULT_SHAPE
+    periods_per_day = {
+        d: int(n) for d, n in zip(df['Day'], df['Periods']) if str(d).strip() and int(n) > 0
+    }
+    return _shape(periods_per_day) if periods_per_day else DEFAULT_SHAPE
+
+
+@perf.timed()
+def save_grid_shape(db_manager, periods_per_day):
+    """Saves {day: number of periods} (in display order) to the 'Settings_Grid' sheet."""
+    df = pd.DataFrame([{'Day': d, 'Periods': int(n)} for d, n in periods_per_day.items()], columns=['Day', 'Periods'])
+    return db_manager.save_dataframe("Settings_Grid", df)
+
+
+def build_occupancy(timetable_df, shape):
+    """
+    Lays the Timetable rows out on a [week, day, period] grid.
+    The day axis is the configured days plus any other day found in the sheet, and the
+    period axis runs to the larger of the configured and the scheduled maximum, so no
+    row is dropped; 'valid' marks the cells of the configured grid.
+    Returns dict:
+        'weeks' / 'days' / 'periods': axis values, with 'week_index' / 'day_index' / 'period_index'
+        'subjects': subject vocabulary; 'row_subject': subject code per timetable row
+        'count': int32 [W, D, P] classes per cell
+        'bits': uint64 [W, D, P, words] subject bitsets per cell
+        'cell_offsets', 'cell_rows': CSR of timetable row positions per flattened cell, in sheet order
+        'valid': bool [D, P]
+    """
+    n = len(timetable_df)
+    if n and 'Subject' in timetable_df.columns:
+        weeks = sorted(timetable_df['Week'].unique().tolist())
+        found = timetable_df['Day'].astype(object).unique().tolist()
+        days = shape['days'] + sorted((d for d in found if d not in shape['days']), key=lambda d: (DAY_ORDER.get(d, 9), d))
+        max_period = max(len(shape['periods']), int(timetable_df['Period'].max()))
+        row_subject, subjects = pd.factorize(timetable_df['Subject'].astype(object))
+    else:
+        weeks, days, max_period = [], list(shape['days']), len(shape['periods'])
+        row_subject, subjects = np.zeros(0, dtype=np.int64), []
+        n = 0
+    periods = list(range(1, max_period + 1))
+    W, D, P = len(weeks), len(days), len(periods)
+
+    valid = np.zeros((D, P), dtype=bool)
+    for i, d in enumerate(shape['days']):
+        valid[i, :shape['periods_per_day'][d]] = True
+
+    words = max(1, (len(subjects) + 63) // 64)
+    count = np.zeros(W * D * P, dtype=np.int32)
+    bits = np.zeros((W * D * P, words), dtype='<u8')
+    cell_rows = np.zeros(0, dtype=np.int64)
+    if n:
+        w = pd.Index(weeks).get_indexer(timetable_df['Week'])
+        d = pd.Index(days).get_indexer(timetable_df['Day'].astype(object))
+        p = timetable_df['Period'].to_numpy(dtype=np.int64) - 1
+        rows = np.flatnonzero(p >= 0)  # Period 0 is the schema default for a blank/invalid period
+        cell = (w[rows] * D + d[rows]) * P + p[rows]
+        cell_rows = rows[np.argsort(cell, kind='stable')]
+        count = np.bincount(cell, minlength=W * D * P).astype(np.int32)
+        codes = row_subject[rows].astype(np.int64)
+        np.bitwise_or.at(bits, (cell, codes >> 6), np.left_shift(np.uint64(1), (codes & 63).astype('<u8')))
+    cell_offsets = np.zeros(W * D * P + 1, dtype=np.int64)
+    np.cumsum(count, out=cell_offsets[1:])
+
+    return {
+        'weeks': weeks, 'days': days, 'periods': periods,
+        'week_index': {v: i for i, v in enumerate(weeks)},
+        'day_index': {v: i for i, v in enumerate(days)},
+        'period_index': {v: i for i, v in enumerate(periods)},
+        'subjects': list(subjects),
+        'row_subject': np.asarray(row_subject),
+        'count': count.reshape(W, D, P),
+        'bits': bits.reshape(W, D, P, words),
+        'cell_offsets': cell_offsets,
+        'cell_rows': cell_rows,
+        'valid': valid,
+    }
+
+
+def get_occupancy(db_manager):
+    """Occupancy grid for the loaded Timetable and Settings_Grid sheets (cached per data version)."""
+    timetable_df = db_manager.load_dataframe("Timetable")
+    settings_df = db_manager.load_dataframe("Settings_Grid")
+    return get_cached(
+        db_manager, "occupancy", (timetable_df, settings_df),
+        lambda: build_occupancy(timetable_df, load_grid_shape(db_manager)),
+    )
+
+
+def _cell(occ, week, day, period):
+    """Flattened cell number, or None if the cell is not on the grid."""
+    try:
+        w = occ['week_index'].get(int(week))
+        p = occ['period_index'].get(int(period))
+    except (TypeError, ValueError):
+        return None
+    d = occ['day_index'].get(day)
+    if w is None or d is None or p is None:
+        return None
+    return (w * len(occ['days']) + d) * len(occ['periods']) + p
+
+
+def cell_rows(occ, week, day, period):
+    """Timetable row positions scheduled at (week, day, period), in sheet order."""
+    c = _cell(occ, week, day, period)
+    if c is None:
+        return occ['cell_rows'][:0]
+    return occ['cell_rows'][occ['cell_offsets'][c]:occ['cell_offsets'][c + 1]]
+
+
+def cell_subjects(occ, week, day, period):
+    """Distinct subjects scheduled at (week, day, period), in sheet order."""
+    codes = occ['row_subject'][cell_rows(occ, week, day, period)]
+    return [occ['subjects'][c] for c in dict.fromkeys(codes.tolist())]
+
+
+def week_grid(occ, week, shape, sep=", "):
+    """
+    Text grid of one week for the configured days/periods (rows = periods, columns = days),
+    each cell holding its subjects joined with 'sep'. Cells beyond a day's last period are "".
+    """
+    grid = pd.DataFrame("", index=pd.Index(shape['periods'], name='Period'), columns=pd.Index(shape['days'], name='Day'))
+    w = occ['week_index'].get(week)
+    if w is None:
+        return grid
+    for d in shape['days']:
+        for p in range(1, shape['periods_per_day'][d] + 1):
+            if occ['count'][w, occ['day_index'][d], p - 1]:
+                grid.at[p, d] = sep.join(occ['subjects'][c] for c in occ['row_subject'][cell_rows(occ, week, d, p)])
+    return grid
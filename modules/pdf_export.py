@@ -0,0 +1,273 @@
+"""
+Server-side A4 PDFs for student timetables and teacher class rosters (reportlab).
+
+Korean text is drawn with an embedded TrueType font, so the PDFs print the same on
+any viewer: TIMETABLE_PDF_FONT=<path to .ttf> if set, otherwise the first of
+FONT_CANDIDATES found (packages.txt installs NanumGothic on Streamlit Cloud). Only
+when no font file exists does it fall back to reportlab's CID font HYGothic-Medium,
+which is not embedded and relies on the viewer's Korean fonts. Fonts and paragraph
+styles are set up once per process, and the timetable grid is drawn once per document
+and reused on every page.
+"""
+import io
+import os
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas as pdf_canvas
+from reportlab.platypus import BaseDocTemplate, Frame, PageBreak, PageTemplate, Paragraph, Spacer, Table, TableStyle
+from xml.sax.saxutils import escape
+
+from modules import occupancy
+
+MARGIN = 15 * mm
+TIMETABLE_TITLE = "최소 성취수준 보장지도 보충지도 시간표"
+FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",  # Debian/Ubuntu fonts-nanum
+    "/usr/share/fonts/nanum/NanumGothic.ttf",
+    "C:/Windows/Fonts/malgun.ttf",
+    "/System/Library/Fonts/Supplemental/AppleGothic.ttf",
+]
+DEFAULT_PERIOD_TIMES = {1: "08:40~09:30", 2: "09:40~10:30", 3: "10:40~11:30", 4: "11:40~12:30",
+                        5: "13:30~14:20", 6: "14:30~15:20", 7: "15:30~16:20"}
+
+
+@lru_cache(maxsize=None)
+def font_name():
+    """Registers the document font once and returns its name."""
+    for path in [os.environ.get("TIMETABLE_PDF_FONT")] + FONT_CANDIDATES:
+        if path and os.path.exists(path):
+            pdfmetrics.registerFont(TTFont("TimetableFont", path))
+            return "TimetableFont"
+    pdfmetrics.registerFont(UnicodeCIDFont("HYGothic-Medium"))
+    return "HYGothic-Medium"
+
+
+@lru_cache(maxsize=None)
+def _styles():
+    font = font_name()
+    return {
+        'title': ParagraphStyle('title', fontName=font, fontSize=18, leading=24, alignment=TA_CENTER, spaceAfter=4 * mm),
+        'head': ParagraphStyle('head', fontName=font, fontSize=11, leading=14, alignment=TA_CENTER),
+        'body': ParagraphStyle('body', fontName=font, fontSize=10, leading=14, alignment=TA_CENTER),
+    }
+
+
+def _footer(canvas, doc):
+    canvas.saveState()
+    canvas.setFont(font_name(), 8)
+    canvas.setFillColor(colors.grey)
+    canvas.drawRightString(A4[0] - MARGIN, MARGIN / 2, f"{doc.page}")
+    canvas.drawString(MARGIN, MARGIN / 2, doc.generated_label)
+    canvas.restoreState()
+
+
+def _build(story, title):
+    """Lays out 'story' on A4 pages with the shared page template and returns the PDF bytes."""
+    buf = io.BytesIO()
+    doc = BaseDocTemplate(buf, pagesize=A4, leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN,
+                          title=title, author="시간표 배정 프로그램")
+    doc.generated_label = f"{title} · {time.strftime('%Y-%m-%d %H:%M')}"
+    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='body')
+    doc.addPageTemplates([PageTemplate(id='page', frames=[frame], onPage=_footer)])
+    doc.build(story)
+    return buf.getvalue()
+
+
+def _p(text, style):
+    return Paragraph(escape(str(text)), style)
+
+
+# Timetable page geometry (points). The grid is identical on every page, so it is drawn
+# once per document as a form XObject and each page only adds the title and the cells.
+GRID_TOP = A4[1] - MARGIN - 28 * mm
+HEAD_H = 10 * mm
+ROW_H = 30 * mm
+LABEL_W = (A4[0] - 2 * MARGIN) * 0.12
+
+
+def _geometry(shape):
+    """Column width and row height for the configured days/periods (rows shrink to fit the page)."""
+    rows = max(1, len(shape['periods']))
+    return SimpleNamespace(
+        days=shape['days'], periods=shape['periods'], per_day=shape['periods_per_day'],
+        day_w=(A4[0] - 2 * MARGIN - LABEL_W) / max(1, len(shape['days'])),
+        row_h=min(ROW_H, (GRID_TOP - HEAD_H - MARGIN - 5 * mm) / rows),
+    )
+
+
+def _draw_grid_form(c, period_times, geo):
+    font = font_name()
+    left, right = MARGIN, A4[0] - MARGIN
+    bottom = GRID_TOP - HEAD_H - geo.row_h * len(geo.periods)
+    c.beginForm("timetable_grid")
+    c.setFillColor(colors.HexColor('#f2f2f2'))
+    c.rect(left, GRID_TOP - HEAD_H, right - left, HEAD_H, stroke=0, fill=1)
+    c.setFillColor(colors.HexColor('#fafafa'))
+    c.rect(left, bottom, LABEL_W, GRID_TOP - HEAD_H - bottom, stroke=0, fill=1)
+    # Periods past a day's last one are shaded
+    c.setFillColor(colors.HexColor('#eeeeee'))
+    for i, d in enumerate(geo.days):
+        last = geo.per_day[d]
+        if last < len(geo.periods):
+            c.rect(left + LABEL_W + geo.day_w * i, bottom, geo.day_w, geo.row_h * (len(geo.periods) - last), stroke=0, fill=1)
+
+    c.setStrokeColor(colors.HexColor('#999999'))
+    c.setLineWidth(0.6)
+    for y in [GRID_TOP, GRID_TOP - HEAD_H] + [GRID_TOP - HEAD_H - geo.row_h * (i + 1) for i in range(len(geo.periods))]:
+        c.line(left, y, right, y)
+    for x in [left, left + LABEL_W] + [left + LABEL_W + geo.day_w * (i + 1) for i in range(len(geo.days))]:
+        c.line(x, GRID_TOP, x, bottom)
+
+    c.setFillColor(colors.black)
+    c.setFont(font, 11)
+    head_y = GRID_TOP - HEAD_H / 2 - 4
+    c.drawCentredString(left + LABEL_W / 2, head_y, "교시")
+    for i, d in enumerate(geo.days):
+        c.drawCentredString(left + LABEL_W + geo.day_w * (i + 0.5), head_y, d)
+    for i, p in enumerate(geo.periods):
+        mid = GRID_TOP - HEAD_H - geo.row_h * (i + 0.5)
+        c.setFillColor(colors.black)
+        c.setFont(font, 10)
+        c.drawCentredString(left + LABEL_W / 2, mid + 2, f"{p}교시")
+        if period_times.get(p):
+            c.setFillColor(colors.HexColor('#555555'))
+            c.setFont(font, 7)
+            c.drawCentredString(left + LABEL_W / 2, mid - 9, f"({period_times[p]})")
+    c.endForm()
+
+
+def _cell_lines(rows):
+    """(text, size, color) lines for every class in one (period, day) cell."""
+    lines = []
+    for r in rows:
+        if lines:
+            lines.append(("―", 7, '#999999'))
+        lines.append((str(r['과목']), 10, '#000000'))
+        date = r.get('날짜')
+        if pd.notna(date) and str(date).strip():
+            lines.append((f"({date})", 7.5, '#0066cc'))
+        if r['담당교사'] and r['담당교사'] != "미배정":
+            lines.append((str(r['담당교사']), 8, '#555555'))
+        if pd.notna(r['장소']) and str(r['장소']).strip():
+            lines.append((str(r['장소']), 8, '#555555'))
+    return lines
+
+
+def _draw_timetable_page(c, week_rows, week, sid, name, geo):
+    font = font_name()
+    c.setFillColor(colors.black)
+    c.setFont(font, 18)
+    c.drawCentredString(A4[0] / 2, A4[1] - MARGIN - 10 * mm, f"{TIMETABLE_TITLE} ({week}주차)")
+    c.setFont(font, 12)
+    c.drawRightString(A4[0] - MARGIN, A4[1] - MARGIN - 20 * mm, f"학번 : {sid}      이름 : {name}")
+    c.setLineWidth(1.5)
+    c.line(MARGIN, A4[1] - MARGIN - 22 * mm, A4[0] - MARGIN, A4[1] - MARGIN - 22 * mm)
+    c.doForm("timetable_grid")
+
+    cells = {}
+    for r in week_rows:
+        cells.setdefault((int(r['교시']), r['요일']), []).append(r)
+    for (p, d), rows in cells.items():
+        if p not in geo.periods or d not in geo.days:
+            continue
+        lines = _cell_lines(rows)
+        heights = [size + 2 for _, size, _ in lines]
+        x = MARGIN + LABEL_W + geo.day_w * (geo.days.index(d) + 0.5)
+        y = GRID_TOP - HEAD_H - geo.row_h * (p - 0.5) + sum(heights) / 2
+        for (text, size, color), h in zip(lines, heights):
+            y -= h
+            c.setFillColor(colors.HexColor(color))
+            c.setFont(font, size)
+            c.drawCentredString(x, y + 2, text)
+
+
+def _draw_message_page(c, title, message):
+    font = font_name()
+    c.setFillColor(colors.black)
+    c.setFont(font, 18)
+    c.drawCentredString(A4[0] / 2, A4[1] - MARGIN - 10 * mm, title)
+    c.setFont(font, 11)
+    c.drawCentredString(A4[0] / 2, A4[1] - MARGIN - 22 * mm, message)
+
+
+def student_timetables_pdf(entries, period_times=None, shape=None):
+    """
+    entries: iterable of (student, schedule_df) where student is {'학번', '이름'} and
+    schedule_df comes from logic.generate_student_timetable (None/empty if nothing is scheduled).
+    shape: grid shape from occupancy.load_grid_shape (월~금, 7 periods if omitted).
+    One A4 page per student and week.
+    """
+    period_times = {**DEFAULT_PERIOD_TIMES, **(period_times or {})}
+    buf = io.BytesIO()
+    c = pdf_canvas.Canvas(buf, pagesize=A4)
+    c.setTitle(TIMETABLE_TITLE)
+    c.setAuthor("시간표 배정 프로그램")
+    doc = SimpleNamespace(page=0, generated_label=f"{TIMETABLE_TITLE} · {time.strftime('%Y-%m-%d %H:%M')}")
+    geo = _geometry(shape or occupancy.DEFAULT_SHAPE)
+    _draw_grid_form(c, period_times, geo)
+
+    def finish_page():
+        doc.page += 1
+        _footer(c, doc)
+        c.showPage()
+
+    for student, schedule_df in entries:
+        sid, name = student['학번'], student['이름']
+        if schedule_df is None or schedule_df.empty:
+            _draw_message_page(c, f"{name} ({sid})", "배정된 시간표 없음")
+            finish_page()
+            continue
+        by_week = {}
+        for r in schedule_df.to_dict('records'):
+            by_week.setdefault(r['주차'], []).append(r)
+        for week in sorted(by_week, key=lambda w: int(w) if str(w).isdigit() else 0):
+            _draw_timetable_page(c, by_week[week], week, sid, name, geo)
+            finish_page()
+    if doc.page == 0:
+        _draw_message_page(c, TIMETABLE_TITLE, "출력할 시간표가 없습니다.")
+        finish_page()
+    c.save()
+    return buf.getvalue()
+
+
+def class_rosters_pdf(rosters):
+    """
+    rosters: iterable of (title, students_df) with students_df from
+    logic.get_students_for_class_slot. One roster per page (long lists continue
+    on the next page with the header row repeated), with a signature column.
+    """
+    styles = _styles()
+    width = A4[0] - 2 * MARGIN
+    story = []
+    for title, students_df in rosters:
+        story += [_p(title, styles['title']), _p(f"총 {len(students_df)}명", styles['body']), Spacer(1, 4 * mm)]
+        columns = [c for c in ['학번', '이름', '학년', '반', '번호'] if c in students_df.columns]
+        data = [[_p(c, styles['head']) for c in columns + ['확인']]]
+        for row in students_df[columns].itertuples(index=False):
+            data.append([_p(v, styles['body']) for v in row] + [""])
+        col_width = width * 0.8 / max(1, len(columns))
+        table = Table(data, colWidths=[col_width] * len(columns) + [width * 0.2], repeatRows=1)
+        table.setStyle(TableStyle([
+            ('GRID', (0, 0), (-1, -1), 0.6, colors.black),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f2f2f2')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ]))
+        story += [table, PageBreak()]
+    if story:
+        story.pop()
+    else:
+        story.append(_p("출력할 명단이 없습니다.", styles['body']))
+    return _build(story, "수강 대상 학생 명단")
@@ -0,0 +1,124 @@
+"""
+Lightweight, process-wide performance instrumentation.
+
+    with perf.timer("db.load_dataframe", sheet="Students"):
+        ...
+    @perf.timed("logic.check_conflicts")
+    def check_conflicts(...): ...
+    perf.incr("db.cache_hit")
+
+Every finished timer is aggregated (count/total/min/max), kept in a short ring
+buffer of recent events, and logged as one JSON line on the 'timetable.perf'
+logger. Set TIMETABLE_PERF_LOG=<path> to append those lines to a file.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+logger = logging.getLogger("timetable.perf")
+
+_lock = threading.Lock()
+_timers = {}
+_counters = {}
+_events = deque(maxlen=500)
+_started = time.time()
+
+
+def _configure_log_file():
+    path = os.environ.get("TIMETABLE_PERF_LOG")
+    if not path or any(getattr(h, '_perf_log', False) for h in logger.handlers):
+        return
+    handler = logging.FileHandler(path, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    handler._perf_log = True
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+_configure_log_file()
+
+
+def _key(name, tags):
+    if not tags:
+        return name
+    return f"{name}[{','.join(str(v) for v in tags.values())}]"
+
+
+def record(name, seconds, **tags):
+    """Adds one timing sample."""
+    key = _key(name, tags)
+    with _lock:
+        s = _timers.get(key)
+        if s is None:
+            s = _timers[key] = {'name': name, 'tags': dict(tags), 'count': 0, 'total_s': 0.0, 'min_s': seconds, 'max_s': 0.0, 'last_s': 0.0}
+        s['count'] += 1
+        s['total_s'] += seconds
+        s['min_s'] = min(s['min_s'], seconds)
+        s['max_s'] = max(s['max_s'], seconds)
+        s['last_s'] = seconds
+        event = {'ts': time.time(), 'name': name, 'seconds': round(seconds, 6), **tags}
+        _events.append(event)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(event, ensure_ascii=False, default=str))
+
+
+def incr(name, value=1):
+    """Adds 'value' to a named counter (cache hits, retries, bytes, sleep seconds...)."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+@contextmanager
+def timer(name, **tags):
+    """
+    Times the enclosed block. Yields the tag dict so tags known only later
+    (e.g. the selected page) can still be added before the block ends.
+    Blocks left by an exception (including st.rerun/st.stop) are recorded too.
+    """
+    start = time.perf_counter()
+    try:
+        yield tags
+    finally:
+        record(name, time.perf_counter() - start, **tags)
+
+
+def timed(name=None):
+    """Decorator version of timer(); defaults to module.function as the name."""
+    def decorator(fn):
+        label = name or f"{fn.__module__.split('.')[-1]}.{fn.__name__}"
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """Copy of all metrics, suitable for JSON export."""
+    with _lock:
+        timers = []
+        for key, s in _timers.items():
+            timers.append(dict(s, key=key, mean_s=s['total_s'] / s['count'] if s['count'] else 0.0))
+        return {
+            'since': _started,
+            'exported_at': time.time(),
+            'timers': sorted(timers, key=lambda t: -t['total_s']),
+            'counters': dict(_counters),
+            'events': list(_events),
+        }
+
+
+def reset():
+    global _started
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _events.clear()
+        _started = time.time()
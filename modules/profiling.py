@@ -0,0 +1,167 @@
+"""
+Opt-in cProfile capture of whole Streamlit reruns.
+
+Enabled per browser with ?profile=1 or for the whole server with TIMETABLE_PROFILE=1.
+Each profiled rerun is saved under TIMETABLE_PROFILE_DIR (default 'profiles/') as a
+.prof file (open with snakeviz / flameprof / pstats) plus a small .json summary
+holding the page, the wall time and the top functions, which the Performance page lists.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+
+PROFILE_DIR = os.environ.get("TIMETABLE_PROFILE_DIR", "profiles")
+MAX_PROFILES = int(os.environ.get("TIMETABLE_PROFILE_KEEP", "100"))
+TOP_N = 30
+
+# One profiler per script thread; a rerun cut short before the end of app.py
+# (e.g. st.rerun() in the sidebar) leaves its profiler here to be discarded.
+_active = {}
+_lock = threading.Lock()
+
+
+def is_enabled(query_params=None, share=False):
+    """
+    TIMETABLE_PROFILE=1 profiles every session on the server; ?profile=1 turns it on
+    for one session, except for share-link visitors.
+    """
+    if os.environ.get("TIMETABLE_PROFILE", "").lower() in ("1", "true", "yes"):
+        return True
+    if query_params is not None and not share:
+        return str(query_params.get("profile", "")).lower() in ("1", "true", "yes")
+    return False
+
+
+def start():
+    """Starts profiling the current thread. Returns None if another profiler is already running."""
+    tid = threading.get_ident()
+    with _lock:
+        stale = _active.pop(tid, None)
+        if stale is not None:
+            stale.disable()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+: only one profiler may be active per process
+            return None
+        _active[tid] = profiler
+    return profiler
+
+
+def _slug(text):
+    return re.sub(r'\W+', '_', str(text)).strip('_').lower() or "page"
+
+
+def top_functions(stats, sort="cumulative", limit=TOP_N):
+    """[{function, ncalls, tottime_s, cumtime_s}] from a pstats.Stats, sorted by 'sort'."""
+    stats.sort_stats(sort)
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        cc, nc, tt, ct, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append({
+            'function': f"{name} ({os.path.basename(filename)}:{line})" if line else name,
+            'ncalls': nc,
+            'tottime_s': round(tt, 6),
+            'cumtime_s': round(ct, 6),
+        })
+    return rows
+
+
+def stop(profiler, page, seconds, **meta):
+    """Stops 'profiler' and saves it. Returns the summary dict (or None if nothing was saved)."""
+    profiler.disable()
+    with _lock:
+        if _active.get(threading.get_ident()) is profiler:
+            del _active[threading.get_ident()]
+
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        now = time.time()
+        base = f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(now))}_{int(now * 1000) % 1000:03d}_{_slug(page)}"
+        prof_path = os.path.join(PROFILE_DIR, base + ".prof")
+        profiler.dump_stats(prof_path)
+
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        summary = {
+            'id': base,
+            'page': page,
+            'timestamp': now,
+            'seconds': round(seconds, 6),
+            'total_calls': stats.total_calls,
+            'top': top_functions(stats),
+            **meta,
+        }
+        with open(os.path.join(PROFILE_DIR, base + ".json"), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+        _prune()
+        return summary
+    except OSError:
+        return None
+
+
+def _prune():
+    summaries = sorted(f for f in os.listdir(PROFILE_DIR) if f.endswith(".json"))
+    for name in summaries[:-MAX_PROFILES] if MAX_PROFILES > 0 else []:
+        for ext in (".json", ".prof"):
+            path = os.path.join(PROFILE_DIR, name[:-5] + ext)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def list_profiles():
+    """Saved profile summaries, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    out = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name), encoding='utf-8') as f:
+                out.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def profile_path(profile_id):
+    return os.path.join(PROFILE_DIR, _slug(profile_id) + ".prof")
+
+
+def load_stats(profile_id):
+    return pstats.Stats(profile_path(profile_id), stream=io.StringIO())
+
+
+def call_tree_text(profile_id, pattern, limit=20):
+    """
+    pstats callers/callees listing for functions matching 'pattern' (regex).
+    Raises ValueError for a pattern that is not a valid regex.
+    """
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f"잘못된 검색 패턴입니다: {e}") from e
+    stream = io.StringIO()
+    stats = pstats.Stats(profile_path(profile_id), stream=stream)
+    stats.sort_stats("cumulative")
+    stats.print_callers(pattern, limit)
+    stats.print_callees(pattern, limit)
+    return stream.getvalue()
+
+
+def delete_profiles():
+    if not os.path.isdir(PROFILE_DIR):
+        return 0
+    removed = 0
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith((".prof", ".json")):
+            os.remove(os.path.join(PROFILE_DIR, name))
+            removed += 1
+    return removed
@@ -0,0 +1,297 @@
+"""
+Repairs student clashes in the saved timetable with as few slot moves as possible,
+e.g. after the roster is re-uploaded mid-term.
+
+The search starts from the Timetable as it is: a slot only moves (to another cell of
+the same week) when that removes clashes. Slots marked Locked never move, and a move
+may not double-book a teacher or need more rooms than the Rooms sheet has. Each step
+takes the single move, or the pair of moves when one slot has to make room for another,
+that removes the most clashes; among equal results the fewer moved slots win. Only
+weeks with clashes are searched, and the search stops when nothing helps or the time
+budget runs out. The moves come back as a plan to review; apply_repair() writes them
+with one save.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules import logic, occupancy, perf
+from modules.indexes import get_enrollment_codes, popcount
+from modules.slot_finder import get_slot_context
+
+# A resolved student clash outweighs any number of extra moves
+CONFLICT_WEIGHT = 1000
+MOVE_WEIGHT = 1
+
+MOVE_COLUMNS = ['주차', '과목', '기존 요일', '기존 교시', '새 요일', '새 교시', '날짜']
+
+
+class _Week:
+    """
+    Search state of one week: which cell each slot is in and what every cell holds
+    (student bitsets, teachers, rooms, subjects), so all moves of many slots are scored at once.
+    """
+
+    def __init__(self, cells, targets, slots, bits, teach, groups, n_rooms):
+        self.cells = cells      # [(day, period)]
+        self.targets = targets  # bool [cell]: cells of the configured grid (slots may move there)
+        self.slots = slots      # [{'subject', 'locked'}]
+        self.bits, self.teach, self.groups = bits, teach, groups  # per slot: [slot, words], [slot, teacher], [slot]
+        self.n_rooms = n_rooms
+        self.orig = np.array([s['cell'] for s in slots], dtype=np.int64)
+        self.cell = self.orig.copy()
+        subject_ids = {}
+        self.subject = np.array([subject_ids.setdefault(s['subject'], len(subject_ids)) for s in slots], dtype=np.int64)
+
+        n = len(cells)
+        self.members = [[] for _ in range(n)]
+        for i, c in enumerate(self.cell):
+            self.members[c].append(i)
+        self.seen = np.zeros((n, bits.shape[1]), dtype=np.uint64)
+        self.clash = np.zeros_like(self.seen)
+        self.teachers = np.zeros((n, teach.shape[1]), dtype=np.int64)
+        self.rooms = np.zeros(n, dtype=np.int64)
+        self.subjects = np.zeros((n, len(subject_ids)), dtype=np.int64)
+        self._removed_cache, self._cost_rows = {}, {}
+        for c in range(n):
+            self._refresh(c)
+
+    def _fold(self, members):
+        seen = np.zeros(self.bits.shape[1], dtype=np.uint64)
+        clash = np.zeros_like(seen)
+        for i in members:
+            clash |= seen & self.bits[i]
+            seen |= self.bits[i]
+        return seen, clash
+
+    def _refresh(self, c):
+        members = self.members[c]
+        self.seen[c], self.clash[c] = self._fold(members)
+        self.teachers[c] = self.teach[members].sum(axis=0)
+        self.rooms[c] = self.groups[members].sum()
+        self.subjects[c] = np.bincount(self.subject[members], minlength=self.subjects.shape[1])
+        for i in members:
+            self._removed_cache.pop(i, None)
+
+    def conflicts(self):
+        return int(popcount(self.clash).sum())
+
+    def clashing_slots(self):
+        """Movable slots in cells with clashes."""
+        cells = np.nonzero(popcount(self.clash))[0]
+        return [i for c in cells for i in self.members[c] if not self.slots[i]['locked']]
+
+    def moved_slots(self):
+        return np.nonzero(self.cell != self.orig)[0].tolist()
+
+    def _removed(self, i):
+        """Clashing students that leave slot i's cell with it."""
+        if i not in self._removed_cache:
+            here = self.cell[i]
+            _, clash_rest = self._fold([j for j in self.members[here] if j != i])
+            self._removed_cache[i] = int(popcount(self.clash[here]) - popcount(clash_rest))
+        return self._removed_cache[i]
+
+    def _costs(self, idx, cols):
+        """Cost change of moving slots 'idx' to cells 'cols', float [slot, col] (inf where it may not go)."""
+        here, orig = self.cell[idx], self.orig[idx]
+        added = popcount(self.seen[cols][None] & self.bits[idx][:, None] & ~self.clash[cols][None])
+        removed = np.array([self._removed(i) for i in idx], dtype=np.int64)
+        moves = (cols[None] != orig[:, None]).astype(np.int64) - (here != orig)[:, None]
+        cost = (CONFLICT_WEIGHT * (added - removed[:, None]) + MOVE_WEIGHT * moves).astype(float)
+
+        ok = self.targets[cols][None] & (cols[None] != here[:, None])
+        ok &= self.subjects[np.ix_(cols, self.subject[idx])].T == 0
+        teach = self.teach[idx]
+        if teach.any():
+            ok &= teach.astype(np.float32) @ (self.teachers[cols] > 0).T.astype(np.float32) == 0
+        if self.n_rooms:
+            ok &= self.rooms[cols][None] + self.groups[idx][:, None] <= self.n_rooms
+        cost[~ok] = np.inf
+        return cost
+
+    def move_costs(self, slots):
+        """
+        Cost change of moving each of 'slots' to each cell, float [slot, cell] (inf where it may
+        not go). Rows are kept between calls; move() only recomputes the two cells it changed.
+        """
+        missing = np.array([i for i in slots if i not in self._cost_rows], dtype=np.int64)
+        if len(missing):
+            for i, row in zip(missing, self._costs(missing, np.arange(len(self.cells)))):
+                self._cost_rows[int(i)] = row
+        return np.array([self._cost_rows[i] for i in slots]).reshape(len(slots), len(self.cells))
+
+    def move(self, i, c):
+        here = self.cell[i]
+        self.members[here].remove(i)
+        self.members[c].append(i)
+        self.cell[i] = c
+        self._removed_cache.pop(i, None)
+        self._refresh(here)
+        self._refresh(c)
+        # Slots in the two cells get new rows; every other row only changes in those two columns
+        for j in self.members[here] + self.members[c]:
+            self._cost_rows.pop(j, None)
+        if self._cost_rows:
+            cols = np.array([here, c])
+            rows = np.array(list(self._cost_rows), dtype=np.int64)
+            for j, patch in zip(rows, self._costs(rows, cols)):
+                self._cost_rows[int(j)][cols] = patch
+
+
+def _best_move(week, candidates):
+    if not candidates:
+        return None
+    costs = week.move_costs(candidates)
+    k, c = np.unravel_index(np.argmin(costs), costs.shape)
+    return [(candidates[k], int(c))] if costs[k, c] < 0 else None
+
+
+def _best_chain(week, candidates, deadline, clock):
+    """
+    Best pair of moves where a slot j in the way leaves its cell b first, so a clashing
+    slot i can move in. Moving j only changes b and the cell it goes to, so the pair's cost
+    is j's move cost plus i's cost of entering b without j, both exact.
+    """
+    pairs = [(b, j) for b in np.nonzero(week.targets)[0] for j in week.members[b] if not week.slots[j]['locked']]
+    if not pairs:
+        return None
+    pair_b = np.array([b for b, _ in pairs], dtype=np.int64)
+    pair_j = np.array([j for _, j in pairs], dtype=np.int64)
+    # Each target cell as it would be without j
+    folds = [week._fold([m for m in week.members[b] if m != j]) for b, j in pairs]
+    seen = np.array([f[0] for f in folds])
+    clash = np.array([f[1] for f in folds])
+    subjects = week.subjects[pair_b] - np.eye(week.subjects.shape[1], dtype=np.int64)[week.subject[pair_j]]
+    teachers = (week.teachers[pair_b] - week.teach[pair_j]) > 0
+    rooms = week.rooms[pair_b] - week.groups[pair_j]
+    js, row = np.unique(pair_j, return_inverse=True)
+    out_costs = week.move_costs(js.tolist())[row]
+
+    best_cost, best = 0, None
+    for i in candidates:
+        if clock() > deadline:
+            break
+        here = week.cell[i]
+        added = popcount(seen & week.bits[i] & ~clash)
+        moves = (pair_b != week.orig[i]).astype(np.int64) - int(here != week.orig[i])
+        cost_in = (CONFLICT_WEIGHT * (added - week._removed(i)) + MOVE_WEIGHT * moves).astype(float)
+        ok = (pair_b != here) & (subjects[:, week.subject[i]] == 0) & ~teachers[:, week.teach[i]].any(axis=1)
+        if week.n_rooms:
+            ok &= rooms + week.groups[i] <= week.n_rooms
+        cost_in[~ok] = np.inf
+        out = out_costs.copy()
+        out[:, here] = np.inf  # a swap would only move the clash
+        to = np.argmin(out, axis=1)
+        total = cost_in + out[np.arange(len(pairs)), to]
+        k = int(np.argmin(total))
+        if total[k] < best_cost:
+            best_cost, best = total[k], [(int(pair_j[k]), int(to[k])), (i, int(pair_b[k]))]
+    return best
+
+
+def _solve_week(week, deadline, clock):
+    """Improves 'week' until nothing helps (True) or the deadline passes (False)."""
+    while clock() <= deadline:
+        clashing = week.clashing_slots()
+        best = _best_move(week, sorted(set(clashing + week.moved_slots())))
+        if best is None and clashing:
+            best = _best_chain(week, sorted(set(clashing)), deadline, clock)
+        if best is None:
+            return clock() <= deadline
+        for i, c in best:
+            week.move(i, c)
+    return False
+
+
+def _week_dates(rows):
+    """(week, day) -> the date most slots of that day carry."""
+    dated = rows[rows['Date'].astype(str).str.strip() != ""]
+    return {k: g.mode().iloc[0] for k, g in dated.groupby(['Week', 'Day'])['Date']}
+
+
+@perf.timed()
+def repair_timetable(db_manager, week=None, budget_s=10.0, clock=time.perf_counter):
+    """
+    Searches for the fewest slot moves that resolve the student clashes of the saved timetable
+    (all weeks, or one 'week'), for at most 'budget_s' seconds.
+    Returns (plan, summary): plan is DataFrame[MOVE_COLUMNS], one row per moved slot;
+    summary = {'before', 'after' (clashing students over all cells), 'moves', 'locked',
+    'weeks' (weeks with clashes), 'complete' (False if the budget ran out), 'elapsed'}.
+    """
+    start = clock()
+    summary = {'before': 0, 'after': 0, 'moves': 0, 'locked': 0, 'weeks': 0, 'complete': True, 'elapsed': 0.0}
+    tt = db_manager.load_dataframe("Timetable")
+    if tt.empty:
+        return pd.DataFrame(columns=MOVE_COLUMNS), summary
+
+    rows = tt[['Week', 'Date', 'Day', 'Period', 'Subject', 'Locked']].astype(object)
+    rows = rows.drop_duplicates(logic.SLOT_KEY_COLS)
+    if week is not None:
+        rows = rows[rows['Week'] == int(week)]
+    codes = get_enrollment_codes(db_manager)
+    ctx = get_slot_context(db_manager)
+    shape = occupancy.load_grid_shape(db_manager)
+    grid = [(d, p) for d in shape['days'] for p in range(1, shape['periods_per_day'][d] + 1)]
+    n_words = codes['active'].shape[0]
+    no_teachers = np.zeros(len(ctx['teachers']), dtype=bool)
+
+    weeks = []
+    for w, week_rows in rows.groupby('Week', sort=True):
+        # Slots outside the configured grid still clash, but nothing moves into those cells
+        extra = sorted({(d, p) for d, p in zip(week_rows['Day'], week_rows['Period'])} - set(grid),
+                       key=lambda k: (shape['days'].index(k[0]) if k[0] in shape['days'] else 99, k[1]))
+        cells = grid + extra
+        cell_index = {k: c for c, k in enumerate(cells)}
+        slots, bits, teach, groups = [], [], [], []
+        for r in week_rows.itertuples(index=False):
+            subject = str(r.Subject)
+            code, vocab = codes['subject_code'].get(subject), ctx['subject_code'].get(subject)
+            slots.append({'subject': subject, 'locked': bool(r.Locked), 'cell': cell_index[(r.Day, r.Period)]})
+            bits.append(codes['bits'][code] & codes['active'] if code is not None else np.zeros(n_words, dtype=np.uint64))
+            teach.append(ctx['teaches'][:, vocab] if vocab is not None else no_teachers)
+            groups.append(int(ctx['groups'][vocab]) if vocab is not None else 0)
+        state = _Week(
+            cells, np.arange(len(cells)) < len(grid), slots, np.array(bits, dtype=np.uint64).reshape(len(slots), n_words),
+            np.array(teach, dtype=bool).reshape(len(slots), len(no_teachers)), np.array(groups, dtype=np.int64), ctx['n_rooms'])
+        summary['locked'] += sum(s['locked'] for s in slots)
+        if state.conflicts():
+            weeks.append((int(w), state))
+    summary['weeks'] = len(weeks)
+    summary['before'] = sum(state.conflicts() for _, state in weeks)
+
+    # Weeks are independent: each gets an equal share of what is left of the budget
+    deadline = start + budget_s
+    for k, (_, state) in enumerate(weeks):
+        share = (deadline - clock()) / (len(weeks) - k)
+        summary['complete'] &= _solve_week(state, clock() + share, clock)
+
+    dates = _week_dates(rows)
+    plan = []
+    for w, state in weeks:
+        for i in state.moved_slots():
+            (old_day, old_period), (day, period) = state.cells[state.orig[i]], state.cells[state.cell[i]]
+            plan.append((w, state.slots[i]['subject'], old_day, old_period, day, period, dates.get((w, day), "")))
+    plan = pd.DataFrame(plan, columns=MOVE_COLUMNS)
+    summary.update(after=sum(state.conflicts() for _, state in weeks), moves=len(plan), elapsed=clock() - start)
+    return plan, summary
+
+
+@perf.timed()
+def apply_repair(db_manager, plan):
+    """
+    Writes a repair_timetable() plan with one save (logic.apply_timetable_changes).
+    Refuses if the timetable changed since the plan was made. Returns (success, msg, report).
+    """
+    report = {'added': 0, 'deleted': 0, 'duplicates': [], 'conflicts': []}
+    if plan.empty:
+        return True, "변경 사항이 없습니다.", report
+    tt = db_manager.load_dataframe("Timetable")
+    keys = set(zip(*(tt[c].astype(str) for c in logic.SLOT_KEY_COLS))) if not tt.empty else set()
+    deletes = [{'week': r['주차'], 'day': r['기존 요일'], 'period': r['기존 교시'], 'subject': r['과목']} for r in plan.to_dict('records')]
+    adds = [{'week': r['주차'], 'date': r['날짜'], 'day': r['새 요일'], 'period': r['새 교시'], 'subject': r['과목']} for r in plan.to_dict('records')]
+    moved_from = {tuple(str(d[k]) for k in ('week', 'day', 'period', 'subject')) for d in deletes}
+    if not moved_from <= keys or any(tuple(str(a[k]) for k in ('week', 'day', 'period', 'subject')) in keys - moved_from for a in adds):
+        return False, "계산 후 시간표가 바뀌었습니다. 이동안을 다시 계산하세요.", report
+    return logic.apply_timetable_changes(db_manager, adds=adds, deletes=deletes, check=False)
@@ -0,0 +1,237 @@
+import pandas as pd
+from modules.indexes import get_cached, get_enrollment_index, count_students, split_list
+from modules import perf
+
+# Cost weights for the assignment problem.
+# One oversubscribed seat always costs more than any amount of empty seats,
+# so oversubscription is minimized first and room fit second.
+OVER_WEIGHT = 1000
+PREFERRED_ROOM_BONUS = 5
+UNASSIGNED_TEACHER = "미배정"
+
+ROOM_COLUMNS = ['Room', 'Capacity']
+ROOM_SCHEDULE_COLUMNS = ['Week', 'Date', 'Day', 'Period', 'Subject', 'TeacherName', 'Students', 'Room', 'Capacity', 'Over']
+
+
+def load_rooms(db_manager):
+    """
+    Loads the 'Rooms' sheet: [Room, Capacity].
+    Returns DataFrame with Room as str and Capacity as int (schema types, see modules/schema.py).
+    """
+    df = db_manager.load_dataframe("Rooms")
+    if df.empty:
+        return pd.DataFrame(columns=ROOM_COLUMNS)
+
+    df = df[df['Room'] != ""].drop_duplicates(subset=['Room'], keep='last')
+    return df[ROOM_COLUMNS].reset_index(drop=True)
+
+
+def save_rooms(db_manager, rooms_df):
+    return db_manager.save_dataframe("Rooms", rooms_df[ROOM_COLUMNS])
+
+
+def load_room_schedule(db_manager):
+    return db_manager.load_dataframe("RoomSchedule")
+
+
+def save_room_schedule(db_manager, schedule_df):
+    return db_manager.save_dataframe("RoomSchedule", schedule_df[ROOM_SCHEDULE_COLUMNS])
+
+
+def get_class_groups(db_manager):
+    """
+    Class groups per subject: one group per teacher assignment row.
+    Subjects without a teacher get a single '미배정' group holding all their students.
+    Returns dict {subject: [{'TeacherName', 'Students', 'PreferredRoom'}, ...]}
+    """
+    index = get_enrollment_index(db_manager)
+    teachers_df = db_manager.load_dataframe("Teachers")
+
+    groups = {}
+    if not teachers_df.empty:
+        for t_row in teachers_df.to_dict('records'):
+            subject = t_row.get('Subject')
+            classes = split_list(t_row.get('AssignedClasses'))
+            room = t_row.get('Room', '')
+            groups.setdefault(subject, []).append({
+                'TeacherName': t_row.get('TeacherName', ''),
+                'Students': count_students(index, subject, classes),
+                'PreferredRoom': "" if pd.isna(room) else str(room).strip(),
+            })
+
+    for subject, sids in index['by_subject'].items():
+        if subject not in groups:
+            groups[subject] = [{'TeacherName': UNASSIGNED_TEACHER, 'Students': len(sids), 'PreferredRoom': ""}]
+
+    return groups
+
+
+def _solve_assignment(cost):
+    """
+    Minimum-cost assignment of every row to a distinct column (Hungarian algorithm,
+    shortest augmenting path form). Requires len(cost) <= len(cost[0]).
+    Runs in O(n^2 * m); returns the assigned column index per row.
+    """
+    n = len(cost)
+    m = len(cost[0]) if n else 0
+    inf = float('inf')
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    assignment = [-1] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            assignment[p[j] - 1] = j - 1
+    return assignment
+
+
+def _assign_cell(groups, rooms, preferred):
+    """
+    Assigns rooms to all class groups meeting in the same (Week, Day, Period).
+    Each room is used at most once. Groups that cannot get a room are matched
+    to a dummy column and come back as None.
+    """
+    n = len(groups)
+    cost = []
+    for g in groups:
+        size = g['Students']
+        pref = preferred.get((g['Subject'], g['TeacherName'])) or g['PreferredRoom']
+        row = []
+        for name, cap in rooms:
+            over = max(0, size - cap)
+            c = over * OVER_WEIGHT + max(0, cap - size)
+            if name == pref:
+                c -= PREFERRED_ROOM_BONUS
+            row.append(c)
+        # Dummy "no room" columns: worse than any real room, even a zero-capacity one
+        row.extend([(size + 1) * OVER_WEIGHT] * n)
+        cost.append(row)
+
+    result = []
+    for col in _solve_assignment(cost):
+        if col < len(rooms):
+            result.append(rooms[col])
+        else:
+            result.append(None)
+    return result
+
+
+@perf.timed()
+def allocate_rooms(db_manager):
+    """
+    Assigns a room to every class group of every scheduled slot.
+    Rooms are never double-booked within a (Week, Day, Period) and total
+    oversubscription (students above room capacity) is minimized per slot.
+    Groups keep the room they got in earlier slots when it is still a good fit.
+    Returns (DataFrame[ROOM_SCHEDULE_COLUMNS], summary dict)
+    """
+    summary = {'slots': 0, 'groups': 0, 'over_seats': 0, 'unassigned': 0}
+    rooms_df = load_rooms(db_manager)
+    timetable_df = db_manager.load_dataframe("Timetable")
+    if rooms_df.empty or timetable_df.empty:
+        return pd.DataFrame(columns=ROOM_SCHEDULE_COLUMNS), summary
+
+    rooms = list(zip(rooms_df['Room'], rooms_df['Capacity']))
+    groups_by_subject = get_class_groups(db_manager)
+
+    # Week/Period are ints and Day an ordered categorical, so this sorts by time directly
+    tt = timetable_df.sort_values(['Week', 'Day', 'Period'], kind='stable')
+
+    preferred = {}
+    rows = []
+    for _, cell_df in tt.groupby(['Week', 'Day', 'Period'], sort=False, observed=True):
+        cell_groups = []
+        for slot in cell_df.to_dict('records'):
+            for g in groups_by_subject.get(slot['Subject'], []):
+                cell_groups.append(dict(g, Subject=slot['Subject'], slot=slot))
+        if not cell_groups:
+            continue
+        summary['slots'] += 1
+
+        for g, room in zip(cell_groups, _assign_cell(cell_groups, rooms, preferred)):
+            slot = g['slot']
+            summary['groups'] += 1
+            if room is None:
+                room_name, cap = "", 0
+                over = g['Students']
+                summary['unassigned'] += 1
+            else:
+                room_name, cap = room
+                over = max(0, g['Students'] - cap)
+                summary['over_seats'] += over
+                preferred[(g['Subject'], g['TeacherName'])] = room_name
+            rows.append({
+                'Week': slot['Week'],
+                'Date': slot['Date'],
+                'Day': slot['Day'],
+                'Period': slot['Period'],
+                'Subject': g['Subject'],
+                'TeacherName': g['TeacherName'],
+                'Students': g['Students'],
+                'Room': room_name,
+                'Capacity': cap,
+                'Over': over,
+            })
+
+    return pd.DataFrame(rows, columns=ROOM_SCHEDULE_COLUMNS), summary
+
+
+@perf.timed()
+def _build_room_lookup(df):
+    if df.empty or 'Room' not in df.columns:
+        return {}
+    lookup = {}
+    for r in df.to_dict('records'):
+        if pd.isna(r['Room']) or str(r['Room']).strip() == "":
+            continue
+        key = (str(r['Week']), r['Day'], str(r['Period']), r['Subject'], r['TeacherName'])
+        lookup[key] = str(r['Room'])
+    return lookup
+
+
+def get_room_lookup(db_manager):
+    """
+    Maps (Week, Day, Period, Subject, TeacherName) -> Room from the saved 'RoomSchedule' sheet.
+    Keys use str() so Sheets/CSV round trips still match. Cached until RoomSchedule changes;
+    callers must not modify the returned dict.
+    """
+    df = load_room_schedule(db_manager)
+    return get_cached(db_manager, "room_lookup", (df,), lambda: _build_room_lookup(df))
@@ -0,0 +1,138 @@
+"""
+Canonical column types for every sheet, applied once when DBManager loads or saves a frame.
+
+Sheets and CSV round trips hand values back with whatever type they guess: '10101'
+comes back as 10101, 'TRUE' as True or 'TRUE', an empty Week as ''. normalize() fixes
+that once per load, so the cached frames logic.py works on are already canonical:
+    str       text, integral numbers without '.0', missing -> ""
+    int       missing/invalid -> the column default
+    bool      True / 'TRUE' / 1 -> True
+    day       ordered categorical 월..일 (unknown values are kept, sorted last)
+    category  categorical over the values present (Subject)
+Columns not listed keep their loaded type. Missing listed columns are added with their default.
+"""
+import pandas as pd
+
+DAYS = ["월", "화", "수", "목", "금", "토", "일"]
+
+# sheet -> {column: (kind, default)}
+SCHEMAS = {
+    "Students": {
+        '학번': ('str', ""),
+        '이름': ('str', ""),
+        '학년': ('str', ""),
+        '반': ('str', ""),
+        '번호': ('str', ""),
+        'parsed_subjects': ('str', ""),
+        'is_exception': ('bool', False),
+    },
+    "Teachers": {
+        'Subject': ('str', ""),
+        'TeacherName': ('str', ""),
+        'AssignedClasses': ('str', ""),
+        'Room': ('str', ""),
+    },
+    "Timetable": {
+        'Week': ('int', 1),
+        'Date': ('str', ""),
+        'Day': ('day', ""),
+        'Period': ('int', 0),
+        'Subject': ('category', ""),
+        'Locked': ('bool', False),  # pinned: the repair solver never moves it
+    },
+    "Settings_PeriodTimes": {
+        'Period': ('int', 0),
+        'TimeRange': ('str', ""),
+    },
+    "Settings_Grid": {
+        'Day': ('str', ""),
+        'Periods': ('int', 0),
+    },
+    "Rooms": {
+        'Room': ('str', ""),
+        'Capacity': ('int', 0),
+    },
+    "RoomSchedule": {
+        'Week': ('int', 1),
+        'Date': ('str', ""),
+        'Day': ('day', ""),
+        'Period': ('int', 0),
+        'Subject': ('category', ""),
+        'TeacherName': ('str', ""),
+        'Students': ('int', 0),
+        'Room': ('str', ""),
+        'Capacity': ('int', 0),
+        'Over': ('int', 0),
+    },
+}
+
+
+def _str_value(v):
+    if v is None or (not isinstance(v, str) and pd.isna(v)):
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v).strip()
+
+
+def _bool_value(v):
+    if isinstance(v, str):
+        return v.strip().upper() == 'TRUE'
+    return v is not None and not pd.isna(v) and v == True
+
+
+def _convert(series, kind, default):
+    # Fast paths: columns that already have the target type (saves, most CSV loads) are not touched row by row
+    if kind == 'str':
+        if pd.api.types.infer_dtype(series, skipna=False) == 'string':
+            return series.str.strip().astype(object)
+        return series.map(_str_value).astype(object)
+    if kind == 'int':
+        if pd.api.types.is_integer_dtype(series.dtype):
+            return series.astype('int64')
+        if series.dtype == object:
+            series = series.map(lambda v: v.strip() if isinstance(v, str) else v)
+        return pd.to_numeric(series, errors='coerce').fillna(default).astype('int64')
+    if kind == 'bool':
+        if pd.api.types.is_bool_dtype(series.dtype):
+            return series.astype(bool)
+        return series.map(_bool_value).astype(bool)
+    if isinstance(series.dtype, pd.CategoricalDtype) and (kind != 'day' or series.cat.ordered):
+        return series
+    values = series.map(_str_value)
+    if kind == 'day':
+        extra = sorted(set(values) - set(DAYS))
+        return pd.Series(pd.Categorical(values, categories=DAYS + extra, ordered=True), index=series.index)
+    return values.astype('category')
+
+
+def normalize(sheet_name, df):
+    """Copy of 'df' with the sheet's canonical column types (a plain copy if the sheet has no schema)."""
+    schema = SCHEMAS.get(sheet_name)
+    if df is None:
+        return df
+    if schema is None:
+        return df.copy()
+    if df.empty and len(df.columns) == 0:
+        # Missing/empty sheet: callers check .empty before touching columns
+        return pd.DataFrame()
+    out = df.copy()
+    for col, (kind, default) in schema.items():
+        if col not in out.columns:
+            out[col] = pd.Series([default] * len(out), index=out.index, dtype=object)
+        out[col] = _convert(out[col], kind, default)
+    out.attrs['schema'] = sheet_name
+    return out
+
+
+def is_normalized(sheet_name, df):
+    return df is not None and df.attrs.get('schema') == sheet_name
+
+
+def to_storage(df):
+    """Plain object/number columns for writing to Sheets or CSV (categoricals back to text)."""
+    out = df.copy()
+    for col in out.columns:
+        if isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype(object)
+    return out
@@ -0,0 +1,101 @@
+"""
+Typeahead search over the 'Students' sheet by 학번 or 이름.
+
+Every student contributes a few sorted keys: the 학번, the name, the name without the
+surname and the initial consonants (초성) of both. A query is answered with two
+bisects over the sorted keys. Korean input is matched while it is still being typed:
+a trailing consonant (김ㅁ) or a syllable without a final consonant (김미) also
+matches the syllables it can still become (김민서), and an all-초성 query (ㄱㅁㅅ)
+matches names by their initial consonants.
+"""
+from bisect import bisect_left, bisect_right
+
+from modules.indexes import get_cached
+
+SYLLABLE_FIRST, SYLLABLE_LAST = 0xAC00, 0xD7A3
+# Compatibility jamo (what keyboards type) in initial-consonant order
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSEONG_INDEX = {c: i for i, c in enumerate(CHOSEONG)}
+
+
+def choseong(text):
+    """Initial consonants of the Hangul syllables in 'text' (other characters are kept)."""
+    return "".join(
+        CHOSEONG[(ord(ch) - SYLLABLE_FIRST) // 588] if SYLLABLE_FIRST <= ord(ch) <= SYLLABLE_LAST else ch
+        for ch in text
+    )
+
+
+def _last_char_ranges(ch):
+    """Characters an unfinished last character can still become, as inclusive (lo, hi) ranges."""
+    if ch in _CHOSEONG_INDEX:
+        first = SYLLABLE_FIRST + _CHOSEONG_INDEX[ch] * 588
+        return [(ch, ch), (chr(first), chr(first + 587))]  # 초성 keys, and every syllable with that initial
+    code = ord(ch)
+    if SYLLABLE_FIRST <= code <= SYLLABLE_LAST and (code - SYLLABLE_FIRST) % 28 == 0:
+        return [(ch, chr(code + 27))]  # no final consonant yet: 미 -> 미..밓
+    return [(ch, ch)]
+
+
+def build_student_search_index(students_df):
+    """
+    Sorted search keys over the 'Students' sheet (one entry per 학번, the first row wins).
+    Returns dict:
+        'keys' / 'owners': sorted keys and the student position of each
+        'students': [{'학번', '이름', '학년', '반'}, ...]
+        'exact': {학번 or 이름: [positions]}
+    """
+    index = {'keys': [], 'owners': [], 'students': [], 'exact': {}}
+    if students_df is None or students_df.empty or '학번' not in students_df.columns:
+        return index
+
+    entries, seen = [], set()
+    for row in students_df.to_dict('records'):
+        sid, name = str(row['학번']).strip(), str(row.get('이름', '')).strip()
+        if not sid or sid in seen:
+            continue
+        seen.add(sid)
+        i = len(index['students'])
+        index['students'].append({'학번': sid, '이름': name, '학년': row.get('학년', ''), '반': row.get('반', '')})
+        index['exact'].setdefault(sid, []).append(i)
+        if name:
+            index['exact'].setdefault(name, []).append(i)
+        keys = {sid, name, name[1:], choseong(name), choseong(name[1:])}
+        entries.extend((k, i) for k in keys if k)
+
+    entries.sort()
+    index['keys'] = [k for k, _ in entries]
+    index['owners'] = [i for _, i in entries]
+    return index
+
+
+def get_student_search_index(db_manager):
+    """Search index for the currently loaded 'Students' sheet (cached per data version)."""
+    students_df = db_manager.load_dataframe("Students")
+    return get_cached(db_manager, "student_search", (students_df,), lambda: build_student_search_index(students_df))
+
+
+def search_students(index, query, limit=10):
+    """
+    Students whose 학번 or name (with or without the surname, or its 초성) starts with 'query'.
+    Exact 학번/name matches come first, then the rest in key order. At most 'limit' results.
+    """
+    query = "".join(str(query).split())
+    if not query or not index['keys']:
+        return []
+
+    keys, head = index['keys'], query[:-1]
+    found = dict.fromkeys(index['exact'].get(query, []))
+    for lo_ch, hi_ch in _last_char_ranges(query[-1]):
+        start = bisect_left(keys, head + lo_ch)
+        end = bisect_right(keys, head + hi_ch + "\uffff", lo=start)
+        for pos in range(start, end):
+            if len(found) >= limit:
+                break
+            found.setdefault(index['owners'][pos])
+    return [index['students'][i] for i in list(found)[:limit]]
+
+
+def student_label(student):
+    """One-line label for suggestion lists, e.g. '10101 김민서 (1학년 1반)'."""
+    return f"{student['학번']} {student['이름']} ({student['학년']}학년 {student['반']}반)"
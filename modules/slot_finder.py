@@ -0,0 +1,215 @@
+"""
+Scores every (week, day, period) cell of the grid as a slot for one subject.
+
+The context built once per data version holds the occupancy grid as a [cell, subject]
+matrix, which subjects each teacher teaches and how many class groups (rooms) each
+subject needs. Scoring a subject is then a few matrix products over all cells at once:
+students who would clash, teachers already teaching, missing rooms and how full the
+students' day already is. Fast enough to rerun whenever the subject selection changes.
+"""
+import numpy as np
+import pandas as pd
+
+from modules import occupancy, perf
+from modules.indexes import bit_positions, get_cached, get_enrollment_codes, split_list, subject_bits
+from modules.rooms import get_class_groups, load_rooms
+
+# Score weights (lower is better). A teacher who already teaches in the cell is a hard
+# clash; every clashing student outweighs a missing room, and both outweigh a busy day
+# (the average number of classes the students already have that day).
+TEACHER_WEIGHT = 1000
+CONFLICT_WEIGHT = 10
+ROOM_WEIGHT = 5
+
+SUGGESTION_COLUMNS = ['주차', '요일', '교시', '충돌 학생', '교사 충돌', '강의실 부족', '당일 수업', '점수']
+
+
+def build_slot_context(occ, codes, teachers_df, groups, n_rooms):
+    """
+    Subject-indexed matrices for scoring. The vocabulary is the enrollment subjects
+    followed by subjects only found in the timetable or the Teachers sheet.
+    Returns dict:
+        'subjects' / 'subject_code': vocabulary
+        'cells': bool [W * D * P, subjects], subject scheduled in the cell
+        'teachers' / 'teaches': teacher names and bool [teacher, subject]
+        'groups': int [subject] class groups (rooms needed); 'n_rooms': rooms in the Rooms sheet
+    """
+    subject_code = dict(codes['subject_code'])
+    teacher_rows = teachers_df.to_dict('records') if not teachers_df.empty and 'Subject' in teachers_df.columns else []
+    for s in list(occ['subjects']) + [r['Subject'] for r in teacher_rows]:
+        subject_code.setdefault(s, len(subject_code))
+    n_sub = len(subject_code)
+
+    n_cells = occ['count'].size
+    cells = np.zeros((n_cells, n_sub), dtype=bool)
+    cell_of_row = np.repeat(np.arange(n_cells), occ['count'].ravel())
+    occ_to_vocab = np.array([subject_code[s] for s in occ['subjects']], dtype=np.int64)
+    cells[cell_of_row, occ_to_vocab[occ['row_subject'][occ['cell_rows']]]] = True
+
+    teacher_code = {}
+    for r in teacher_rows:
+        teacher_code.setdefault(r['TeacherName'], len(teacher_code))
+    teaches = np.zeros((len(teacher_code), n_sub), dtype=bool)
+    for r in teacher_rows:
+        if split_list(r.get('AssignedClasses')):
+            teaches[teacher_code[r['TeacherName']], subject_code[r['Subject']]] = True
+
+    group_counts = np.zeros(n_sub, dtype=np.int64)
+    for s, g in groups.items():
+        if s in subject_code:
+            group_counts[subject_code[s]] = len(g)
+
+    return {
+        'subjects': list(subject_code), 'subject_code': subject_code, 'cells': cells,
+        'teachers': list(teacher_code), 'teaches': teaches, 'groups': group_counts, 'n_rooms': n_rooms,
+    }
+
+
+def get_slot_context(db_manager):
+    """Slot scoring context for the loaded sheets (cached per data version)."""
+    occ = occupancy.get_occupancy(db_manager)
+    codes = get_enrollment_codes(db_manager)
+    teachers_df = db_manager.load_dataframe("Teachers")
+    rooms_df = db_manager.load_dataframe("Rooms")
+    return get_cached(
+        db_manager, "slot_context", (occ, codes, teachers_df, rooms_df),
+        lambda: build_slot_context(occ, codes, teachers_df, get_class_groups(db_manager), len(load_rooms(db_manager))),
+    )
+
+
+@perf.timed()
+def score_slots(db_manager, subject, weeks=()):
+    """
+    Scores every cell of the configured grid for placing 'subject', over the timetable's
+    weeks plus 'weeks' (e.g. a week that has no slots yet).
+    Returns dict with 'weeks' / 'days' / 'periods' axes, [W, D, P] arrays 'conflicts'
+    (students who already have another class), 'teacher_busy' (teachers of the subject
+    already teaching), 'room_short' (class groups without a free room), 'day_load'
+    (average classes the students have that day), 'placed' (subject already there),
+    'valid' (cell on the configured grid) and 'score', plus 'students', 'teachers', 'rooms_needed'.
+    """
+    occ = occupancy.get_occupancy(db_manager)
+    codes = get_enrollment_codes(db_manager)
+    ctx = get_slot_context(db_manager)
+    W, D, P = occ['count'].shape
+    s = ctx['subject_code'].get(subject)
+
+    # Students of the subject (exception students never get a timetable, as in batch saves)
+    students = bit_positions(subject_bits(codes, subject) & codes['active'], codes['n'])
+    k = len(students)
+    others = ctx['cells'].copy()
+    if s is not None:
+        others[:, s] = False
+    placed = ctx['cells'][:, s] if s is not None else np.zeros(len(others), dtype=bool)
+
+    # Students with the same subject set clash in the same cells: score each distinct set once
+    conflicts = np.zeros(len(others), dtype=np.int64)
+    if k:
+        taken = np.zeros((k, len(ctx['subjects'])), dtype=bool)
+        starts = codes['offsets'][students]
+        lengths = codes['offsets'][students + 1] - starts
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        taken[np.repeat(np.arange(k), lengths), codes['subject_codes'][np.repeat(starts, lengths) + within]] = True
+        patterns, counts = np.unique(taken, axis=0, return_counts=True)
+        busy = others.astype(np.float32) @ patterns.T.astype(np.float32) > 0
+        conflicts = busy.astype(np.int64) @ counts
+
+    # Teachers of the subject who teach something else in the cell
+    teacher_rows = ctx['teaches'][:, s] if s is not None else np.zeros(len(ctx['teachers']), dtype=bool)
+    teacher_busy = (others.astype(np.float32) @ ctx['teaches'][teacher_rows].T.astype(np.float32) > 0).sum(axis=1)
+
+    # Rooms: every class group of the cell holds one room
+    rooms_needed = int(ctx['groups'][s]) if s is not None else 0
+    room_short = np.zeros(len(others), dtype=np.int64)
+    if ctx['n_rooms']:
+        free = ctx['n_rooms'] - others.astype(np.int64) @ ctx['groups']
+        room_short = np.clip(rooms_needed - free, 0, rooms_needed)
+
+    # Classes per student that day, counting the cells where the subject already is
+    busy_students = np.where(placed, k, conflicts).reshape(W, D, P)
+    day_load = np.repeat(busy_students.sum(axis=2, keepdims=True) / max(k, 1), P, axis=2)
+
+    shape = (W, D, P)
+    result = {
+        'weeks': list(occ['weeks']), 'days': list(occ['days']), 'periods': list(occ['periods']),
+        'conflicts': conflicts.reshape(shape), 'teacher_busy': teacher_busy.reshape(shape),
+        'room_short': room_short.reshape(shape), 'day_load': day_load,
+        'placed': placed.reshape(shape), 'valid': np.broadcast_to(occ['valid'], shape),
+        'students': k, 'teachers': int(teacher_rows.sum()), 'rooms_needed': rooms_needed,
+    }
+
+    # Weeks without any slot yet: an empty grid, only the configured shape matters
+    extra = sorted({int(w) for w in weeks} - set(result['weeks']))
+    if extra:
+        order = np.argsort(result['weeks'] + extra, kind='stable')
+        result['weeks'] = [(result['weeks'] + extra)[i] for i in order]
+        for key in ('conflicts', 'teacher_busy', 'room_short', 'day_load', 'placed', 'valid'):
+            arr = result[key]
+            blank = np.broadcast_to(occ['valid'], (len(extra), D, P)) if key == 'valid' else np.zeros((len(extra), D, P), dtype=arr.dtype)
+            result[key] = np.concatenate([arr, blank])[order]
+
+    result['score'] = (
+        result['teacher_busy'] * TEACHER_WEIGHT + result['conflicts'] * CONFLICT_WEIGHT
+        + result['room_short'] * ROOM_WEIGHT + result['day_load']
+    )
+    return result
+
+
+def rank_slots(result, limit=20, week=None):
+    """Best free cells first (lowest score), optionally in one week. DataFrame[SUGGESTION_COLUMNS]."""
+    candidates = result['valid'] & ~result['placed']
+    if week is not None:
+        candidates &= (np.array(result['weeks']) == int(week))[:, None, None]
+    w, d, p = np.nonzero(candidates)
+    scores = result['score'][w, d, p]
+    order = np.lexsort((p, d, w, scores))[:limit]
+    w, d, p = w[order], d[order], p[order]
+    return pd.DataFrame({
+        '주차': [result['weeks'][i] for i in w],
+        '요일': [result['days'][i] for i in d],
+        '교시': [result['periods'][i] for i in p],
+        '충돌 학생': result['conflicts'][w, d, p],
+        '교사 충돌': result['teacher_busy'][w, d, p],
+        '강의실 부족': result['room_short'][w, d, p],
+        '당일 수업': np.round(result['day_load'][w, d, p], 1),
+        '점수': np.round(result['score'][w, d, p], 1),
+    }, columns=SUGGESTION_COLUMNS)
+
+
+def _color(score, best, worst):
+    if worst <= best:
+        return "#c8e6c9"
+    # green -> yellow -> red
+    t = min(1.0, (score - best) / (worst - best))
+    r, g = (int(200 + 110 * t), 230) if t < 0.5 else (255, int(230 - 300 * (t - 0.5)))
+    return f"#{r:02x}{g:02x}90"
+
+
+def week_heatmap(result, week, shape):
+    """
+    (text, css) DataFrames for one week (rows = periods, columns = days), for st.dataframe(text.style.apply(...)).
+    Cells show the clashing students (or '배정됨'); colors run green (best) to red (worst).
+    """
+    text = pd.DataFrame("", index=pd.Index(shape['periods'], name='교시'), columns=pd.Index(shape['days'], name='요일'))
+    css = pd.DataFrame("", index=text.index, columns=text.columns)
+    if int(week) not in result['weeks']:
+        return text, css
+    w = result['weeks'].index(int(week))
+    day_index = {d: i for i, d in enumerate(result['days'])}
+    scores = result['score'][w][result['valid'][w] & ~result['placed'][w]]
+    best, worst = (scores.min(), scores.max()) if len(scores) else (0, 0)
+    for day in shape['days']:
+        d = day_index[day]
+        for p in range(shape['periods_per_day'][day]):
+            if result['placed'][w, d, p]:
+                text.iat[p, shape['days'].index(day)] = "배정됨"
+                css.iat[p, shape['days'].index(day)] = "background-color: #bbdefb"
+                continue
+            label = f"{result['conflicts'][w, d, p]}명"
+            if result['teacher_busy'][w, d, p]:
+                label += " · 교사"
+            if result['room_short'][w, d, p]:
+                label += " · 강의실"
+            text.iat[p, shape['days'].index(day)] = label
+            css.iat[p, shape['days'].index(day)] = f"background-color: {_color(result['score'][w, d, p], best, worst)}"
+    return text, css
@@ -0,0 +1,142 @@
+import pandas as pd
+from modules.indexes import get_enrollment_index, split_list
+from modules import perf
+
+ASSIGNMENT_COLUMNS = ['Subject', 'TeacherName', 'AssignedClasses', 'Room']
+
+
+def get_subject_periods(db_manager):
+    """Number of scheduled slots per subject over the whole Timetable."""
+    timetable_df = db_manager.load_dataframe("Timetable")
+    if timetable_df.empty or 'Subject' not in timetable_df.columns:
+        return {}
+    return timetable_df['Subject'].value_counts().to_dict()
+
+
+@perf.timed()
+def get_teacher_loads(db_manager, exclude_subjects=()):
+    """
+    Current load per teacher from the 'Teachers' sheet.
+    Students = enrolled students in the assigned classes, Periods = scheduled slots of the subject.
+    Returns dict {teacher: {'Students': int, 'Periods': int, 'Subjects': set}}
+    """
+    index = get_enrollment_index(db_manager)
+    subject_periods = get_subject_periods(db_manager)
+    teachers_df = db_manager.load_dataframe("Teachers")
+
+    loads = {}
+    if teachers_df.empty:
+        return loads
+
+    by_subject_class = index['by_subject_class']
+    for t_row in teachers_df.to_dict('records'):
+        subject = t_row.get('Subject')
+        if subject in exclude_subjects:
+            continue
+        load = loads.setdefault(t_row['TeacherName'], {'Students': 0, 'Periods': 0, 'Subjects': set()})
+        load['Students'] += sum(len(by_subject_class.get((subject, c), ())) for c in split_list(t_row.get('AssignedClasses')))
+        if subject not in load['Subjects']:
+            load['Subjects'].add(subject)
+            load['Periods'] += subject_periods.get(subject, 0)
+    return loads
+
+
+@perf.timed()
+def balance_teacher_assignments(db_manager, subject_teachers):
+    """
+    Distributes the classes of each subject across its available teachers so that
+    student load and scheduled periods end up as even as possible.
+    subject_teachers: {subject: [teacher_name, ...]}
+    Assignments of other subjects are kept and count as existing load.
+
+    Greedy LPT: largest classes first, each to the teacher whose load (students plus
+    periods weighted by the average class size per period) grows the least.
+    A teacher picks up the subject's periods only once, so classes of the same subject
+    tend to stay together unless that would unbalance student load.
+
+    Returns (assignments DataFrame, stats DataFrame)
+    """
+    subject_teachers = {s: [t for t in ts if t] for s, ts in subject_teachers.items() if ts}
+    index = get_enrollment_index(db_manager)
+    subject_periods = get_subject_periods(db_manager)
+    loads = get_teacher_loads(db_manager, exclude_subjects=set(subject_teachers))
+
+    # Keep the room a teacher already uses for the subject
+    teachers_df = db_manager.load_dataframe("Teachers")
+    rooms = {}
+    if not teachers_df.empty and 'Room' in teachers_df.columns:
+        for t_row in teachers_df.to_dict('records'):
+            room = t_row.get('Room')
+            if pd.notna(room) and str(room).strip():
+                rooms[(t_row['Subject'], t_row['TeacherName'])] = str(room).strip()
+
+    # Classes per subject with their student counts
+    subject_classes = {s: {} for s in subject_teachers}
+    for (subject, cls), sids in index['by_subject_class'].items():
+        if subject in subject_classes:
+            subject_classes[subject][cls] = len(sids)
+
+    total_students = sum(sum(c.values()) for c in subject_classes.values())
+    total_periods = sum(subject_periods.get(s, 0) for s in subject_teachers)
+    period_weight = total_students / total_periods if total_periods else 0
+
+    for teachers in subject_teachers.values():
+        for t in teachers:
+            loads.setdefault(t, {'Students': 0, 'Periods': 0, 'Subjects': set()})
+
+    def cost(load):
+        return load['Students'] + period_weight * load['Periods']
+
+    proposal = {}
+    # Biggest subjects first so they spread before small ones fill the gaps
+    for subject in sorted(subject_teachers, key=lambda s: -sum(subject_classes[s].values())):
+        teachers = subject_teachers[subject]
+        periods = subject_periods.get(subject, 0)
+        for cls, count in sorted(subject_classes[subject].items(), key=lambda x: (-x[1], x[0])):
+            def added(t):
+                extra_periods = 0 if subject in loads[t]['Subjects'] else periods
+                return cost(loads[t]) + count + period_weight * extra_periods
+
+            best = min(teachers, key=lambda t: (added(t), teachers.index(t)))
+            load = loads[best]
+            load['Students'] += count
+            if subject not in load['Subjects']:
+                load['Subjects'].add(subject)
+                load['Periods'] += periods
+            proposal.setdefault((subject, best), []).append((cls, count))
+
+    rows = []
+    for (subject, teacher), classes in proposal.items():
+        rows.append({
+            'Subject': subject,
+            'TeacherName': teacher,
+            'AssignedClasses': ','.join(sorted(c for c, _ in classes)),
+            'Room': rooms.get((subject, teacher), ""),
+            'Students': sum(n for _, n in classes),
+            'Periods': subject_periods.get(subject, 0),
+        })
+    assignments_df = pd.DataFrame(rows, columns=ASSIGNMENT_COLUMNS + ['Students', 'Periods'])
+    assignments_df = assignments_df.sort_values(['Subject', 'TeacherName']).reset_index(drop=True)
+
+    stats_df = pd.DataFrame([
+        {'TeacherName': t, 'Students': l['Students'], 'Periods': l['Periods'], 'Subjects': ','.join(sorted(l['Subjects']))}
+        for t, l in loads.items()
+    ], columns=['TeacherName', 'Students', 'Periods', 'Subjects'])
+    stats_df = stats_df.sort_values('TeacherName').reset_index(drop=True)
+
+    return assignments_df, stats_df
+
+
+@perf.timed()
+def apply_teacher_assignments(db_manager, assignments_df):
+    """
+    Replaces every 'Teachers' row of the proposed subjects with the proposal (one write).
+    """
+    df = db_manager.load_dataframe("Teachers")
+    if df.empty:
+        df = pd.DataFrame(columns=ASSIGNMENT_COLUMNS)
+
+    subjects = set(assignments_df['Subject'])
+    kept = df[~df['Subject'].isin(subjects)]
+    df = pd.concat([kept, assignments_df[ASSIGNMENT_COLUMNS]], ignore_index=True)
+    return db_manager.save_dataframe("Teachers", df)
@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+from modules.api import TimetableAPI, make_server
+from test_rooms import make_db
+
+
+def get(api, target, etag=None):
+    status, headers, body = api.handle(target, etag)
+    return status, headers.get('ETag'), json.loads(body) if body else None
+
+
+def test_routes_and_etags():
+    db = make_db()
+    api = TimetableAPI(db)
+
+    status, etag, body = get(api, '/student/10201?week=1')
+    assert status == 200 and body['이름'] == 'T1'
+    assert [(r['요일'], r['과목'], r['담당교사']) for r in body['schedule']] == [('월', 'Math', 'Lee'), ('월', 'Eng', 'Park'), ('화', 'Math', 'Lee')]
+    assert get(api, '/student/10201?week=1', etag)[0] == 304
+    assert get(api, '/student/99999')[0] == 404
+
+    assert [r['Period'] for r in get(api, '/teacher/Kim?week=1')[2]['schedule']] == [1, 2]
+    assert get(api, '/teacher/%EA%B9%80')[0] == 404  # 김
+    assert len(get(api, '/roster/Kim/Math?day=%EC%9B%94&period=1')[2]['students']) == 30  # 월
+    status, tt_etag, body = get(api, '/timetable?week=1&page_size=2')
+    assert body['total'] == 3 and len(body['rows']) == 2
+    assert get(api, '/timetable?week=x')[0] == 400 and get(api, '/nope')[0] == 404
+
+    # Re-reading unchanged sheets keeps the ETags; a changed sheet only affects the routes that read it
+    db.data["Students"] = db.data["Students"].copy()
+    assert get(api, '/student/10201?week=1', etag)[0] == 304
+    db.data["Students"] = pd.concat([db.data["Students"], db.data["Students"].tail(1).assign(학번='10299')])
+    assert get(api, '/student/10201?week=1', etag)[0] == 200
+    assert get(api, '/timetable?week=1&page_size=2', tt_etag)[0] == 304
+
+
+def test_refresh_and_http_server():
+    db = make_db()
+    now = [0.0]
+    api = TimetableAPI(db, refresh_s=60, clock=lambda: now[0])
+    reads = []
+    load = db.load_dataframe
+    db.load_dataframe = lambda name, force_update=False: (reads.append(force_update), load(name))[1]
+
+    api.refresh()
+    api.refresh()
+    now[0] = 61
+    api.refresh()
+    assert reads.count(True) == 4  # one forced re-read of the 4 API sheets after 60 s
+
+    server = make_server(api, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/timetable"
+        with urllib.request.urlopen(url) as r:
+            etag = r.headers['ETag']
+            assert json.loads(r.read())['total'] == 3
+        try:
+            urllib.request.urlopen(urllib.request.Request(url, headers={'If-None-Match': etag}))
+            assert False, "expected 304"
+        except urllib.error.HTTPError as e:
+            assert e.code == 304
+    finally:
+        server.shutdown()
+        server.server_close()
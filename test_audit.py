@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import io
+
+import pandas as pd
+from openpyxl import load_workbook
+from modules import audit, excel_export, logic, occupancy
+from test_rooms import make_db
+
+
+def make_audit_db():
+    """The 월1 Math+Eng pair (10 shared students) is scheduled again in week 2 at 월4."""
+    db = make_db()
+    tt = db.data["Timetable"]
+    db.data["Timetable"] = pd.concat([tt, tt.head(2).assign(Week=2, Period=4)], ignore_index=True)
+    return db
+
+
+def test_conflicts_are_counted_per_cell():
+    a = audit.get_audit(make_audit_db())
+    d = {day: i for i, day in enumerate(a['days'])}
+    assert a['weeks'] == [1, 2]
+    assert a['conflicts'][0, d['월'], 0] == 10 and a['conflicts'][1, d['월'], 3] == 10
+    assert a['conflicts'][0, d['화'], 1] == 0 and a['conflicts'].sum() == 20
+
+
+def test_pairs_accumulate_over_cells():
+    a = audit.get_audit(make_audit_db())
+    assert a['pairs'].values.tolist() == [['Eng', 'Math', 10, 2, 20]]
+
+
+def test_rows_list_each_student_and_cell():
+    a = audit.get_audit(make_audit_db())
+    assert len(a['rows']) == 20 and a['rows']['과목'].eq("Math, Eng").all()
+    assert a['rows']['학번'].tolist()[:2] == ['10201', '10202']
+    assert audit.summary(a) == {'students': 10, 'incidents': 20, 'cells': 2, 'pairs': 1}
+
+
+def test_audit_agrees_with_find_timetable_conflicts():
+    assert len(logic.find_timetable_conflicts(make_audit_db(), week=2)) == 10
+
+
+def test_exception_students_are_left_out():
+    db = make_audit_db()
+    db.data["Students"]['is_exception'] = db.data["Students"]['학번'] == '10201'
+    assert audit.summary(audit.get_audit(db))['students'] == 9
+
+
+def test_term_heatmap_marks_clashing_cells():
+    db = make_audit_db()
+    counts, css = audit.term_heatmap(audit.get_audit(db), occupancy.load_grid_shape(db))
+    assert counts.at[1, '월1'] == 10 and counts.at[2, '월4'] == 10 and counts.at[1, '화2'] == 0
+    assert css.at[1, '화2'] == "" and css.at[1, '월1'].startswith("background-color")
+
+
+def test_audit_workbook_has_the_three_sheets():
+    data, stats = excel_export.audit_workbook_bytes(make_audit_db())
+    assert stats == {'students': 10, 'incidents': 20, 'cells': 2, 'pairs': 1}
+    wb = load_workbook(io.BytesIO(data))
+    assert wb.sheetnames == ["충돌 현황", "충돌 학생", "충돌 과목 쌍"] and wb["충돌 학생"].max_row == 21
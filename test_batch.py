@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import multiprocessing
+
+import pytest
+from modules import batch
+from modules.logic import get_students_in_class
+from test_rooms import make_db
+
+
+def targets_of(db):
+    return get_students_in_class(db, 1, 1) + get_students_in_class(db, 1, 2)
+
+
+def serial_pages(db, targets):
+    return [(s['학번'], html) for _, _, pages in batch.iter_student_pages(db, targets, executor="serial") for s, html in pages]
+
+
+def test_thread_pool_returns_pages_in_target_order():
+    db = make_db()
+    targets = targets_of(db)
+    pooled = [(s['학번'], html) for _, _, pages in batch.iter_student_pages(db, targets, executor="thread", workers=3, chunk_size=4) for s, html in pages]
+    assert pooled == serial_pages(db, targets)
+    assert [sid for sid, _ in pooled] == [t['학번'] for t in targets]
+
+
+def test_progress_counts_up_to_every_target():
+    db = make_db()
+    targets = targets_of(db)
+    progress = [(done, total) for done, total, _ in batch.iter_student_pages(db, targets, executor="thread", workers=3, chunk_size=4)]
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+    assert progress[-1] == (40, 40)
+
+
+def test_small_batches_render_serially():
+    db = make_db()
+    targets = get_students_in_class(db, 1, 2)
+    assert len(targets) < batch.MIN_PARALLEL
+    assert [done for done, _, _ in batch.iter_student_pages(db, targets, workers=4)] == list(range(1, 11))
+
+
+@pytest.mark.skipif("forkserver" not in multiprocessing.get_all_start_methods(), reason="needs forkserver")
+def test_process_pool_ships_the_snapshot_once_per_worker(monkeypatch):
+    db = make_db()
+    targets = targets_of(db)
+    pickled = []
+    getstate = batch.SnapshotDB.__getstate__
+    monkeypatch.setattr(batch.SnapshotDB, "__getstate__", lambda self: pickled.append(1) or getstate(self))
+
+    pooled = [(s['학번'], html) for _, _, pages in batch.iter_student_pages(db, targets, workers=2, chunk_size=4) for s, html in pages]
+    assert pooled == serial_pages(db, targets)
+    assert 1 <= len(pickled) <= 2  # 10 chunks, one snapshot per worker
@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import pandas as pd
+from modules import audit
+from modules.cli import main
+from test_repair import make_repair_db
+from test_rooms import make_db
+
+
+def test_check_solve_precompute():
+    db = make_db()
+    assert main(["check"], db=db) == 1  # the 10 Math+Eng students of 1-2 clash on 월 1교시
+    db.data["Timetable"] = db.data["Timetable"].assign(Period=[1, 3, 2])
+    assert main(["check", "--week", "1"], db=db) == 0
+
+    assert main(["solve", "--dry-run"], db=db) == 0 and "RoomSchedule" not in db.data
+    assert main(["solve"], db=db) == 0
+    assert len(db.data["RoomSchedule"]) == 5 and (db.data["RoomSchedule"]['Room'] != "").all()
+
+
+def test_ingest_and_exports(tmp_path):
+    db = make_db()
+    xlsx = tmp_path / "명단.xlsx"
+    pd.DataFrame([
+        {'학번': '20101', '이름': '김민서', '미도달과목': '국어(4학점), 영어(3학점)', '예외처리': ''},
+        {'학번': '20102', '이름': '박민', '미도달과목': '국어(4학점)', '예외처리': '전학'},
+    ]).to_excel(xlsx, index=False)
+    assert main(["ingest", str(tmp_path / "missing.xlsx")], db=db) == 2
+    assert main(["ingest", str(xlsx), "--dry-run"], db=db) == 0 and len(db.data["Students"]) == 40
+    assert main(["ingest", str(xlsx)], db=db) == 0
+    assert db.data["Students"]['학번'].tolist() == ['20101', '20102']
+
+    db = make_db()
+    assert main(["precompute", "--output", str(tmp_path / "s.csv")], db=db) == 0
+    assert len(pd.read_csv(tmp_path / "s.csv")) == 30 * 2 + 10 * 3
+    assert main(["export", "html", "--grade", "1", "--class", "2", "--output", str(tmp_path / "t.html")], db=db) == 0
+    assert (tmp_path / "t.html").read_text(encoding='utf-8').count('class="print-page"') == 10
+    assert main(["export", "pdf", "--output", str(tmp_path / "t.pdf")], db=db) == 0
+    assert (tmp_path / "t.pdf").read_bytes().startswith(b"%PDF")
+    assert main(["export", "xlsx", "--week", "1", "--output", str(tmp_path / "t.xlsx")], db=db) == 0
+    assert main(["export", "pdf", "--grade", "3", "--output", str(tmp_path / "none.pdf")], db=db) == 1
+
+
+def test_repair_dry_run_and_apply():
+    db = make_repair_db()
+    assert main(["repair", "--dry-run"], db=db) == 0 and len(audit.get_audit(db)['rows']) == 10
+    assert main(["repair"], db=db) == 0 and audit.get_audit(db)['rows'].empty
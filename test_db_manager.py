@@ -0,0 +1,150 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import pandas as pd
+import modules.db_manager as db_module
+from modules.db_manager import DBManager
+from modules.fake_sheets import FakeClient, VirtualClock
+
+
+def make_db(monkeypatch, tmp_path, **backend):
+    # Local fallback writes to ./data, keep it out of the repo
+    monkeypatch.chdir(tmp_path)
+    clock = VirtualClock()
+    monkeypatch.setattr(db_module.time, "sleep", clock.sleep)
+    client = FakeClient(clock=clock, **backend)
+    db = DBManager()
+    db.client = client
+    return db, client, clock
+
+
+def test_round_trip_matches_sheets_types(monkeypatch, tmp_path):
+    db, client, _ = make_db(monkeypatch, tmp_path)
+    df = pd.DataFrame([{'학번': '10101', '반': '01', 'is_exception': False, 'parsed_subjects': 'A,B'}])
+    assert db.save_dataframe("Students", df)
+
+    # Sheets hands back 10101 / 1 / 'FALSE'; DBManager normalizes them to the schema types on load
+    loaded = db.load_dataframe("Students", force_update=True)
+    row = loaded.iloc[0]
+    assert row['학번'] == '10101' and row['반'] == '1'  # the leading zero is lost in Sheets itself
+    assert loaded['is_exception'].dtype == bool and not row['is_exception']
+    assert row['parsed_subjects'] == 'A,B'
+
+
+def test_loaded_frames_use_schema_types(monkeypatch, tmp_path):
+    from modules import logic
+    db, client, _ = make_db(monkeypatch, tmp_path)
+    client.seed({
+        "Students": pd.DataFrame([
+            {'학번': 10101, '이름': 'A', '학년': 1, '반': 1, '번호': 1, 'parsed_subjects': 'Math', 'is_exception': 'FALSE'},
+            {'학번': 10102, '이름': 'B', '학년': 1, '반': 1, '번호': 2, 'parsed_subjects': 'Math', 'is_exception': 'TRUE'},
+        ]),
+        "Teachers": pd.DataFrame([{'Subject': 'Math', 'TeacherName': 'Kim', 'AssignedClasses': '1-1', 'Room': 101}]),
+        # Legacy sheet without Week/Date, Period as text
+        "Timetable": pd.DataFrame([{'Day': '화', 'Period': '2', 'Subject': 'Math'}, {'Day': '월', 'Period': '1', 'Subject': 'Math'}]),
+    })
+
+    tt = db.load_dataframe("Timetable")
+    assert tt['Week'].tolist() == [1, 1] and tt['Period'].dtype == 'int64'
+    assert isinstance(tt['Day'].dtype, pd.CategoricalDtype) and tt['Day'].cat.ordered
+    assert db.load_dataframe("Students")['is_exception'].tolist() == [False, True]
+
+    schedule, _, name = logic.generate_student_timetable(db, '10101')
+    assert name == 'A' and schedule['요일'].tolist() == ['월', '화'] and schedule['장소'].tolist() == ['101', '101']
+    assert logic.generate_student_timetable(db, 10102)[0] is None
+    assert logic.get_students_in_class(db, 1, 1) == [{'학번': '10101', '이름': 'A'}]
+
+    # Categoricals are written back as plain text
+    assert logic.add_timetable_slot(db, 1, "", '수', 3, 'Eng')[0]
+    assert db.load_dataframe("Timetable", force_update=True)['Subject'].tolist() == ['Math', 'Math', 'Eng']
+
+
+def test_cache_and_missing_sheet_are_not_refetched(monkeypatch, tmp_path):
+    db, client, _ = make_db(monkeypatch, tmp_path)
+    assert db.load_dataframe("RoomSchedule").empty
+    assert db.load_dataframe("RoomSchedule").empty
+    assert client.stats()['worksheet'] == {'200': 1}
+    # force_update asks Sheets again, e.g. after the sheet was created elsewhere
+    assert db.load_dataframe("RoomSchedule", force_update=True).empty
+    assert client.stats()['worksheet'] == {'200': 2}
+
+
+def test_injected_429_is_retried_with_backoff(monkeypatch, tmp_path):
+    db, client, clock = make_db(monkeypatch, tmp_path, fail_calls=[4])
+    client.seed({"Teachers": pd.DataFrame([{'Subject': 'A', 'TeacherName': 'Kim'}])})
+
+    # calls: open_by_url(1), worksheet(2), get_all_records(3) ok; then worksheet(4) fails once
+    db.load_dataframe("Teachers")
+    df = db.load_dataframe("Teachers", force_update=True)
+    assert len(df) == 1
+    assert not db.is_local
+    assert clock.time() == 2  # first backoff step
+
+
+def test_read_quota_exhaustion_falls_back_then_recovers(monkeypatch, tmp_path):
+    db, client, clock = make_db(monkeypatch, tmp_path, read_quota_per_minute=3)
+    client.seed({"Teachers": pd.DataFrame([{'Subject': 'A', 'TeacherName': 'Kim'}])})
+
+    assert len(db.load_dataframe("Teachers")) == 1  # open_by_url, worksheet, get_all_records
+    df = db.load_dataframe("Teachers", force_update=True)
+    assert df.empty  # three 429s, then local fallback (no CSV here)
+    assert client.stats()['worksheet']['429'] == 3
+    assert clock.time() == 2 + 3
+
+    clock.sleep(60)
+    assert len(db.load_dataframe("Teachers", force_update=True)) == 1
+
+
+def test_perf_counters_track_cache_and_retries(monkeypatch, tmp_path):
+    from modules import perf
+    perf.reset()
+    db, client, _ = make_db(monkeypatch, tmp_path, fail_calls=[2])
+    client.seed({"Teachers": pd.DataFrame([{'Subject': 'A', 'TeacherName': 'Kim'}])})
+
+    db.load_dataframe("Teachers")
+    db.load_dataframe("Teachers")
+    snap = perf.snapshot()
+    assert snap['counters']['db.cache_miss'] == 1
+    assert snap['counters']['db.cache_hit'] == 1
+    assert snap['counters']['db.retries'] == 1
+    assert snap['counters']['db.sleep_s'] == 2
+    assert snap['counters']['db.bytes_read'] == db.load_dataframe("Teachers").memory_usage(index=False).sum()
+    timer = next(t for t in snap['timers'] if t['key'] == 'db.load_dataframe[Teachers]')
+    assert timer['count'] == 2
+
+
+def test_load_dataframes_fetches_sheets_in_parallel(monkeypatch, tmp_path):
+    import time
+    monkeypatch.chdir(tmp_path)
+    client = FakeClient(latency=0.05)
+    client.seed({name: pd.DataFrame([{'Subject': name}]) for name in ("Students", "Teachers", "Timetable", "Rooms")})
+    db = DBManager()
+    db.client = client
+    db.get_spreadsheet()
+
+    start = time.perf_counter()
+    frames = db.load_dataframes(["Students", "Teachers", "Timetable", "Rooms", "RoomSchedule"])
+    elapsed = time.perf_counter() - start
+    # Sequentially: 5 sheets x 2 calls x 50 ms
+    assert elapsed < 0.35
+    assert list(frames) == ["Students", "Teachers", "Timetable", "Rooms", "RoomSchedule"]
+    assert frames["RoomSchedule"].empty and frames["Teachers"]['Subject'].tolist() == ["Teachers"]
+    assert frames["Timetable"] is db.load_dataframe("Timetable")
+
+    # Everything cached now: no more API calls
+    calls = len(client.calls)
+    db.load_dataframes(["Students", "Teachers"])
+    assert len(client.calls) == calls
+
+
+def test_load_dataframes_respects_read_limiter(monkeypatch, tmp_path):
+    db, client, clock = make_db(monkeypatch, tmp_path, read_quota_per_minute=5)
+    client.seed({name: pd.DataFrame([{'Subject': name}]) for name in ("Students", "Teachers", "Timetable")})
+    db.read_limiter = db_module.RateLimiter(4, clock=clock)
+
+    frames = db.load_dataframes(["Students", "Teachers", "Timetable"])
+    # open_by_url + two sheets fit the first minute, the third sheet waits for the window
+    assert all(len(df) == 1 for df in frames.values())
+    assert '429' not in str(client.stats())
+    assert clock.time() == 60
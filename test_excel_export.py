@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import io
+
+import pandas as pd
+from openpyxl import load_workbook
+from modules import excel_export
+from modules.logic import generate_student_timetable, get_all_student_schedules
+from test_rooms import make_db
+
+
+def school_workbook(db, **kwargs):
+    buf = io.BytesIO()
+    stats = excel_export.write_school_workbook(db, buf, **kwargs)
+    return load_workbook(buf, read_only=True), stats
+
+
+def test_bulk_schedules_match_per_student_timetables():
+    db = make_db()
+    db.data["Students"].loc[0, 'is_exception'] = True
+    bulk = get_all_student_schedules(db)
+    for sid in db.data["Students"]['학번']:
+        sch, _, _ = generate_student_timetable(db, sid)
+        mine = bulk[bulk['학번'] == sid][['주차', '날짜', '요일', '교시', '과목', '담당교사', '장소']]
+        if sch is None:
+            assert mine.empty
+        else:
+            assert mine.reset_index(drop=True).astype(str).equals(sch.reset_index(drop=True).astype(str))
+
+
+def test_school_workbook_has_a_sheet_per_class():
+    db = make_db()
+    db.data["Students"].loc[0, 'is_exception'] = True
+    wb, stats = school_workbook(db)
+    assert wb.sheetnames == ["1-1반", "1-2반", excel_export.TEACHER_SHEET, excel_export.ROSTER_SHEET]
+    assert stats == {'students': 39, 'classes': 2, 'grids': 39, 'rows': 29 * 2 + 10 * 3}
+
+
+def test_class_sheet_stacks_the_subjects_of_a_cell():
+    wb, _ = school_workbook(make_db())
+    rows = list(wb["1-2반"].iter_rows(values_only=True))
+    assert rows[0][0] == "10201 T1 (1주차)"
+    assert rows[2][1] == "Math\nLee\n―\nEng\nPark"
+
+
+def test_roster_sheet_has_a_row_per_teacher_subject_and_student():
+    wb, _ = school_workbook(make_db())
+    assert len(list(wb[excel_export.ROSTER_SHEET].iter_rows())) == 1 + 30 + 10 + 10
+
+
+def test_teacher_sheet_skips_unused_day_period_combinations(monkeypatch):
+    # pandas < 3 defaults to observed=False, which adds a row per unused category combination
+    groupby = pd.DataFrame.groupby
+    monkeypatch.setattr(pd.DataFrame, "groupby", lambda self, *args, observed=False, **kwargs: groupby(self, *args, observed=observed, **kwargs))
+    wb, _ = school_workbook(make_db())
+    rows = list(wb[excel_export.TEACHER_SHEET].iter_rows(values_only=True))
+    counts = [row[rows[0].index('학생수')] for row in rows[1:]]
+    assert sorted(counts) == [10, 10, 10, 30, 30]
+
+def test_week_filter_leaves_out_other_weeks():
+    db = make_db()
+    db.data["Timetable"].loc[len(db.data["Timetable"])] = {'Week': 2, 'Date': '', 'Day': '수', 'Period': 3, 'Subject': 'Eng'}
+    _, stats = school_workbook(db, week=2)
+    assert stats['students'] == 10 and stats['rows'] == 10
+
+
+def test_roster_workbook_has_a_sheet_per_teacher():
+    buf = io.BytesIO()
+    stats = excel_export.write_roster_workbook(make_db(), buf)
+    wb = load_workbook(buf, read_only=True)
+    assert wb.sheetnames == ["Kim", "Lee", "Park"] and stats == {'teachers': 3, 'slots': 5}
+    rows = list(wb["Park"].iter_rows(values_only=True))
+    assert rows[0][0] == "1주차 월 1교시 · Eng (10명)" and rows[1][-1] == "확인"
+
+
+def test_roster_workbook_for_one_teacher():
+    assert excel_export.roster_workbook_bytes(make_db(), teacher_name='Lee')[1] == {'teachers': 1, 'slots': 2}
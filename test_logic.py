@@ -3,6 +3,7 @@ import os
 sys.path.append(os.getcwd())
 
 import pandas as pd
+from modules import schema
 try:
     from modules.logic import add_timetable_slot, generate_student_timetable, check_conflicts
 except ImportError as e:
@@ -22,10 +23,14 @@ class MockDB:
         }
         
     def load_dataframe(self, name, force_update=False):
-        return self.data.get(name, pd.DataFrame())
+        # Like DBManager: frames are normalized to the schema types once, then served from memory
+        df = self.data.get(name, pd.DataFrame())
+        if name in schema.SCHEMAS and not schema.is_normalized(name, df):
+            df = self.data[name] = schema.normalize(name, df)
+        return df
         
     def save_dataframe(self, name, df):
-        self.data[name] = df
+        self.data[name] = schema.normalize(name, df)
         return True
 
 def test():
@@ -64,5 +69,109 @@ def test():
         import traceback
         traceback.print_exc()
 
+
+def test_replicate_week_pattern():
+    from modules.logic import replicate_week_pattern
+    db = MockDB()
+    add_timetable_slot(db, 1, "", "월", 1, "Math")
+    add_timetable_slot(db, 1, "", "수", 2, "Math")
+    add_timetable_slot(db, 3, "03/17", "월", 1, "Math")
+
+    # Term starts Wednesday 2025-03-05 -> week 1 Monday is 03/03; week 2 Monday (03/10) is a holiday
+    success, msg, added = replicate_week_pattern(db, 1, 2, 4, term_start="2025-03-05", holidays=["2025-03-10"])
+    assert success, msg
+    assert added == 4  # 3 weeks x 2 slots - holiday - existing week 3 slot
+
+    tt = db.data["Timetable"]
+    week2 = tt[tt['Week'].astype(str) == '2']
+    assert week2[['Day', 'Date']].values.tolist() == [['수', '03/12']]
+    assert len(tt[(tt['Week'].astype(str) == '3') & (tt['Day'] == '월')]) == 1
+    assert tt[tt['Week'].astype(str) == '4']['Date'].tolist() == ['03/24', '03/26']
+
+
+def test_apply_timetable_changes_batch():
+    from modules.logic import apply_timetable_changes
+    db = MockDB()
+    db.data["Students"] = pd.DataFrame([
+        {'학번': '10101', '이름': 'A', '학년': '1', '반': '1', '번호': '1', 'parsed_subjects': 'Math,Eng', 'is_exception': False},
+        {'학번': '10102', '이름': 'B', '학년': '1', '반': '1', '번호': '2', 'parsed_subjects': 'Math', 'is_exception': False},
+    ])
+    adds = [
+        {'week': 1, 'date': '', 'day': '월', 'period': 1, 'subject': 'Math'},
+        {'week': 1, 'date': '', 'day': '월', 'period': 1, 'subject': 'Math'},
+        {'week': 1, 'date': '', 'day': '월', 'period': 1, 'subject': 'Eng'},
+    ]
+    success, msg, report = apply_timetable_changes(db, adds=adds)
+    assert not success
+    assert report['duplicates'] == [('1', '월', '1', 'Math')]
+    assert len(report['conflicts']) == 2
+    assert db.data["Timetable"].empty  # nothing saved on conflict
+
+    success, msg, report = apply_timetable_changes(db, adds=adds, check=False)
+    assert success and report['added'] == 2
+
+    success, msg, report = apply_timetable_changes(
+        db, adds=[{'week': 1, 'date': '', 'day': '화', 'period': 1, 'subject': 'Eng'}],
+        deletes=[{'week': '1', 'day': '월', 'period': '1', 'subject': 'Eng'}],
+    )
+    assert success and report == {'added': 1, 'deleted': 1, 'duplicates': [], 'conflicts': []}
+    assert sorted(db.data["Timetable"]['Day']) == ['월', '화']
+
+
+def test_query_timetable_filters_and_pages():
+    from modules.logic import query_timetable
+    db = MockDB()
+    db.data["Timetable"] = pd.DataFrame([
+        {'Week': w, 'Date': '', 'Day': d, 'Period': p, 'Subject': s}
+        for w in (2, 1) for d in ('화', '월') for p in (3, 1) for s in ('Math', 'Eng')
+    ])
+    page, total = query_timetable(db, page=1, page_size=3)
+    assert total == 16
+    assert page[['Week', 'Day', 'Period']].values.tolist() == [[1, '월', 1], [1, '월', 1], [1, '월', 3]]
+
+    page, total = query_timetable(db, week=2, day='화', subject='Eng', page_size=10)
+    assert total == 2
+    assert page['Period'].tolist() == [1, 3]
+
+    page, total = query_timetable(db, week=3)
+    assert total == 0 and page.empty
+
+
+def test_enrollment_codes_and_conflicts():
+    from modules.indexes import bit_positions, build_enrollment_codes
+    db = MockDB()
+    db.data["Students"] = pd.DataFrame([
+        {'학번': f'101{i:02d}', '이름': f'S{i}', '학년': '1', '반': '1', '번호': str(i),
+         'parsed_subjects': 'Math,Eng' if i % 2 else 'Math, Sci, Math', 'is_exception': i == 69}
+        for i in range(1, 71)
+    ])
+    db.data["Timetable"] = pd.DataFrame([
+        {'Week': 1, 'Date': '', 'Day': '월', 'Period': 1, 'Subject': s} for s in ('Sci', 'Eng', 'Math')
+    ])
+    codes = build_enrollment_codes(db.load_dataframe("Students"))
+    assert codes['subjects'] == ['Math', 'Eng', 'Sci']
+    assert codes['offsets'][:4].tolist() == [0, 2, 4, 6]  # duplicate 'Math' dropped
+    assert bit_positions(codes['bits'][2], codes['n']).tolist() == list(range(1, 70, 2))
+    assert len(bit_positions(codes['active'], codes['n'])) == 69
+
+    # Every Math student clashes once, with the first other subject of the cell, in sheet order
+    clashes = check_conflicts(db, 1, '월', 1, 'Math')
+    assert len(clashes) == 70
+    assert clashes[:2] == ["S1(10101) - Eng와 겹침", "S2(10102) - Sci와 겹침"]
+    assert check_conflicts(db, 1, '월', 2, 'Math') == []
+
+
+def test_popcount_matches_bit_positions(monkeypatch):
+    import numpy as np
+    from modules.indexes import bit_positions, popcount
+    bits = np.random.default_rng(0).integers(0, 2 ** 63, size=(3, 4), dtype=np.uint64)
+    expected = [len(bit_positions(b, 256)) for b in bits]
+    assert popcount(bits).tolist() == expected
+    assert popcount(bits[0]) == expected[0]
+    # numpy < 2.0 has no bitwise_count; the unpackbits path must agree
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    assert popcount(bits).tolist() == expected
+
+
 if __name__ == "__main__":
     test()
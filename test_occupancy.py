@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from modules import occupancy
+from modules.logic import check_conflicts, format_student_timetable_grid, generate_student_timetable
+from test_rooms import make_db
+
+
+def make_shaped_db():
+    """월 8, 화 7, 토 4 periods configured; an extra Eng/Math pair sits on 일 9, outside the grid."""
+    db = make_db()
+    occupancy.save_grid_shape(db, {'월': 8, '화': 7, '토': 4})
+    db.data["Timetable"].loc[len(db.data["Timetable"])] = {'Week': 1, 'Date': '', 'Day': '일', 'Period': 9, 'Subject': 'Eng'}
+    db.data["Timetable"].loc[len(db.data["Timetable"])] = {'Week': 1, 'Date': '', 'Day': '일', 'Period': 9, 'Subject': 'Math'}
+    return db
+
+
+def test_grid_shape_round_trips():
+    shape = occupancy.load_grid_shape(make_shaped_db())
+    assert shape['days'] == ['월', '화', '토']
+    assert shape['periods'] == list(range(1, 9))
+    assert shape['periods_per_day'] == {'월': 8, '화': 7, '토': 4}
+
+
+def test_occupancy_covers_slots_outside_the_grid():
+    occ = occupancy.get_occupancy(make_shaped_db())
+    assert occ['days'] == ['월', '화', '토', '일'] and len(occ['periods']) == 9
+    assert occ['count'].sum() == 5
+    assert not occ['valid'][2, 4]  # 토 has 4 periods
+    assert occupancy.cell_subjects(occ, 1, '월', 1) == ['Math', 'Eng']
+
+
+def test_week_grid_uses_the_configured_days_and_periods():
+    db = make_shaped_db()
+    grid = occupancy.week_grid(occupancy.get_occupancy(db), 1, occupancy.load_grid_shape(db))
+    assert list(grid.columns) == ['월', '화', '토'] and list(grid.index) == list(range(1, 9))
+    assert grid.at[1, '월'] == "Math, Eng" and grid.at[2, '화'] == "Math" and grid.at[1, '토'] == ""
+
+
+def test_slots_outside_the_grid_still_conflict():
+    assert len(check_conflicts(make_shaped_db(), 1, '일', 9, 'Math')) == 10
+
+
+def test_student_grid_follows_the_shape():
+    db = make_shaped_db()
+    sch, _, _ = generate_student_timetable(db, '10201')
+    html = format_student_timetable_grid(sch, {'id': '10201', 'name': 'T1', 'shape': occupancy.load_grid_shape(db)})
+    assert html.count("<th ") == 4 and html.count("<tr><td") == 8
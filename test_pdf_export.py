@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import reportlab
+from modules import batch, occupancy, pdf_export
+from modules.logic import generate_student_timetable, get_students_for_class_slot, get_students_in_class, load_period_times
+from test_rooms import make_db
+
+
+def page_count(pdf):
+    return pdf.count(b"/Type /Page\n")
+
+
+def test_grade_pdf_has_a_page_per_student_week():
+    db = make_db()
+    db.data["Timetable"].loc[len(db.data["Timetable"])] = {'Week': 2, 'Date': '', 'Day': '수', 'Period': 3, 'Subject': 'Eng'}
+    targets = get_students_in_class(db, 1)
+    entries = [p for _, _, pages in batch.iter_student_pages(db, targets, executor="serial", output="schedule") for p in pages]
+    pdf = pdf_export.student_timetables_pdf(entries, load_period_times(db))
+    assert pdf.startswith(b"%PDF")
+    assert page_count(pdf) == 30 + 10 * 2  # 1-2 also has Eng in week 2
+
+
+def test_unscheduled_student_still_gets_a_page():
+    pdf = pdf_export.student_timetables_pdf([({'학번': '10101', '이름': 'S1'}, None)])
+    assert page_count(pdf) == 1
+
+
+def test_roster_pdf_has_a_page_per_roster():
+    db = make_db()
+    rosters = [(f"{t} {s}", get_students_for_class_slot(db, t, s)) for t, s in [('Kim', 'Math'), ('Park', 'Eng')]]
+    assert page_count(pdf_export.class_rosters_pdf(rosters)) == 2
+
+
+def test_ttf_font_is_embedded(monkeypatch):
+    monkeypatch.setenv("TIMETABLE_PDF_FONT", os.path.join(os.path.dirname(reportlab.__file__), "fonts", "Vera.ttf"))
+    pdf_export.font_name.cache_clear()
+    pdf_export._styles.cache_clear()
+    try:
+        assert pdf_export.font_name() == "TimetableFont"
+        pdf = pdf_export.student_timetables_pdf([({'학번': '10101', '이름': 'S1'}, None)])
+        assert b"/FontFile2" in pdf
+    finally:
+        pdf_export.font_name.cache_clear()
+        pdf_export._styles.cache_clear()
+
+
+def test_timetable_pdf_follows_the_grid_shape():
+    db = make_db()
+    occupancy.save_grid_shape(db, {'월': 8, '화': 7, '토': 4})
+    sch, _, _ = generate_student_timetable(db, '10201')
+    pdf = pdf_export.student_timetables_pdf([({'학번': '10201', '이름': 'T1'}, sch)], shape=occupancy.load_grid_shape(db))
+    assert page_count(pdf) == 1
@@ -0,0 +1,27 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import pytest
+from modules import profiling
+
+
+def test_call_tree_rejects_invalid_pattern(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    profiler = profiling.start()
+    if profiler is None:
+        pytest.skip("another profiler is active")
+    sorted(range(1000))
+    summary = profiling.stop(profiler, "Test Page", 0.1)
+
+    assert "sorted" in profiling.call_tree_text(summary['id'], "sorted")
+    with pytest.raises(ValueError, match="잘못된 검색 패턴"):
+        profiling.call_tree_text(summary['id'], "generate_(")
+
+
+def test_profile_query_param_is_ignored_in_share_mode(monkeypatch):
+    monkeypatch.delenv("TIMETABLE_PROFILE", raising=False)
+    assert profiling.is_enabled({'profile': '1'})
+    assert not profiling.is_enabled({'profile': '1'}, share=True)
+    monkeypatch.setenv("TIMETABLE_PROFILE", "1")
+    assert profiling.is_enabled({}, share=True)
@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import pandas as pd
+from modules import logic, repair
+from test_rooms import make_db
+
+
+def make_repair_db():
+    """
+    One period a day on 월~수. The 10 students of 1-2 clash at 월1 (Math+Eng);
+    Park also teaches Art at 수1, so Eng cannot move there.
+    """
+    db = make_db()
+    db.data["Settings_Grid"] = pd.DataFrame({'Day': ['월', '화', '수'], 'Periods': [1, 1, 1]})
+    db.data["Teachers"] = pd.concat([db.data["Teachers"], pd.DataFrame([
+        {'Subject': 'Art', 'TeacherName': 'Park', 'AssignedClasses': '1-2', 'Room': ''}])], ignore_index=True)
+    db.data["Timetable"] = pd.DataFrame([
+        {'Week': 1, 'Date': '03/02', 'Day': '월', 'Period': 1, 'Subject': 'Math'},
+        {'Week': 1, 'Date': '03/02', 'Day': '월', 'Period': 1, 'Subject': 'Eng'},
+        {'Week': 1, 'Date': '03/03', 'Day': '화', 'Period': 1, 'Subject': 'Math'},
+        {'Week': 1, 'Date': '03/04', 'Day': '수', 'Period': 1, 'Subject': 'Art'},
+    ])
+    return db
+
+
+def lock_monday_math(db):
+    assert logic.lock_timetable_slots(db, [{'week': 1, 'day': '월', 'period': 1, 'subject': 'Math', 'locked': True}])[0]
+
+
+def test_single_move_fixes_the_clash():
+    plan, summary = repair.repair_timetable(make_repair_db())
+    assert plan.values.tolist() == [[1, 'Math', '월', 1, '수', 1, '03/04']]
+    assert summary['before'] == 10 and summary['after'] == 0 and summary['complete']
+
+
+def test_locked_slot_forces_a_two_move_chain():
+    db = make_repair_db()
+    lock_monday_math(db)
+    plan, summary = repair.repair_timetable(db)
+    assert plan.values.tolist() == [[1, 'Eng', '월', 1, '화', 1, '03/03'], [1, 'Math', '화', 1, '수', 1, '03/04']]
+    assert summary['moves'] == 2 and summary['locked'] == 1 and summary['after'] == 0
+
+
+def test_apply_repair_keeps_locks_and_rejects_stale_plans():
+    db = make_repair_db()
+    lock_monday_math(db)
+    plan, _ = repair.repair_timetable(db)
+    assert repair.apply_repair(db, plan)[0]
+    tt = db.data["Timetable"]
+    assert len(tt) == 4 and tt.loc[tt['Locked'], ['Day', 'Subject']].values.tolist() == [['월', 'Math']]
+    assert repair.apply_repair(db, plan)[0] is False
+
+
+def test_nothing_to_repair():
+    db = make_repair_db()
+    db.data["Timetable"] = db.data["Timetable"].drop(index=1)
+    plan, summary = repair.repair_timetable(db)
+    assert plan.empty and summary['before'] == 0 and summary['moves'] == 0
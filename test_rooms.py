@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import pandas as pd
+from modules.rooms import allocate_rooms, _solve_assignment
+from test_logic import MockDB
+
+
+def make_db():
+    db = MockDB()
+    db.data["Students"] = pd.DataFrame([
+        {'학번': f'101{i:02d}', '이름': f'S{i}', '학년': '1', '반': '1', '번호': str(i), 'parsed_subjects': 'Math', 'is_exception': False}
+        for i in range(1, 31)
+    ] + [
+        {'학번': f'102{i:02d}', '이름': f'T{i}', '학년': '1', '반': '2', '번호': str(i), 'parsed_subjects': 'Math,Eng', 'is_exception': False}
+        for i in range(1, 11)
+    ])
+    db.data["Teachers"] = pd.DataFrame([
+        {'Subject': 'Math', 'TeacherName': 'Kim', 'AssignedClasses': '1-1', 'Room': 'A'},
+        {'Subject': 'Math', 'TeacherName': 'Lee', 'AssignedClasses': '1-2', 'Room': ''},
+        {'Subject': 'Eng', 'TeacherName': 'Park', 'AssignedClasses': '1-2', 'Room': ''},
+    ])
+    db.data["Rooms"] = pd.DataFrame([
+        {'Room': 'A', 'Capacity': 12},
+        {'Room': 'B', 'Capacity': 35},
+        {'Room': 'C', 'Capacity': 10},
+    ])
+    db.data["Timetable"] = pd.DataFrame([
+        {'Week': 1, 'Date': '', 'Day': '월', 'Period': 1, 'Subject': 'Math'},
+        {'Week': 1, 'Date': '', 'Day': '월', 'Period': 1, 'Subject': 'Eng'},
+        {'Week': 1, 'Date': '', 'Day': '화', 'Period': 2, 'Subject': 'Math'},
+    ])
+    return db
+
+
+def test_solve_assignment_is_optimal():
+    cost = [[4, 1, 3], [2, 0, 5], [3, 2, 2]]
+    assert _solve_assignment(cost) == [1, 0, 2]
+
+
+def test_allocate_rooms_no_double_booking_and_min_oversubscription():
+    alloc, summary = allocate_rooms(make_db())
+
+    assert summary['unassigned'] == 0
+    assert summary['over_seats'] == 0
+    for _, cell in alloc.groupby(['Week', 'Day', 'Period']):
+        assert cell['Room'].is_unique
+
+    first = alloc[(alloc['Day'] == '월')].set_index('TeacherName')
+    assert first.loc['Kim', 'Students'] == 30
+    assert first.loc['Kim', 'Room'] == 'B'
+
+
+def test_allocate_rooms_reports_unassigned_when_rooms_run_out():
+    db = make_db()
+    db.data["Rooms"] = pd.DataFrame([{'Room': 'B', 'Capacity': 35}])
+    alloc, summary = allocate_rooms(db)
+
+    assert summary['unassigned'] == 3
+    assert (alloc[alloc['Day'] == '월']['Room'] == 'B').sum() == 1
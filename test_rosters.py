@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from modules.logic import get_students_for_class_slot, iter_slot_rosters
+from test_rooms import make_db
+
+
+def make_rosters_db():
+    db = make_db()
+    db.data["Timetable"].loc[len(db.data["Timetable"])] = {'Week': 2, 'Date': '', 'Day': '수', 'Period': 3, 'Subject': 'Eng'}
+    return db
+
+
+def test_roster_follows_the_teachers_classes():
+    db = make_rosters_db()
+    assert len(get_students_for_class_slot(db, 'Kim', 'Math')) == 30
+    assert list(get_students_for_class_slot(db, 'Lee', 'Math')['학번']) == [f'102{i:02d}' for i in range(1, 11)]
+    assert get_students_for_class_slot(db, 'Kim', 'Eng').empty
+
+
+def test_roster_filters_by_day_period_and_week():
+    db = make_rosters_db()
+    assert len(get_students_for_class_slot(db, 'Park', 'Eng', day='월', period=1)) == 10
+    assert len(get_students_for_class_slot(db, 'Park', 'Eng', day='월', period='1', week='1')) == 10
+    assert get_students_for_class_slot(db, 'Park', 'Eng', day='화', period=2).empty
+    assert len(get_students_for_class_slot(db, 'Park', 'Eng', week=2)) == 10
+
+
+def test_iter_slot_rosters_covers_every_scheduled_slot():
+    slots = {key: len(students) for key, students in iter_slot_rosters(make_rosters_db())}
+    assert slots == {
+        ('Kim', 'Math', '1', '월', '1'): 30, ('Lee', 'Math', '1', '월', '1'): 10, ('Park', 'Eng', '1', '월', '1'): 10,
+        ('Kim', 'Math', '1', '화', '2'): 30, ('Lee', 'Math', '1', '화', '2'): 10, ('Park', 'Eng', '2', '수', '3'): 10,
+    }
+
+
+def test_iter_slot_rosters_for_one_teacher():
+    assert [key for key, _ in iter_slot_rosters(make_rosters_db(), 'Park')] == [
+        ('Park', 'Eng', '1', '월', '1'), ('Park', 'Eng', '2', '수', '3')]
@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import pandas as pd
+from modules.search import choseong, get_student_search_index, search_students
+from test_logic import MockDB
+
+
+def make_db():
+    db = MockDB()
+    db.data["Students"] = pd.DataFrame([
+        {'학번': sid, '이름': name, '학년': sid[0], '반': str(int(sid[1:3])), '번호': str(int(sid[3:])),
+         'parsed_subjects': 'Math', 'is_exception': False}
+        for sid, name in [('10101', '김민서'), ('10102', '김미나'), ('10201', '박민서'), ('20101', '김민'), ('10101', '중복')]
+    ])
+    return db
+
+
+def sids(query, **kw):
+    return [s['학번'] for s in search_students(get_student_search_index(make_db()), query, **kw)]
+
+
+def test_index_is_cached_per_data_version():
+    db = make_db()
+    assert get_student_search_index(db) is get_student_search_index(db)
+
+
+def test_choseong_keeps_non_hangul():
+    assert choseong("김민서A") == "ㄱㅁㅅA"
+
+
+def test_student_id_prefix_lists_repeated_ids_once():
+    assert sids("101") == ['10101', '10102']
+    assert sids(" 1 0 2 ") == ['10201']
+
+
+def test_exact_name_comes_first():
+    assert sids("김민") == ['20101', '10101']
+
+
+def test_given_name_and_choseong_match():
+    assert sids("민서") == ['10101', '10201']
+    assert sids("ㄱㅁㅅ") == ['10101']
+
+
+def test_half_typed_syllable_matches():
+    assert sids("김ㅁ") == sids("김미") == ['10102', '20101', '10101']  # still typing 미 or 민
+
+
+def test_limit_and_no_match():
+    assert sids("김", limit=2) == ['10102', '20101']
+    assert sids("이") == [] and sids("") == []
@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from modules import occupancy, slot_finder
+from test_rooms import make_db
+
+
+def make_finder_db():
+    """Lee teaches Math and Eng of 1-2; Math+Eng share 화2, Math alone 수3; rooms A and B."""
+    db = make_db()
+    db.data["Teachers"].loc[2, 'TeacherName'] = 'Lee'
+    db.data["Rooms"] = db.data["Rooms"].head(2)
+    db.data["Timetable"] = db.data["Timetable"].assign(Day=['수', '화', '화'], Period=[3, 2, 2])
+    return db
+
+
+def day_index(result):
+    return {day: i for i, day in enumerate(result['days'])}
+
+
+def test_score_slots_summarizes_the_subject():
+    r = slot_finder.score_slots(make_finder_db(), 'Eng', weeks=[3])
+    assert r['weeks'] == [1, 3]
+    assert r['students'] == 10 and r['teachers'] == 1 and r['rooms_needed'] == 1
+
+
+def test_score_slots_counts_each_penalty_per_cell():
+    r = slot_finder.score_slots(make_finder_db(), 'Eng', weeks=[3])
+    d = day_index(r)
+    assert r['placed'][0, d['화'], 1]
+    assert r['conflicts'][0, d['수'], 2] == 10
+    assert r['teacher_busy'][0, d['수'], 2] == 1  # Lee teaches Math there
+    assert r['room_short'][0, d['수'], 2] == 1  # both rooms hold the 2 Math groups
+    assert r['day_load'][0, d['화'], 0] == 1.0
+
+
+def test_empty_week_scores_zero_everywhere():
+    r = slot_finder.score_slots(make_finder_db(), 'Eng', weeks=[3])
+    assert r['score'][1].max() == 0 and r['valid'][1].all()
+
+
+def test_rank_slots_puts_free_cells_first():
+    r = slot_finder.score_slots(make_finder_db(), 'Eng', weeks=[3])
+    ranked = slot_finder.rank_slots(r, limit=3, week=1)
+    assert ranked[['요일', '교시']].values.tolist() == [['월', 1], ['월', 2], ['월', 3]]
+
+
+def test_room_shortage_follows_the_rooms_sheet():
+    db = make_finder_db()
+    r = slot_finder.score_slots(db, 'Math')
+    d = day_index(r)
+    assert r['room_short'][0, d['화'], 1] == 1 and r['room_short'][0, d['월'], 0] == 0
+    db.data["Rooms"] = db.data["Rooms"].head(1)
+    assert slot_finder.score_slots(db, 'Math')['room_short'][0, d['월'], 0] == 1
+
+
+def test_week_heatmap_labels_and_colors_cells():
+    db = make_finder_db()
+    r = slot_finder.score_slots(db, 'Math')
+    text, css = slot_finder.week_heatmap(r, 1, occupancy.load_grid_shape(db))
+    assert text.at[2, '화'] == "배정됨" and text.at[3, '수'] == "배정됨" and text.at[1, '월'] == "0명"
+    assert css.at[1, '월'].startswith("background-color")
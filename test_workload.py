@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import pandas as pd
+from modules.workload import apply_teacher_assignments, balance_teacher_assignments
+from test_logic import MockDB
+
+
+def make_db():
+    """Math in four classes of 30/20/10/10 students, two Math periods, Eng already assigned to Park."""
+    db = MockDB()
+    sizes = {'1': 30, '2': 20, '3': 10, '4': 10}
+    db.data["Students"] = pd.DataFrame([
+        {'학번': f'10{c}{i:02d}', '이름': f'S{c}{i}', '학년': '1', '반': c, '번호': str(i), 'parsed_subjects': 'Math,Eng', 'is_exception': False}
+        for c, n in sizes.items() for i in range(1, n + 1)
+    ])
+    db.data["Teachers"] = pd.DataFrame([
+        {'Subject': 'Eng', 'TeacherName': 'Park', 'AssignedClasses': '1-1', 'Room': 'E1'},
+        {'Subject': 'Math', 'TeacherName': 'Kim', 'AssignedClasses': '1-1,1-2,1-3,1-4', 'Room': 'M1'},
+    ])
+    db.data["Timetable"] = pd.DataFrame([
+        {'Week': 1, 'Date': '', 'Day': '월', 'Period': 1, 'Subject': 'Math'},
+        {'Week': 1, 'Date': '', 'Day': '화', 'Period': 1, 'Subject': 'Math'},
+        {'Week': 1, 'Date': '', 'Day': '수', 'Period': 1, 'Subject': 'Eng'},
+    ])
+    return db
+
+
+def test_lpt_balances_classes_across_teachers():
+    db = make_db()
+    assignments, stats = balance_teacher_assignments(db, {'Math': ['Kim', 'Lee']})
+
+    # Largest class first; ties go to the teacher listed first
+    assert assignments[['TeacherName', 'AssignedClasses', 'Students', 'Room']].values.tolist() == [
+        ['Kim', '1-1,1-4', 40, 'M1'],
+        ['Lee', '1-2,1-3', 30, ''],
+    ]
+    assert assignments['Periods'].tolist() == [2, 2]
+    # Park's Eng load is kept and reported, not redistributed
+    assert stats.set_index('TeacherName').loc['Park', ['Students', 'Periods', 'Subjects']].tolist() == [30, 1, 'Eng']
+
+
+def test_single_teacher_takes_every_class():
+    assignments, _ = balance_teacher_assignments(make_db(), {'Math': ['Lee', '']})
+    assert assignments[['TeacherName', 'AssignedClasses']].values.tolist() == [['Lee', '1-1,1-2,1-3,1-4']]
+
+
+def test_apply_replaces_only_the_proposed_subjects():
+    db = make_db()
+    assignments, _ = balance_teacher_assignments(db, {'Math': ['Kim', 'Lee']})
+    assert apply_teacher_assignments(db, assignments)
+
+    teachers = db.data["Teachers"]
+    assert list(teachers.columns) == ['Subject', 'TeacherName', 'AssignedClasses', 'Room']
+    assert teachers.values.tolist() == [
+        ['Eng', 'Park', '1-1', 'E1'],
+        ['Math', 'Kim', '1-1,1-4', 'M1'],
+        ['Math', 'Lee', '1-2,1-3', ''],
+    ]
@@ -0,0 +1,30 @@
+"""
+Page scripts for st.navigation, one per sidebar menu.
+Each file defines render() and calls it when Streamlit runs it as a page, so only
+the selected page's code executes on a rerun.
+"""
+PAGES = {
+    "Data Upload": "views/data_upload.py",
+    "Teacher Assignment": "views/teacher_assignment.py",
+    "Timetable Setup": "views/timetable_setup.py",
+    "Room Assignment": "views/room_assignment.py",
+    "Student View": "views/student_view.py",
+    "Teacher View": "views/teacher_view.py",
+    "Environment Setup": "views/environment_setup.py",
+    "Performance": "views/performance.py",
+}
+
+# Read-only pages offered through the share link (?mode=share)
+SHARE_PAGES = ["Student View", "Teacher View"]
+
+# Sheets each page reads; app.py fetches them together (in parallel) before the page runs
+PAGE_SHEETS = {
+    "Data Upload": ["Students"],
+    "Teacher Assignment": ["Students", "Teachers"],
+    "Timetable Setup": ["Students", "Timetable", "Settings_Grid"],
+    "Room Assignment": ["Students", "Teachers", "Timetable", "Rooms", "RoomSchedule"],
+    "Student View": ["Students", "Teachers", "Timetable", "RoomSchedule", "Settings_PeriodTimes", "Settings_Grid"],
+    "Teacher View": ["Students", "Teachers", "Timetable", "RoomSchedule"],
+    "Environment Setup": ["Settings_PeriodTimes", "Settings_Grid"],
+    "Performance": [],
+}
@@ -0,0 +1,56 @@
+import streamlit as st
+from modules.data_loader import parse_excel
+
+
+def render():
+    st.header("엑셀 데이터 업로드")
+    
+    # 1. Show Current DB Status
+    st.subheader("📂 현재 저장된 데이터")
+    current_df = st.session_state.db.load_dataframe("Students")
+    if not current_df.empty:
+        st.info(f"현재 데이터베이스에 **{len(current_df)}명**의 학생 정보가 저장되어 있습니다.")
+        with st.expander("현재 저장된 데이터 보기"):
+             st.dataframe(current_df)
+    else:
+        st.warning("현재 저장된 학생 데이터가 없습니다.")
+
+    st.divider()
+
+    # 2. Upload New File
+    st.subheader("새 파일 업로드")
+    st.caption("⚠️ 새로운 파일을 업로드하고 저장하면 **기존 데이터가 덮어씌워집니다.**")
+    
+    uploaded_file = st.file_uploader("학생 명단 엑셀 파일 업로드", type=['xlsx'])
+    if uploaded_file:
+        df, error = parse_excel(uploaded_file)
+        if error:
+            st.error(error)
+        else:
+            st.success(f"파일 파싱 성공! 총 {len(df)}명의 학생 데이터가 로드되었습니다.")
+            
+            with st.expander("데이터 미리보기 (전체 데이터 확인)", expanded=True):
+                st.dataframe(df) # Show full dataframe (Streamlit handles pagination)
+            
+            if st.button("DB에 저장하기"):
+                # Save to Google Sheets
+                # Flatten the list of subjects for display compatibility if needed, 
+                # but allow DBManager to handle it. 
+                # For basic JSON serialization in Sheets, lists are tricky. 
+                # We save the raw strings for now or convert 'parsed_subjects' to string.
+                
+                # Convert list to string for storage
+                save_df = df.copy()
+                save_df['parsed_subjects'] = save_df['parsed_subjects'].apply(lambda x: ','.join(x))
+                
+                success = st.session_state.db.save_dataframe("Students", save_df)
+                if success:
+                    st.success("데이터베이스(Google Sheets - Students)에 저장되었습니다.")
+                else:
+                    # Generic error fallback only if db_manager didn't already show a detailed error
+                    # (In our case, db_manager handles the details, but a generic "Please check above" is helpful)
+                    st.error("저장 실패. 위의 오류 메시지를 확인하세요.")
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,59 @@
+import pandas as pd
+import streamlit as st
+import modules.logic as logic
+import modules.occupancy as occupancy
+
+
+def render():
+    st.header("환경 설정 (Environment Setup)")
+
+    st.subheader("수업 요일 및 교시 수")
+    st.info("시간표 편성 화면과 출력물의 격자에 표시될 요일(순서대로)과 요일별 교시 수를 설정합니다.")
+    shape = occupancy.load_grid_shape(st.session_state.db)
+    with st.form("grid_shape_form"):
+        grid_df = st.data_editor(
+            pd.DataFrame({'요일': shape['days'], '교시 수': [shape['periods_per_day'][d] for d in shape['days']]}),
+            num_rows="dynamic", hide_index=True, use_container_width=True,
+            column_config={'교시 수': st.column_config.NumberColumn(min_value=1, max_value=15, step=1)},
+        )
+        if st.form_submit_button("요일/교시 저장"):
+            rows = grid_df.dropna()
+            periods_per_day = {str(d).strip(): int(n) for d, n in zip(rows['요일'], rows['교시 수']) if str(d).strip()}
+            if not periods_per_day:
+                st.error("요일을 하나 이상 입력하세요.")
+            elif occupancy.save_grid_shape(st.session_state.db, periods_per_day):
+                st.success("저장되었습니다.")
+                st.rerun()
+            else:
+                st.error("설정 저장 중 오류가 발생했습니다.")
+
+    st.subheader("교시별 시간 설정")
+    st.info("시간표 출력 시 각 교시 아래에 표시될 시간 범위를 설정합니다.")
+    
+    # Load current settings from DB
+    current_times = logic.load_period_times(st.session_state.db)
+    
+    with st.form("period_time_form"):
+        updated_times = {}
+        cols = st.columns(2)
+        
+        # One input per period of the longest school day
+        for i in shape['periods']:
+            # Alternating columns
+            with cols[(i-1)%2]:
+                val = st.text_input(f"{i}교시 시간", value=current_times.get(i, ""), placeholder="예: 09:00~09:50")
+                updated_times[i] = val
+        
+        st.markdown("---")
+        submitted = st.form_submit_button("설정 저장 (Save Settings)")
+        
+        if submitted:
+            success = logic.save_period_times(st.session_state.db, updated_times)
+            if success:
+                st.success("설정이 저장되었습니다. 시간표 조회 시 반영됩니다.")
+            else:
+                st.error("설정 저장 중 오류가 발생했습니다.")
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,108 @@
+import json
+import os
+import time
+
+import pandas as pd
+import streamlit as st
+from modules import perf, profiling
+
+
+def render():
+    st.header("성능 모니터링 (Performance)")
+    st.info("DB 호출, 로직 함수, 화면 새로고침(rerun)별 실행 시간과 캐시/재시도 카운터입니다. 서버 프로세스 기준으로 집계됩니다.")
+
+    snap = perf.snapshot()
+    counters = snap['counters']
+
+    hits, misses = counters.get("db.cache_hit", 0), counters.get("db.cache_miss", 0)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("DB 캐시 적중률", f"{hits / (hits + misses) * 100:.0f}%" if hits + misses else "-")
+    c2.metric("API 재시도", counters.get("db.retries", 0))
+    c3.metric("백오프 대기(초)", counters.get("db.sleep_s", 0))
+    c4.metric("읽은 데이터", f"{counters.get('db.bytes_read', 0) / 1024:.1f} KB")
+
+    st.subheader("구간별 실행 시간")
+    if snap['timers']:
+        timers_df = pd.DataFrame(snap['timers'])
+        timers_df = timers_df[['key', 'count', 'total_s', 'mean_s', 'min_s', 'max_s', 'last_s']]
+        for col in ['total_s', 'mean_s', 'min_s', 'max_s', 'last_s']:
+            timers_df[col] = (timers_df[col] * 1000).round(2)
+        timers_df.columns = ['구간', '횟수', '합계(ms)', '평균(ms)', '최소(ms)', '최대(ms)', '최근(ms)']
+        st.dataframe(timers_df, hide_index=True, use_container_width=True)
+    else:
+        st.caption("아직 기록된 측정값이 없습니다.")
+
+    st.subheader("카운터")
+    if counters:
+        st.dataframe(pd.DataFrame(sorted(counters.items()), columns=['이름', '값']), hide_index=True)
+
+    with st.expander(f"최근 이벤트 ({len(snap['events'])}건)"):
+        if snap['events']:
+            st.dataframe(pd.DataFrame(snap['events'][::-1]), hide_index=True, use_container_width=True)
+
+    col_a, col_b = st.columns(2)
+    with col_a:
+        st.download_button(
+            "📥 측정값 내보내기 (JSON)",
+            json.dumps(snap, ensure_ascii=False, indent=2, default=str),
+            file_name=f"perf_{time.strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json",
+        )
+    with col_b:
+        if st.button("측정값 초기화"):
+            perf.reset()
+            st.rerun()
+
+    st.markdown("---")
+    st.subheader("저장된 프로파일 (cProfile)")
+    st.caption(f"주소 뒤에 `?profile=1`을 붙이거나 서버 환경 변수 `TIMETABLE_PROFILE=1`을 설정하면 화면 실행(rerun)마다 프로파일이 `{profiling.PROFILE_DIR}/`에 저장됩니다.")
+
+    profiles = profiling.list_profiles()
+    if not profiles:
+        st.info("저장된 프로파일이 없습니다.")
+        return
+
+    runs_df = pd.DataFrame(profiles)
+    by_page = runs_df.groupby('page')['seconds'].agg(['count', 'mean', 'max']).reset_index()
+    by_page[['mean', 'max']] = (by_page[['mean', 'max']] * 1000).round(1)
+    by_page.columns = ['메뉴', '실행 수', '평균(ms)', '최대(ms)']
+    st.dataframe(by_page.sort_values('평균(ms)', ascending=False), hide_index=True)
+
+    labels = {p['id']: f"{time.strftime('%m/%d %H:%M:%S', time.localtime(p['timestamp']))} · {p['page']} · {p['seconds'] * 1000:.0f}ms" for p in profiles}
+    selected = st.selectbox("프로파일 선택", list(labels), format_func=labels.get)
+    summary = next(p for p in profiles if p['id'] == selected)
+
+    sort_key = st.radio("정렬 기준", ["cumulative", "tottime"], horizontal=True,
+                        format_func={"cumulative": "누적 시간", "tottime": "자체 시간"}.get)
+    try:
+        top = profiling.top_functions(profiling.load_stats(selected), sort=sort_key, limit=40)
+    except OSError:
+        top = summary['top']
+    top_df = pd.DataFrame(top)
+    if not top_df.empty:
+        top_df['tottime_s'] = (top_df['tottime_s'] * 1000).round(2)
+        top_df['cumtime_s'] = (top_df['cumtime_s'] * 1000).round(2)
+        top_df.columns = ['함수', '호출 수', '자체(ms)', '누적(ms)']
+    st.dataframe(top_df, hide_index=True, use_container_width=True)
+
+    pattern = st.text_input("호출 관계 보기 (함수 이름)", placeholder="예: generate_student_timetable")
+    if pattern:
+        try:
+            st.code(profiling.call_tree_text(selected, pattern) or "일치하는 함수가 없습니다.", language=None)
+        except ValueError as e:
+            st.error(str(e))
+
+    col_a, col_b = st.columns(2)
+    with col_a:
+        prof_path = profiling.profile_path(selected)
+        if os.path.exists(prof_path):
+            with open(prof_path, 'rb') as f:
+                st.download_button("📥 .prof 다운로드 (snakeviz/flameprof)", f.read(), file_name=f"{selected}.prof")
+    with col_b:
+        if st.button("프로파일 전체 삭제"):
+            profiling.delete_profiles()
+            st.rerun()
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,74 @@
+import pandas as pd
+import streamlit as st
+import modules.logic as logic
+import modules.rooms as rooms
+
+
+def render():
+    st.header("강의실 배정 (관리)")
+    st.info("교사-과목 배정 내역에서 강의실 정보를 수정합니다.")
+    
+    df = logic.get_teacher_assignments(st.session_state.db)
+    if not df.empty:
+        # Use data editor to allow inline editing of 'Room'
+        edited_df = st.data_editor(df, num_rows="dynamic", key="room_editor")
+        
+        if st.button("변경사항 저장"):
+            # Save back to DB
+            success = st.session_state.db.save_dataframe("Teachers", edited_df)
+            if success:
+                st.success("강의실 배정 정보가 업데이트되었습니다.")
+                st.rerun()
+            else:
+                st.error("저장 실패")
+    else:
+        st.warning("교사 배정 데이터가 없습니다. 'Teacher Assignment'를 먼저 진행하세요.")
+
+    # Capacity-aware allocation per scheduled slot
+    st.divider()
+    st.subheader("강의실 정원 관리")
+
+    rooms_df = rooms.load_rooms(st.session_state.db)
+    if rooms_df.empty and not df.empty and 'Room' in df.columns:
+        # Seed with the rooms already typed into teacher assignments
+        seed = df['Room'].dropna().astype(str).str.strip()
+        seed = sorted(set(seed[seed != ""]))
+        rooms_df = pd.DataFrame({'Room': seed, 'Capacity': [0] * len(seed)})
+
+    edited_rooms = st.data_editor(
+        rooms_df, num_rows="dynamic", key="rooms_capacity_editor",
+        column_config={"Capacity": st.column_config.NumberColumn("정원", min_value=0, step=1)}
+    )
+    if st.button("강의실 정원 저장"):
+        if rooms.save_rooms(st.session_state.db, edited_rooms):
+            st.success("강의실 정원이 저장되었습니다.")
+            st.rerun()
+        else:
+            st.error("저장 실패")
+
+    st.subheader("시간표 기반 강의실 자동 배정")
+    st.caption("편성된 모든 수업(주차·요일·교시)에 대해 강의실 중복 없이, 정원 초과 인원이 최소가 되도록 배정합니다.")
+    if st.button("자동 배정 실행"):
+        alloc_df, summary = rooms.allocate_rooms(st.session_state.db)
+        st.session_state.room_alloc = (alloc_df, summary)
+
+    if st.session_state.get('room_alloc'):
+        alloc_df, summary = st.session_state.room_alloc
+        if alloc_df.empty:
+            st.warning("배정할 수업이 없거나 강의실 정원 정보가 없습니다.")
+        else:
+            m1, m2, m3 = st.columns(3)
+            m1.metric("배정 수업(반) 수", summary['groups'])
+            m2.metric("정원 초과 인원", summary['over_seats'])
+            m3.metric("강의실 부족으로 미배정", summary['unassigned'])
+            st.dataframe(alloc_df, use_container_width=True)
+            if st.button("배정 결과 저장", type="primary"):
+                if rooms.save_room_schedule(st.session_state.db, alloc_df):
+                    st.success("강의실 배정 결과가 저장되었습니다. 학생/교사 시간표에 반영됩니다.")
+                    st.session_state.room_alloc = None
+                else:
+                    st.error("저장 실패")
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,411 @@
+import time
+
+import streamlit as st
+import modules.batch as batch
+import modules.logic as logic
+import modules.occupancy as occupancy
+import modules.search as search
+
+
+def render():
+    st.header("학생 시간표 조회 및 인쇄")
+    
+    # Check available weeks
+    tt_df = logic.load_timetable(st.session_state.db)
+    available_weeks = [1]
+    if not tt_df.empty:
+        available_weeks = sorted(tt_df['Week'].unique().tolist())
+    
+    # Mode Selection using Tabs (each tab is a fragment, so a lookup or batch run re-executes only its tab)
+    tab1, tab2 = st.tabs(["👤 개인별 조회", "🏫 학급별 일괄 조회 (인쇄용)"])
+    
+    with tab1:
+        _individual_lookup(available_weeks)
+
+    with tab2:
+        _batch_print(available_weeks)
+
+
+@st.fragment
+def _individual_lookup(available_weeks):
+    col_s1, col_s2 = st.columns([3, 1])
+    with col_s1:
+        sid_input = st.text_input("학번 또는 이름을 입력하세요 (예: 10101, 김민서, ㄱㅁㅅ)").strip()
+    with col_s2:
+        # Week Selector
+        week_opts = ["전체"] + [f"{w}주차" for w in available_weeks]
+        ver_week = st.selectbox("주차 선택", week_opts)
+
+    # Typeahead: suggestions by 학번/name prefix or 초성; the picked student's 학번 is looked up
+    if sid_input:
+        matches = search.search_students(search.get_student_search_index(st.session_state.db), sid_input)
+        if matches:
+            labels = [search.student_label(m) for m in matches]
+            picked = st.selectbox(f"검색 결과 ({len(matches)}명)", range(len(matches)), format_func=labels.__getitem__)
+            sid_input = matches[picked]['학번']
+
+    if st.button("조회"):
+        if sid_input:
+            target_week = None
+            if ver_week != "전체":
+                target_week = int(ver_week.replace("주차", ""))
+                
+            schedule_df, msg, s_name = logic.generate_student_timetable(st.session_state.db, sid_input, week=target_week)
+            
+            if schedule_df is not None and not schedule_df.empty:
+                st.success(f"학번: {sid_input} 이름: {s_name} 시간표")
+                
+                # Load Period Times and the grid shape for display
+                p_times = logic.load_period_times(st.session_state.db)
+                shape = occupancy.load_grid_shape(st.session_state.db)
+
+                # Transform to Grid (Now returns HTML string with Header)
+                timetable_html = logic.format_student_timetable_grid(
+                    schedule_df, student_info={'id': sid_input, 'name': s_name, 'period_times': p_times, 'shape': shape})
+                
+                # Improved Print Button using Components
+                import streamlit.components.v1 as components
+                
+                # CSS for clean print
+                st.markdown("""
+                <style>
+                @media print {
+                    #MainMenu, header, footer, [data-testid="stSidebar"], .stDeployButton {display: none !important;}
+                    /* Hide Streamlit UI elements */
+                    .stTextInput, .stButton, .stExpander, .stSelectbox, .stProgress, .stAlert {display: none !important;}
+                    
+                    /* Hide Tab Headers and Borders */
+                    [data-baseweb="tab-list"], 
+                    [data-baseweb="tab-highlight"], 
+                    [data-baseweb="tab-border"] {
+                        display: none !important; 
+                        border: none !important;
+                        height: 0 !important;
+                    }
+                    hr { display: none !important; }
+
+                    /* Hide Header Decoration Line */
+                    header, .stApp > header {
+                        display: none !important;
+                        opacity: 0 !important;
+                        visibility: hidden !important;
+                    }
+                    header:before, header:after, .stApp > header:before, .stApp > header:after {
+                        display: none !important;
+                        content: none !important;
+                    }
+                    
+                    /* Hide Print Button by hiding the iframe content */
+                    iframe {
+                        display: none !important;
+                        height: 0 !important;
+                        width: 0 !important;
+                    }
+
+                    /* Hide main titles BUT show our custom print title */
+                    h1, h2, h3, h4, h5, h6 {display: none !important;}
+                    h2.print-title {display: block !important;}
+
+                    /* Page Setup */
+                    @page {
+                        size: A4;
+                        margin: 5mm 15mm 5mm 15mm; /* Top Right Bottom Left */
+                    }
+
+                    table {
+                        display: table !important;
+                        width: 100% !important;
+                        border-collapse: collapse !important;
+                    }
+                    th, td {
+                        border: 1px solid #000 !important;
+                        padding: 8px !important;
+                        color: black !important;
+                        -webkit-print-color-adjust: exact; 
+                    }
+                    
+                    html, body, .stApp { 
+                        background-color: white !important; 
+                        height: auto !important;
+                        margin: 0 !important;
+                        padding: 0 !important;
+                        overflow: visible !important;
+                    }
+                    
+                    /* Layout fixes */
+                    .block-container, 
+                    [data-testid="stAppViewContainer"], 
+                    .main, 
+                    .stApp { 
+                        padding: 0 !important; 
+                        margin: 0 !important;
+                        padding-top: 0 !important;
+                        margin-top: 0 !important;
+                        overflow: visible !important;
+                    }
+                    
+                    /* Adjusted positioning for Centering */
+                    #print-area {
+                        /* Flexbox Alignment */
+                        position: absolute;
+                        top: 0;
+                        left: 0;
+                        display: flex !important;
+                        flex-direction: column;
+                        justify-content: flex-start; /* Align to Top */
+                        align-items: center; /* Center horizontally */
+                        height: 98vh; 
+                        width: 100%;
+                        z-index: 9999;
+                        margin: 0;
+                        padding: 0;
+                    }
+                }
+                </style>
+                """, unsafe_allow_html=True)
+
+                # Display HTML Table wrapped in print-area
+                st.markdown(f'<div id="print-area">{timetable_html}</div>', unsafe_allow_html=True)
+
+                # Print Button
+                components.html("""
+                <div style="text-align: center;">
+                    <button onclick="window.parent.print()" style="background-color: #4CAF50; border: none; color: white; padding: 15px 32px; text-align: center; font-size: 16px; margin: 4px 2px; cursor: pointer; border-radius: 8px; font-weight: bold;">🖨️ 시간표 인쇄하기</button>
+                </div>
+                """, height=100)
+
+                import modules.pdf_export as pdf_export
+                # Built only when the button is clicked, not on every lookup
+                st.download_button(
+                    "📄 PDF로 내려받기 (A4)",
+                    lambda: pdf_export.student_timetables_pdf([({'학번': sid_input, '이름': s_name}, schedule_df)], p_times, shape),
+                    file_name=f"시간표_{sid_input}.pdf", mime="application/pdf", on_click="ignore"
+                )
+                
+            elif schedule_df is None: 
+                st.warning(msg)
+            else: 
+                st.info(msg)
+        else:
+            st.error("학번 또는 이름을 입력해주세요.")
+
+
+@st.fragment
+def _batch_print(available_weeks):
+    st.info("특정 학급의 배정 대상 학생들의 시간표를 한 번에 출력합니다. (학생 1명당 A4 1페이지)")
+    
+    # Select Grade/Class
+    col_g, col_c, col_w = st.columns(3)
+    with col_g:
+        grade_input = st.selectbox("학년", ["1", "2", "3"])
+    with col_c:
+        class_input = st.selectbox("반", [str(i) for i in range(1, 16)]) # 1~15 class
+    with col_w:
+        week_opts_batch = ["전체"] + [f"{w}주차" for w in available_weeks]
+        batch_week_sel = st.selectbox("출력할 주차", week_opts_batch)
+        
+    if st.button("일괄 조회 및 인쇄 미리보기"):
+        targets = logic.get_students_in_class(st.session_state.db, grade_input, class_input)
+        
+        # Filter Week
+        target_week_val = None
+        if batch_week_sel != "전체":
+            target_week_val = int(batch_week_sel.replace("주차", ""))
+        
+        if not targets:
+            st.warning(f"{grade_input}학년 {class_input}반에 최소 성취수준 보장지도 대상 학생이 없습니다.")
+        else:
+            st.success(f"총 {len(targets)}명의 학생 시간표를 생성합니다.")
+            
+            # Pages are rendered on a worker pool and arrive in class order; the bar tracks finished students
+            pages = []
+            prog_bar = st.progress(0, text="시간표 생성 중...")
+            started = time.perf_counter()
+            for done, total, ready in batch.iter_student_pages(st.session_state.db, targets, week=target_week_val):
+                for student, t_html in ready:
+                    # Wrap with Page Break
+                    pages.append(f"""
+<div class="print-page" style="page-break-after: always; box-sizing: border-box;">
+{t_html}
+</div>
+<div class="no-print" style="height: 30px; border-bottom: 1px dashed #ccc; margin-bottom: 30px;"></div>
+""")
+                rate = done / max(time.perf_counter() - started, 1e-6)
+                prog_bar.progress(done / total, text=f"시간표 생성 중... {done}/{total}명 ({rate:.1f}명/초)")
+            full_html = "".join(pages)
+                
+            # CSS for Batch Print
+            st.markdown("""
+            <style>
+            @media print {
+                #MainMenu, header, footer, [data-testid="stSidebar"], .stDeployButton {display: none !important;}
+                .stTextInput, .stButton, .stExpander, .stSelectbox, .stProgress, .stAlert {display: none !important;}
+                iframe {display: none !important;} 
+                .no-print {display: none !important;}
+                
+                /* Hide Tab Headers and Borders */
+                [data-baseweb="tab-list"], 
+                [data-baseweb="tab-highlight"], 
+                [data-baseweb="tab-border"] {
+                    display: none !important; 
+                    border: none !important;
+                    height: 0 !important;
+                }
+                hr { display: none !important; }
+
+                /* Hide Header Decoration Line */
+                header, .stApp > header {
+                    display: none !important;
+                    opacity: 0 !important;
+                    visibility: hidden !important;
+                }
+                header:before, header:after, .stApp > header:before, .stApp > header:after {
+                    display: none !important;
+                    content: none !important;
+                }
+                
+                /* Hide Print Button by hiding the iframe content */
+                iframe {
+                    display: none !important;
+                    height: 0 !important;
+                    width: 0 !important;
+                }
+
+                /* Hide main titles unless it is our custom print title */
+                h1, h2, h3, h4, h5, h6 {display: none !important;}
+                h2.print-title {display: block !important;}
+                
+                /* Page Setup */
+                @page {
+                    size: A4;
+                    margin: 5mm 15mm 5mm 15mm; /* Top Right Bottom Left */
+                }
+                
+                table {
+                    display: table !important;
+                    width: 100% !important;
+                    border-collapse: collapse !important;
+                }
+                th, td {
+                    border: 1px solid #000 !important;
+                    padding: 8px !important;
+                    color: black !important;
+                    -webkit-print-color-adjust: exact; 
+                }
+                html, body, .stApp { 
+                    background-color: white !important; 
+                    height: auto !important;
+                    margin: 0 !important;
+                    padding: 0 !important;
+                    overflow: visible !important;
+                }
+                
+                /* Aggressively remove Streamlit container padding */
+                .block-container, 
+                [data-testid="stAppViewContainer"], 
+                [data-testid="stHeader"], 
+                [data-testid="stToolbar"],
+                .main,
+                .stApp {
+                    padding: 0 !important;
+                    margin: 0 !important;
+                    padding-top: 0 !important;
+                    margin-top: 0 !important;
+                    max-width: none !important;
+                }
+
+                /* Page Break Control & Alignment */
+                .print-page {
+                    page-break-after: always;
+                    break-after: page;
+                    page-break-inside: avoid;
+                    display: block; /* Back to block for natural flow */
+                    padding-top: 0px; 
+                    margin-top: 0px;
+                    box-sizing: border-box;
+                }
+
+                /* Formatting for print area */
+                #print-area {
+                    position: absolute;
+                    top: 0;
+                    left: 0;
+                    display: block;
+                    width: 100%;
+                    z-index: 9999;
+                    margin: 0;
+                    padding: 0;
+                }
+            }
+            </style>
+            """, unsafe_allow_html=True)
+            
+            # Display Full HTML (Timetables) -> Wrapped in #print-area
+            st.markdown(f'<div id="print-area">{full_html}</div>', unsafe_allow_html=True)
+
+            # Print Button (Placed at BOTTOM)
+            import streamlit.components.v1 as components
+            components.html(f"""
+            <div style="text-align: center;">
+                <button onclick="window.parent.print()" style="background-color: #2196F3; border: none; color: white; padding: 15px 32px; text-align: center; font-size: 16px; margin: 4px 2px; cursor: pointer; border-radius: 8px; font-weight: bold;">🏫 일괄 인쇄하기 ({len(targets)}명)</button>
+            </div>
+            """, height=100)
+
+    # Server-side PDF: no browser print dialog or in-page HTML, works for a whole grade
+    # Share links only get the selected class; whole-grade and whole-school exports stay with staff
+    share = st.session_state.get("view_mode") == "share"
+    st.markdown("---")
+    if share:
+        st.caption("서버에서 선택한 반의 A4 PDF를 만들어 내려받습니다.")
+        pdf_scope = "선택한 반"
+    else:
+        st.caption("서버에서 A4 PDF를 만들어 내려받습니다. 학년 전체도 한 번에 만들 수 있습니다.")
+        pdf_scope = st.radio("PDF 범위", ["선택한 반", "학년 전체"], horizontal=True, key="batch_pdf_scope")
+    if st.button("📄 PDF 생성"):
+        import modules.pdf_export as pdf_export
+        class_num = class_input if pdf_scope == "선택한 반" else None
+        targets = logic.get_students_in_class(st.session_state.db, grade_input, class_num)
+        target_week_val = None if batch_week_sel == "전체" else int(batch_week_sel.replace("주차", ""))
+        if not targets:
+            st.warning("PDF로 만들 대상 학생이 없습니다.")
+        else:
+            entries = []
+            prog_bar = st.progress(0, text="PDF 준비 중...")
+            for done, total, ready in batch.iter_student_pages(st.session_state.db, targets, week=target_week_val, output="schedule"):
+                entries.extend(ready)
+                prog_bar.progress(done / total, text=f"시간표 계산 중... {done}/{total}명")
+            prog_bar.progress(1.0, text="PDF 작성 중...")
+            label = f"{grade_input}학년_{class_input}반" if class_num else f"{grade_input}학년_전체"
+            st.session_state.batch_pdf = (
+                f"시간표_{label}.pdf",
+                pdf_export.student_timetables_pdf(
+                    entries, logic.load_period_times(st.session_state.db), occupancy.load_grid_shape(st.session_state.db)),
+                len(targets),
+                class_num is None,
+            )
+            prog_bar.empty()
+    if st.session_state.get("batch_pdf"):
+        file_name, data, count, whole_grade = st.session_state.batch_pdf
+        if not (share and whole_grade):
+            st.download_button(f"⬇️ {file_name} ({count}명, {len(data) / 1024:.0f} KB)", data, file_name=file_name, mime="application/pdf")
+
+    if share:
+        return
+
+    # Whole-school spreadsheet: class grids, teacher schedules and rosters in one .xlsx
+    if st.button("📊 학교 전체 Excel 생성"):
+        import modules.excel_export as excel_export
+        target_week_val = None if batch_week_sel == "전체" else int(batch_week_sel.replace("주차", ""))
+        with st.spinner("Excel 작성 중..."):
+            data, stats = excel_export.school_workbook_bytes(st.session_state.db, week=target_week_val)
+        suffix = "전체" if target_week_val is None else f"{target_week_val}주차"
+        st.session_state.batch_xlsx = (f"시간표_학교전체_{suffix}.xlsx", data, stats)
+    if st.session_state.get("batch_xlsx"):
+        file_name, data, stats = st.session_state.batch_xlsx
+        st.caption(f"학생 {stats['students']}명 · {stats['classes']}개 반 · 시간표 {stats['grids']}장")
+        st.download_button(f"⬇️ {file_name} ({len(data) / 1024:.0f} KB)", data, file_name=file_name,
+                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,98 @@
+import pandas as pd
+import streamlit as st
+import modules.logic as logic
+
+
+def render():
+    st.header("교사 및 과목 배정")
+    
+    # Use module access directly to avoid stale imports
+    
+    # 1. Fetch Options
+    subjects = logic.get_unique_subjects(st.session_state.db)
+    classes_options = logic.get_unique_classes(st.session_state.db)
+
+    if not subjects:
+        st.warning("등록된 학생 데이터가 없거나 미도달 과목이 파싱되지 않았습니다. 먼저 'Data Upload'를 진행하세요.")
+    else:
+        with st.form("teacher_assign_form"):
+            st.subheader("새 배정 추가")
+            col1, col2 = st.columns(2)
+            with col1:
+                t_name = st.text_input("교사 성명")
+                sub_select = st.selectbox("담당 과목", subjects)
+            with col2:
+                # Room input here or separate? 
+                room_input = st.text_input("강의실 (선택)", help="나중에 '강의실 배정' 메뉴에서도 수정 가능합니다.")
+            
+            # Class Selection
+            selected_classes = st.multiselect("담당 학급 (학년-반)", classes_options)
+            
+            submitted = st.form_submit_button("저장")
+            
+            if submitted:
+                if t_name and sub_select and selected_classes:
+                    success = logic.save_teacher_assignment(st.session_state.db, sub_select, t_name, selected_classes, room_input)
+                    if success:
+                        st.success(f"{t_name} 교사 배정 완료!")
+                        st.rerun() # Refresh to show in table
+                else:
+                    st.error("교사 성명, 과목, 담당 학급은 필수입니다.")
+
+        # Balanced auto assignment
+        with st.expander("자동 배정 (교사별 학생 수·수업 시수 균형)"):
+            import modules.workload as workload
+
+            st.caption("과목별로 담당 가능한 교사를 쉼표로 구분해 입력하면, 학생 수와 수업 시수가 고르게 분배되도록 학급을 나눕니다. 선택한 과목의 기존 배정은 배정안으로 대체됩니다.")
+            current_df = logic.get_teacher_assignments(st.session_state.db)
+            auto_subjects = st.multiselect("대상 과목", subjects, key="auto_assign_subjects")
+
+            default_teachers = {}
+            if not current_df.empty:
+                for sub, names in current_df.groupby('Subject')['TeacherName']:
+                    default_teachers[sub] = ','.join(dict.fromkeys(names.astype(str)))
+            teacher_input_df = pd.DataFrame({
+                'Subject': auto_subjects,
+                'Teachers': [default_teachers.get(s, "") for s in auto_subjects],
+            }, dtype="string")
+            edited_teachers = st.data_editor(
+                teacher_input_df, key="auto_assign_teachers", disabled=["Subject"],
+                column_config={"Teachers": st.column_config.TextColumn("담당 가능 교사 (쉼표 구분)")}
+            )
+
+            if st.button("배정안 계산"):
+                subject_teachers = {
+                    r['Subject']: [t.strip() for t in str(r['Teachers']).split(',') if t.strip()]
+                    for r in edited_teachers.to_dict('records')
+                }
+                if not any(subject_teachers.values()):
+                    st.error("교사를 한 명 이상 입력하세요.")
+                else:
+                    st.session_state.auto_assign = workload.balance_teacher_assignments(st.session_state.db, subject_teachers)
+
+            if st.session_state.get('auto_assign'):
+                proposal_df, stats_df = st.session_state.auto_assign
+                st.write("**배정안**")
+                st.dataframe(proposal_df, use_container_width=True)
+                st.write("**교사별 부하**")
+                st.dataframe(stats_df, use_container_width=True)
+                if st.button("배정안 적용", type="primary"):
+                    if workload.apply_teacher_assignments(st.session_state.db, proposal_df):
+                        st.session_state.auto_assign = None
+                        st.success("배정안이 저장되었습니다.")
+                        st.rerun()
+                    else:
+                        st.error("저장 실패")
+
+    # 2. View Current Assignments
+    st.divider()
+    st.subheader("현재 배정 현황")
+    assignments_df = logic.get_teacher_assignments(st.session_state.db)
+    if not assignments_df.empty:
+        st.dataframe(assignments_df)
+    else:
+        st.info("아직 배정된 내역이 없습니다.")
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,172 @@
+import streamlit as st
+import modules.logic as logic
+
+
+def render():
+    st.header("교사별 시간표 조회")
+    
+    teachers_df = logic.get_teacher_assignments(st.session_state.db)
+    if not teachers_df.empty:
+        teacher_list = teachers_df['TeacherName'].unique()
+        selected_teacher = st.selectbox("교사 선택", teacher_list)
+        
+        if selected_teacher:
+            st.subheader(f"{selected_teacher} 선생님 시간표")
+            t_schedule = logic.get_teacher_schedule(st.session_state.db, selected_teacher)
+            if not t_schedule.empty:
+                st.table(t_schedule)
+                
+                slot_labels = [
+                    f"{w}주차 {d} {p}교시 ({sub})"
+                    for w, d, p, sub in zip(t_schedule['Week'], t_schedule['Day'], t_schedule['Period'], t_schedule['Subject'])
+                ]
+                slot_idx = st.selectbox("수강생 명단 조회할 수업 선택", range(len(slot_labels)), format_func=lambda i: slot_labels[i])
+                
+                if slot_idx is not None:
+                    try:
+                        slot = t_schedule.iloc[slot_idx]
+                        sel_week, sel_day, sel_period, sel_subject = slot['Week'], slot['Day'], slot['Period'], slot['Subject']
+                        
+                        # Served from the cached roster index built once for every slot of the term
+                        stud_df = logic.get_students_for_class_slot(
+                            st.session_state.db, selected_teacher, sel_subject, day=sel_day, period=sel_period, week=sel_week
+                        )
+                        
+                        st.write(f"**{slot_labels[slot_idx]} 수강 대상 학생 명단**")
+                        if not stud_df.empty:
+                            st.dataframe(stud_df)
+                            st.caption(f"총 {len(stud_df)}명")
+                            
+                            # Print Feature for Student List
+                            with st.expander("🖨️ 명단 인쇄 미리보기", expanded=True):
+                                # Generate HTML for the list
+                                s_html = stud_df.to_html(index=False, classes="student-list", border=1, justify="center")
+                                
+                                # Custom Styling for List (same as before)
+                                s_html = s_html.replace('<table border="1" class="dataframe student-list">', '<table style="width:100%; border-collapse: collapse; text-align: center; font-family: Malgun Gothic, sans-serif;">')
+                                s_html = s_html.replace('<thead>', '<thead style="background-color: #f2f2f2;">')
+                                s_html = s_html.replace('<th>', '<th style="padding: 10px; border: 1px solid #000;">')
+                                s_html = s_html.replace('<td>', '<td style="padding: 8px; border: 1px solid #000;">')
+                                
+                                print_title = f"{sel_subject} 수강 대상 학생 명단 ({selected_teacher} 선생님)"
+                                
+                                full_print_html = f"""
+                                <div style="text-align: center; margin-bottom: 20px;">
+                                    <div class="print-title" style="font-size: 24px; font-weight: bold; margin-bottom: 20px;">{print_title}</div>
+                                    <p>총 {len(stud_df)}명</p>
+                                </div>
+                                {s_html}
+                                """
+                                st.markdown(full_print_html, unsafe_allow_html=True)
+
+                            # Hidden Div for Source Content (Not displayed, just for JS to grab)
+                            st.markdown(f'<div id="teacher-print-source" style="display:none;">{full_print_html}</div>', unsafe_allow_html=True)
+                            
+                            # Print Button with Popup Logic
+                            import streamlit.components.v1 as components
+                            
+                            js_print_logic = """
+                            <script>
+                            function printContent() {
+                                // Get the content from the hidden div in the parent document
+                                const contentDiv = window.parent.document.getElementById('teacher-print-source');
+                                if (!contentDiv) {
+                                    alert("인쇄할 내용을 찾을 수 없습니다.");
+                                    return;
+                                }
+                                const content = contentDiv.innerHTML;
+                                
+                                // Open a new window
+                                const printWindow = window.open('', '', 'height=800,width=800');
+                                
+                                printWindow.document.write('<html><head><title>명단 인쇄</title>');
+                                printWindow.document.write('<style>');
+                                printWindow.document.write('@page { size: A4; margin: 20mm; }');
+                                printWindow.document.write('body { font-family: "Malgun Gothic", dotum, sans-serif; text-align: center; margin: 0; padding: 20px; }');
+                                printWindow.document.write('.print-title { font-size: 24px; font-weight: bold; margin-bottom: 20px; }');
+                                printWindow.document.write('table { width: 100%; border-collapse: collapse; text-align: center; margin-top: 20px; }');
+                                printWindow.document.write('th, td { border: 1px solid black; padding: 8px; font-size: 12pt; }');
+                                printWindow.document.write('th { background-color: #f2f2f2; }');
+                                printWindow.document.write('.student-list { width: 100%; }');
+                                printWindow.document.write('</style>');
+                                printWindow.document.write('</head><body>');
+                                printWindow.document.write(content);
+                                printWindow.document.write('</body></html>');
+                                
+                                printWindow.document.close();
+                                printWindow.focus();
+                                
+                                // Trigger print
+                                setTimeout(() => {
+                                    printWindow.print();
+                                    // Optional: printWindow.close(); // Close after print if desired
+                                }, 500);
+                            }
+                            </script>
+                            
+                            <div style="text-align: center; margin-top: 10px;">
+                                <button onclick="printContent()" style="background-color: #4CAF50; border: none; color: white; padding: 10px 24px; text-align: center; text-decoration: none; display: inline-block; font-size: 16px; margin: 4px 2px; cursor: pointer; border-radius: 4px;">🖨️ 명단 인쇄하기</button>
+                            </div>
+                            """
+                            components.html(js_print_logic, height=100)
+
+                            # Server-side A4 PDFs: this slot, or one roster per subject the teacher runs
+                            import modules.pdf_export as pdf_export
+                            col_p1, col_p2 = st.columns(2)
+                            # Both PDFs are built only when their button is clicked
+                            with col_p1:
+                                st.download_button(
+                                    "📄 이 명단 PDF",
+                                    lambda: pdf_export.class_rosters_pdf([(print_title, stud_df)]),
+                                    file_name=f"명단_{selected_teacher}_{sel_subject}.pdf", mime="application/pdf", on_click="ignore"
+                                )
+                            with col_p2:
+                                # Runs outside the script thread on click, so session state is read here
+                                db = st.session_state.db
+
+                                def all_rosters_pdf():
+                                    return pdf_export.class_rosters_pdf([
+                                        (f"{subj} 수강 대상 학생 명단 ({selected_teacher} 선생님)",
+                                         logic.get_students_for_class_slot(db, selected_teacher, subj))
+                                        for subj in t_schedule['Subject'].unique()
+                                    ])
+                                st.download_button(
+                                    f"📚 담당 과목 전체 명단 PDF ({t_schedule['Subject'].nunique()}과목)",
+                                    all_rosters_pdf,
+                                    file_name=f"명단_{selected_teacher}_전체.pdf", mime="application/pdf", on_click="ignore"
+                                )
+
+
+                        else:
+                            st.info("해당 수업을 듣는 학생이 없습니다.")
+                    except Exception as e:
+                        st.error(f"명단 조회 중 오류 발생: {e}")
+            else:
+                st.info("배정된 시간표가 없습니다.")
+
+        # Every slot roster of the term in one workbook (one sheet per teacher)
+        # Share links only get the selected teacher's rosters; every teacher's stays with staff
+        share = st.session_state.get("view_mode") == "share"
+        st.markdown("---")
+        st.subheader("학기 전체 수업별 명단 내보내기")
+        if share:
+            export_scope = f"{selected_teacher} 선생님"
+        else:
+            export_scope = st.radio("범위", [f"{selected_teacher} 선생님", "전체 교사"], horizontal=True, key="roster_export_scope")
+        if st.button("📊 수업별 명단 Excel 생성"):
+            import modules.excel_export as excel_export
+            only = None if export_scope == "전체 교사" else selected_teacher
+            with st.spinner("Excel 작성 중..."):
+                data, stats = excel_export.roster_workbook_bytes(st.session_state.db, teacher_name=only)
+            st.session_state.roster_xlsx = (f"수업별_명단_{only or '전체교사'}.xlsx", data, stats, only is None)
+        if st.session_state.get("roster_xlsx"):
+            file_name, data, stats, all_teachers = st.session_state.roster_xlsx
+            if not (share and all_teachers):
+                st.download_button(f"⬇️ {file_name} (교사 {stats['teachers']}명, 수업 {stats['slots']}개)", data, file_name=file_name,
+                                   mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    else:
+        st.warning("교사 데이터가 없습니다.")
+
+
+if __name__ == "__main__":
+    render()
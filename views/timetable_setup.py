@@ -0,0 +1,348 @@
+import streamlit as st
+import modules.audit as audit
+import modules.excel_export as excel_export
+import modules.logic as logic
+import modules.occupancy as occupancy
+import modules.repair as repair
+import modules.slot_finder as slot_finder
+
+
+def render():
+    st.header("전체 시간표 편성")
+    
+    subjects = logic.get_unique_subjects(st.session_state.db)
+    # School days and periods per day (환경 설정)
+    shape = occupancy.load_grid_shape(st.session_state.db)
+    days, periods = shape['days'], shape['periods']
+
+    # 1. Add Slot Form
+    with st.expander("시간표 배정 추가", expanded=True):
+        # Week / Date input
+        col_w1, col_w2, col_w3 = st.columns(3)
+        with col_w1:
+            s_week = st.number_input("주차 (Week)", min_value=1, value=1, step=1)
+        with col_w2:
+            s_date_obj = st.date_input("날짜 선택", value=None, help="선택사항. 인쇄 시 표시됩니다.")
+            s_date_str = s_date_obj.strftime("%m/%d") if s_date_obj else ""
+        with col_w3:
+            st.empty()
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            s_day = st.selectbox("요일", days)
+        with col2:
+            s_period = st.selectbox("교시", periods)
+        with col3:
+            s_subject = st.selectbox("과목", subjects, key="timetable_sub")
+
+        # Live suggestions: every cell of the grid scored for the chosen subject in one pass
+        if s_subject:
+            _slot_suggestions(s_subject, int(s_week), shape)
+
+        # Initialize session state for conflict handling
+        if 'conflict_confirm' not in st.session_state:
+            st.session_state.conflict_confirm = False
+            st.session_state.pending_slot = None
+
+        if st.button("배정 추가"):
+            # Check Conflicts
+            conflicts = logic.check_conflicts(st.session_state.db, s_week, s_day, s_period, s_subject)
+            if conflicts:
+                st.session_state.conflict_confirm = True
+                st.session_state.pending_slot = {
+                    'week': s_week, 'date': s_date_str, 'day': s_day, 'period': s_period, 'subject': s_subject,
+                    'conflicts': conflicts
+                }
+                st.rerun()
+            else:
+                success, msg = logic.add_timetable_slot(st.session_state.db, s_week, s_date_str, s_day, s_period, s_subject)
+                if success:
+                    st.success(msg)
+                    st.session_state["grid_view_week_sel"] = s_week
+                    st.rerun()
+                else:
+                    st.error(msg)
+        
+        # Display Conflict Confirmation UI
+        if st.session_state.conflict_confirm:
+            # Verify if the pending slot matches current selection to avoid stale state if user changed inputs
+            # Actually, for simplicity, just show the modal-like warning
+            p_slot = st.session_state.pending_slot
+            st.warning(f"⚠️ 충돌 경고 ({p_slot['week']}주차 {p_slot['day']} {p_slot['period']}교시)!\n다음 학생들이 이 시간에 다른 과목 수업이 있습니다: {', '.join(p_slot['conflicts'])}")
+            
+            col_c1, col_c2 = st.columns(2)
+            with col_c1:
+                if st.button("무시하고 저장 (Force Save)", type="primary"):
+                    success, msg = logic.add_timetable_slot(st.session_state.db, p_slot['week'], p_slot['date'], p_slot['day'], p_slot['period'], p_slot['subject'])
+                    if success:
+                        st.success(msg)
+                        st.session_state.conflict_confirm = False # Reset
+                        st.session_state.pending_slot = None
+                        st.session_state["grid_view_week_sel"] = p_slot['week']
+                        st.rerun()
+                    else:
+                        st.error(msg)
+            with col_c2:
+                if st.button("취소 (Cancel)"):
+                    st.session_state.conflict_confirm = False
+                    st.session_state.pending_slot = None
+                    st.rerun()
+
+    # 1-2. Replicate a week's pattern to other weeks
+    with st.expander("주차 복제 (한 주 시간표를 여러 주에 일괄 적용)"):
+        tt_existing = logic.load_timetable(st.session_state.db)
+        source_weeks = [1]
+        if not tt_existing.empty:
+            source_weeks = sorted(tt_existing['Week'].unique().tolist())
+
+        col_r1, col_r2, col_r3 = st.columns(3)
+        with col_r1:
+            rep_source = st.selectbox("원본 주차", source_weeks, key="rep_source_week")
+        with col_r2:
+            rep_start = st.number_input("시작 주차", min_value=1, value=int(rep_source) + 1, step=1, key="rep_start_week")
+        with col_r3:
+            rep_end = st.number_input("종료 주차", min_value=1, value=int(rep_source) + 9, step=1, key="rep_end_week")
+
+        col_r4, col_r5 = st.columns(2)
+        with col_r4:
+            rep_term_start = st.date_input("학기 시작일 (1주차)", value=None, help="입력하면 각 주차의 날짜가 자동 계산됩니다.", key="rep_term_start")
+        with col_r5:
+            rep_holidays_str = st.text_area("휴일 (한 줄에 하나, 예: 2025-05-05)", key="rep_holidays", height=100)
+
+        if st.button("복제 실행"):
+            holidays = [h.strip() for h in rep_holidays_str.splitlines() if h.strip()]
+            success, msg, added = logic.replicate_week_pattern(
+                st.session_state.db, rep_source, rep_start, rep_end,
+                term_start=rep_term_start, holidays=holidays
+            )
+            if success:
+                st.success(msg)
+                if added:
+                    st.rerun()
+            else:
+                st.error(msg)
+
+    # 2. View Timetable (List & Grid)
+    # Grid and list are fragments: editing one re-runs only that part of the page
+    st.divider()
+    tt_df = logic.load_timetable(st.session_state.db)
+    
+    if not tt_df.empty:
+        _term_audit(shape)
+        _timetable_grid(subjects, shape)
+        _slot_list(days)
+    else:
+        st.info("편성된 시간표가 없습니다.")
+
+
+def _slot_suggestions(subject, week, shape):
+    result = slot_finder.score_slots(st.session_state.db, subject, weeks=[week])
+    st.caption(
+        f"🔎 **{subject}** 추천 시간 — 대상 학생 {result['students']}명 · 담당 교사 {result['teachers']}명 · "
+        f"필요 강의실 {result['rooms_needed']}개. 셀의 숫자는 겹치는 학생 수이며, '교사'는 담당 교사가 다른 수업 중, "
+        f"'강의실'은 빈 강의실 부족을 뜻합니다. (초록색일수록 좋은 시간)"
+    )
+    col_h, col_l = st.columns([3, 2])
+    with col_h:
+        text, css = slot_finder.week_heatmap(result, week, shape)
+        st.dataframe(text.style.apply(lambda _: css, axis=None), use_container_width=True)
+    with col_l:
+        all_weeks = st.checkbox("모든 주차에서 찾기", key="suggest_all_weeks")
+        ranked = slot_finder.rank_slots(result, limit=10, week=None if all_weeks else week)
+        st.dataframe(ranked, hide_index=True, use_container_width=True)
+
+
+def _term_audit(shape):
+    result = audit.get_audit(st.session_state.db)
+    stats = audit.summary(result)
+    title = f"충돌 점검 (전체 학기) — 학생 {stats['students']}명, {stats['cells']}개 시간" if stats['incidents'] else "충돌 점검 (전체 학기) — 충돌 없음"
+    with st.expander(title):
+        if not stats['incidents']:
+            st.success("모든 주차에서 수업이 겹치는 학생이 없습니다.")
+            return
+        st.caption("셀의 숫자는 그 시간에 수업이 두 개 이상 겹치는 학생 수입니다. (진할수록 많음)")
+        counts, css = audit.term_heatmap(result, shape)
+        st.dataframe(counts.style.apply(lambda _: css, axis=None), use_container_width=True)
+
+        col_p, col_s = st.columns(2)
+        with col_p:
+            st.markdown("**충돌 원인 과목 쌍**")
+            st.dataframe(result['pairs'], hide_index=True, use_container_width=True)
+        with col_s:
+            st.markdown("**충돌 학생**")
+            st.dataframe(result['rows'], hide_index=True, use_container_width=True)
+        if st.button("점검 보고서 만들기 (Excel)"):
+            data, _ = excel_export.audit_workbook_bytes(st.session_state.db)
+            st.download_button("📥 충돌 점검 보고서 다운로드", data, file_name="충돌점검.xlsx",
+                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+    _repair_panel(result['weeks'])
+
+
+def _repair_panel(weeks):
+    with st.expander("충돌 자동 해소 (최소 이동)"):
+        st.caption("현재 시간표에서 출발해, 배정 목록에서 '고정'하지 않은 배정만 같은 주 안의 다른 시간으로 옮겨 충돌을 없앱니다. "
+                   "담당 교사가 겹치거나 강의실이 모자라는 시간으로는 옮기지 않으며, 옮기는 배정 수가 가장 적은 안을 찾습니다.")
+        col_w, col_b = st.columns(2)
+        with col_w:
+            r_week = st.selectbox("주차", ["전체"] + list(weeks), key="repair_week")
+        with col_b:
+            budget = st.number_input("계산 시간 제한 (초)", min_value=1, max_value=120, value=10, step=1, key="repair_budget")
+        if st.button("이동안 계산"):
+            with st.spinner("이동안을 계산하는 중..."):
+                st.session_state.repair_plan = repair.repair_timetable(
+                    st.session_state.db, week=None if r_week == "전체" else r_week, budget_s=budget)
+
+        if 'repair_plan' not in st.session_state:
+            return
+        plan, summary = st.session_state.repair_plan
+        col_1, col_2, col_3 = st.columns(3)
+        col_1.metric("충돌 (이동 전)", f"{summary['before']}건")
+        col_2.metric("충돌 (이동 후)", f"{summary['after']}건", delta=summary['after'] - summary['before'], delta_color="inverse")
+        col_3.metric("이동할 배정", f"{summary['moves']}건")
+        if not summary['complete']:
+            st.info("시간 제한 안에 탐색을 마치지 못했습니다. 시간을 늘려 다시 계산하면 더 나은 안이 나올 수 있습니다.")
+        if plan.empty:
+            st.warning("옮겨서 줄일 수 있는 충돌이 없습니다. 고정한 배정을 풀거나 직접 조정해 주세요.")
+            return
+        st.dataframe(plan, hide_index=True, use_container_width=True)
+        if st.button(f"이동안 적용 ({summary['moves']}건)", type="primary"):
+            success, msg, _ = repair.apply_repair(st.session_state.db, plan)
+            del st.session_state.repair_plan
+            if success:
+                st.rerun()
+            else:
+                st.error(msg)
+
+
+@st.fragment
+def _timetable_grid(subjects, shape):
+    days, periods = shape['days'], shape['periods']
+    tt_df = logic.load_timetable(st.session_state.db)
+
+    # Week Filter for Grid (Week/Period are ints in the loaded frame, see modules/schema.py)
+    all_weeks = sorted(tt_df['Week'].unique().tolist())
+    st.subheader("시간표 요약 (Grid)")
+    
+    # Validate session state to prevent crash if data is stale
+    if "grid_view_week_sel" in st.session_state:
+        if st.session_state["grid_view_week_sel"] not in all_weeks:
+            # Value stored (e.g. from Add) is not in loaded data yet? 
+            # Or type mismatch? Remove it to prevent error.
+            del st.session_state["grid_view_week_sel"]
+    
+    selected_view_week = st.selectbox("조회할 주차 선택", all_weeks, index=0, key="grid_view_week_sel")
+
+    
+    # Filter Grid Data
+    grid_df = tt_df[tt_df['Week'] == selected_view_week].copy()
+
+    # Grid View, read cell by cell from the cached occupancy grid (no pivot on every render).
+    # Subjects in the same cell are joined with ", " so the grid can be edited/pasted as text.
+    pivot_data = occupancy.week_grid(occupancy.get_occupancy(st.session_state.db), selected_view_week, shape)
+    st.caption("셀을 직접 수정하거나 여러 셀을 복사/붙여넣기 한 뒤 '그리드 변경사항 적용'을 누르면 한 번에 저장됩니다. (한 셀에 여러 과목은 쉼표로 구분)")
+    edited_grid = st.data_editor(pivot_data, use_container_width=True, key=f"grid_editor_{selected_view_week}")
+
+    # Cell-level diff -> one batch of additions/deletions
+    grid_adds, grid_deletes = [], []
+    week_dates = grid_df[grid_df['Date'] != ""].groupby('Day', observed=True)['Date'].first().to_dict()
+    for p in periods:
+        for d in days:
+            if p > shape['periods_per_day'][d]:
+                continue
+            before = {x.strip() for x in str(pivot_data.at[p, d]).split(',') if x.strip()}
+            after = {x.strip() for x in str(edited_grid.at[p, d]).split(',') if x.strip() and x.strip() != 'None'}
+            for sub in after - before:
+                grid_adds.append({'week': selected_view_week, 'date': week_dates.get(d, ""), 'day': d, 'period': p, 'subject': sub})
+            for sub in before - after:
+                grid_deletes.append({'week': selected_view_week, 'day': d, 'period': p, 'subject': sub})
+
+    if grid_adds or grid_deletes:
+        unknown = sorted({a['subject'] for a in grid_adds} - set(subjects))
+        if unknown:
+            st.warning(f"학생 데이터에 없는 과목이 포함되어 있습니다: {', '.join(unknown)}")
+        col_g1, col_g2 = st.columns(2)
+        with col_g1:
+            apply_grid = st.button(f"그리드 변경사항 적용 (추가 {len(grid_adds)}건, 삭제 {len(grid_deletes)}건)", type="primary")
+        with col_g2:
+            force_grid = st.checkbox("충돌이 있어도 저장", key="grid_force")
+        if apply_grid:
+            success, msg, report = logic.apply_timetable_changes(
+                st.session_state.db, adds=grid_adds, deletes=grid_deletes, check=not force_grid
+            )
+            if success:
+                st.success(msg)
+                del st.session_state[f"grid_editor_{selected_view_week}"]
+                st.rerun()
+            else:
+                st.error(msg)
+                for c in report['conflicts']:
+                    st.write(f"- {c}")
+
+
+@st.fragment
+def _slot_list(days):
+    tt_df = logic.load_timetable(st.session_state.db)
+    all_weeks = sorted(tt_df['Week'].unique().tolist()) if not tt_df.empty else [1]
+
+    # List View for Deletion
+    st.subheader("배정 목록 및 삭제")
+    # Filters and paging are resolved on the timetable index; only the current page is rendered
+    col_f1, col_f2, col_f3, col_f4 = st.columns(4)
+    with col_f1:
+        f_week = st.selectbox("주차", ["전체"] + all_weeks, key="slot_filter_week")
+    with col_f2:
+        f_day = st.selectbox("요일", ["전체"] + days, key="slot_filter_day")
+    with col_f3:
+        f_subject = st.selectbox("과목", ["전체"] + sorted(tt_df['Subject'].astype(str).unique().tolist()), key="slot_filter_subject")
+    with col_f4:
+        page_size = st.selectbox("페이지당 행 수", [20, 50, 100], index=1, key="slot_page_size")
+
+    filters = dict(
+        week=None if f_week == "전체" else f_week,
+        day=None if f_day == "전체" else f_day,
+        subject=None if f_subject == "전체" else f_subject,
+    )
+    page_no = int(st.session_state.get("slot_page_no", 1))
+    page_df, total_slots = logic.query_timetable(st.session_state.db, page=page_no, page_size=page_size, **filters)
+    total_pages = max(1, -(-total_slots // page_size))
+    if page_no > total_pages:
+        # Filters shrank the result; jump to the last page that still exists
+        page_no = total_pages
+        page_df, _ = logic.query_timetable(st.session_state.db, page=page_no, page_size=page_size, **filters)
+    st.session_state.slot_page_no = page_no
+    st.number_input(f"페이지 (총 {total_pages}쪽, {total_slots}건)", min_value=1, max_value=total_pages, step=1, key="slot_page_no")
+
+    list_df = page_df[['Week', 'Date', 'Day', 'Period', 'Subject', 'Locked']].rename(columns={'Locked': '고정'})
+    list_df.insert(0, '선택', False)
+    list_key = f"slot_list_editor_{f_week}_{f_day}_{f_subject}_{page_no}_{page_size}"
+    edited_list = st.data_editor(
+        list_df, hide_index=True, use_container_width=True, key=list_key,
+        disabled=['Week', 'Date', 'Day', 'Period', 'Subject']
+    )
+    # Pinned slots stay where they are when conflicts are repaired automatically
+    lock_changes = edited_list[edited_list['고정'] != list_df['고정']]
+    if st.button(f"고정 상태 저장 ({len(lock_changes)}건)", disabled=lock_changes.empty):
+        success, msg = logic.lock_timetable_slots(st.session_state.db, [
+            {'week': r['Week'], 'day': r['Day'], 'period': r['Period'], 'subject': r['Subject'], 'locked': r['고정']}
+            for r in lock_changes.to_dict('records')
+        ])
+        if success:
+            del st.session_state[list_key]
+            # Locks change what the repair panel may move, so redraw the whole page
+            st.rerun()
+        else:
+            st.error(msg)
+    selected_rows = edited_list[edited_list['선택']]
+    if st.button(f"선택 삭제 ({len(selected_rows)}건)", disabled=selected_rows.empty):
+        logic.delete_timetable_slots(st.session_state.db, [
+            {'week': r['Week'], 'day': r['Day'], 'period': r['Period'], 'subject': r['Subject']}
+            for r in selected_rows.to_dict('records')
+        ])
+        del st.session_state[list_key]
+        # Full rerun: the grid, the term audit and the slot suggestions all read the Timetable
+        st.rerun()
+
+
+if __name__ == "__main__":
+    render()